@@ -1,8 +1,12 @@
+from typing import Literal
+
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
-from app.core.auth import get_current_admin
-from app.core.user_db import users_collection
+from app.core import profiling
+from app.core.auth import get_current_admin, invalidate_user
+from app.core.mongo_monitor import MONITOR as MONGO_MONITOR
+from app.repositories import users as users_repo
 from app.models.user import UserResponse
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -30,14 +34,14 @@ def _to_user_response(user: dict) -> UserResponse:
     )
 
 
-def _get_user_by_id(user_id: str) -> dict:
+async def _get_user_by_id(user_id: str) -> dict:
     if not ObjectId.is_valid(user_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid user id."
         )
 
-    user = users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_repo.find_by_id(ObjectId(user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -49,14 +53,14 @@ def _get_user_by_id(user_id: str) -> dict:
 @router.get("/employers/pending", response_model=list[UserResponse])
 async def list_pending_employers(current_admin: dict = Depends(get_current_admin)):
     _ = current_admin
-    users = users_collection.find({"role": "employer", "status": "pending"}).sort("created_at", -1)
+    users = await users_repo.list_pending_employers()
     return [_to_user_response(user) for user in users]
 
 
 @router.patch("/employers/{user_id}/approve", response_model=UserResponse)
 async def approve_employer(user_id: str, current_admin: dict = Depends(get_current_admin)):
     _ = current_admin
-    user = _get_user_by_id(user_id)
+    user = await _get_user_by_id(user_id)
 
     if user.get("role") != "employer":
         raise HTTPException(
@@ -64,10 +68,11 @@ async def approve_employer(user_id: str, current_admin: dict = Depends(get_curre
             detail="Only employer accounts can be approved."
         )
 
-    users_collection.update_one(
-        {"_id": user["_id"]},
+    await users_repo.update_by_id(
+        user["_id"],
         {"$set": {"status": "active", "is_active": True}}
     )
+    invalidate_user(user["email"])
     user["status"] = "active"
     user["is_active"] = True
     return _to_user_response(user)
@@ -76,7 +81,7 @@ async def approve_employer(user_id: str, current_admin: dict = Depends(get_curre
 @router.patch("/employers/{user_id}/reject", response_model=UserResponse)
 async def reject_employer(user_id: str, current_admin: dict = Depends(get_current_admin)):
     _ = current_admin
-    user = _get_user_by_id(user_id)
+    user = await _get_user_by_id(user_id)
 
     if user.get("role") != "employer":
         raise HTTPException(
@@ -84,10 +89,46 @@ async def reject_employer(user_id: str, current_admin: dict = Depends(get_curren
             detail="Only employer accounts can be rejected."
         )
 
-    users_collection.update_one(
-        {"_id": user["_id"]},
+    await users_repo.update_by_id(
+        user["_id"],
         {"$set": {"status": "rejected", "is_active": False}}
     )
+    invalidate_user(user["email"])
     user["status"] = "rejected"
     user["is_active"] = False
     return _to_user_response(user)
+
+
+@router.get("/profiles")
+async def list_request_profiles(current_admin: dict = Depends(get_current_admin)):
+    _ = current_admin
+    return {"items": profiling.list_profiles()}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_request_profile(profile_id: str, current_admin: dict = Depends(get_current_admin)):
+    _ = current_admin
+    profile = profiling.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found."
+        )
+    return profile
+
+
+@router.get("/mongo/slow-queries")
+async def list_mongo_query_shapes(
+    limit: int = Query(default=20, ge=1, le=200),
+    sort: Literal["total_ms", "avg_ms", "max_ms", "count", "slow_count", "examined_per_returned"] = Query(default="total_ms"),
+    current_admin: dict = Depends(get_current_admin),
+):
+    _ = current_admin
+    return {"items": MONGO_MONITOR.top_shapes(limit=limit, sort=sort)}
+
+
+@router.delete("/mongo/slow-queries")
+async def reset_mongo_query_shapes(current_admin: dict = Depends(get_current_admin)):
+    _ = current_admin
+    MONGO_MONITOR.reset()
+    return {"status": "reset"}
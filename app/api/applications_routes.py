@@ -3,11 +3,16 @@ from typing import Optional
 
 from bson import ObjectId
 from pymongo.errors import DuplicateKeyError
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel
 
 from app.core.auth import get_current_user
-from app.core.database import applications_collection, jobs_collection, recommendation_items_collection
+from app.repositories import applications as applications_repo
+from app.repositories import jobs as jobs_repo
+from app.repositories import recommendations as recommendations_repo
+from app.repositories import report_rollups as report_rollups_repo
+from app.services.job_schema import job_field
+from app.utils.pagination import NEXT_CURSOR_HEADER, keyset_cursor, keyset_filter, page_slice
 
 router = APIRouter(prefix="/applications", tags=["Applications"])
 
@@ -17,28 +22,6 @@ class ApplyRequest(BaseModel):
     recommendation_item_id: Optional[str] = None
 
 
-def _mark_recommendation_applied(user_id: str, recommendation_item_id: Optional[str], job_id: str) -> None:
-    now = datetime.utcnow()
-
-    if recommendation_item_id and ObjectId.is_valid(recommendation_item_id):
-        recommendation_items_collection.update_one(
-            {"_id": ObjectId(recommendation_item_id), "user_id": user_id},
-            {"$set": {"decision": "applied", "decision_at": now, "updated_at": now}},
-        )
-        return
-
-    # Fallback: mark the latest pending recommendation item for this user+job as applied.
-    fallback_item = recommendation_items_collection.find_one(
-        {"user_id": user_id, "job_id": job_id, "decision": "pending"},
-        sort=[("created_at", -1)],
-    )
-    if fallback_item:
-        recommendation_items_collection.update_one(
-            {"_id": fallback_item["_id"]},
-            {"$set": {"decision": "applied", "decision_at": now, "updated_at": now}},
-        )
-
-
 def _serialize_application(doc: dict, job: Optional[dict] = None) -> dict:
     out = {
         "_id": str(doc["_id"]),
@@ -51,20 +34,20 @@ def _serialize_application(doc: dict, job: Optional[dict] = None) -> dict:
     if job:
         out["job"] = {
             "id": str(job.get("_id")) if job.get("_id") else None,
-            "title": job.get("title") or job.get("Job Title", ""),
-            "company": job.get("company") or job.get("Company Name", ""),
-            "location": job.get("location") or job.get("Location", ""),
-            "type": job.get("type") or job.get("Job Type", ""),
-            "experience_level": job.get("experience_level") or job.get("Experience Level", ""),
-            "category": job.get("category") or job.get("Category", ""),
-            "work_type": job.get("work_type") or job.get("Work Type", ""),
-            "description": job.get("description") or job.get("Job Description", ""),
+            "title": job_field(job, "title", ""),
+            "company": job_field(job, "company", ""),
+            "location": job_field(job, "location", ""),
+            "type": job_field(job, "type", ""),
+            "experience_level": job_field(job, "experience_level", ""),
+            "category": job_field(job, "category", ""),
+            "work_type": job_field(job, "work_type", ""),
+            "description": job_field(job, "description", ""),
         }
     return out
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
-def apply_to_job(payload: ApplyRequest, current_user: dict = Depends(get_current_user)):
+async def apply_to_job(payload: ApplyRequest, current_user: dict = Depends(get_current_user)):
     if current_user.get("role") != "job_seeker":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -74,7 +57,7 @@ def apply_to_job(payload: ApplyRequest, current_user: dict = Depends(get_current
     if not ObjectId.is_valid(payload.job_id):
         raise HTTPException(status_code=400, detail="Invalid job id")
 
-    job = jobs_collection.find_one({"_id": ObjectId(payload.job_id), "is_active": {"$ne": False}})
+    job = await jobs_repo.get_active(ObjectId(payload.job_id))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -88,30 +71,39 @@ def apply_to_job(payload: ApplyRequest, current_user: dict = Depends(get_current
     }
 
     try:
-        result = applications_collection.insert_one(doc)
+        doc["_id"] = await applications_repo.insert(doc)
     except DuplicateKeyError:
-        _mark_recommendation_applied(current_user["id"], payload.recommendation_item_id, payload.job_id)
+        previous = await recommendations_repo.mark_applied(
+            current_user["id"], payload.recommendation_item_id, payload.job_id
+        )
+        await report_rollups_repo.record_decision(current_user["id"], previous, "applied")
         raise HTTPException(status_code=409, detail="You have already applied to this job.")
 
-    _mark_recommendation_applied(current_user["id"], payload.recommendation_item_id, payload.job_id)
+    previous = await recommendations_repo.mark_applied(current_user["id"], payload.recommendation_item_id, payload.job_id)
+    await report_rollups_repo.record_application(current_user["id"], payload.job_id, doc["created_at"])
+    await report_rollups_repo.record_decision(current_user["id"], previous, "applied")
 
-    doc["_id"] = result.inserted_id
     return _serialize_application(doc, job=job)
 
 
 @router.get("/my-applications")
-def my_applications(current_user: dict = Depends(get_current_user)):
-    rows = list(
-        applications_collection.find({"user_id": current_user["id"]}).sort("created_at", -1)
+async def my_applications(
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = Query(default=None),
+    current_user: dict = Depends(get_current_user),
+):
+    # The body stays a plain list; the next page's cursor travels in a header.
+    rows, has_more = page_slice(
+        await applications_repo.list_for_user(current_user["id"], keyset_filter(cursor), limit + 1),
+        limit,
     )
+    if has_more:
+        response.headers[NEXT_CURSOR_HEADER] = keyset_cursor(rows[-1])
 
     if not rows:
         return []
 
-    job_ids = [row["job_id"] for row in rows if ObjectId.is_valid(row["job_id"])]
-    jobs_map = {
-        str(job["_id"]): job
-        for job in jobs_collection.find({"_id": {"$in": [ObjectId(i) for i in job_ids]}})
-    }
+    jobs_map = await jobs_repo.find_by_ids([row["job_id"] for row in rows])
 
     return [_serialize_application(row, job=jobs_map.get(row["job_id"])) for row in rows]
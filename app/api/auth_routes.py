@@ -6,15 +6,18 @@ from datetime import datetime, timedelta
 
 from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel, EmailStr, Field
+from starlette.concurrency import run_in_threadpool
 
 from app.models.user import UserCreate, UserLogin, UserResponse, Token
 from app.core.auth import (
-    verify_password,
+    verify_password_async,
     create_access_token,
     get_current_user,
-    get_password_hash,
+    get_password_hash_async,
+    invalidate_user,
+    principal_claims,
 )
-from app.core.user_db import users_collection
+from app.repositories import users as users_repo
 from app.services.email_service import send_reset_otp_email
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -79,7 +82,7 @@ async def signup(user_data: UserCreate):
         )
 
     # Check if user already exists
-    existing_user = users_collection.find_one({"email": user_data.email})
+    existing_user = await users_repo.find_by_email(user_data.email, {"_id": 1})
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -102,19 +105,16 @@ async def signup(user_data: UserCreate):
         "status": role_status,
         "is_active": role_status == "active",
         "company_name": user_data.company_name,
-        "password": get_password_hash(user_data.password),
+        "password": await get_password_hash_async(user_data.password),
         "created_at": datetime.utcnow(),
     }
 
     # Insert into database
-    result = users_collection.insert_one(user_doc)
+    user_doc["_id"] = await users_repo.insert(user_doc)
 
     # Create access token
-    access_token = create_access_token(
-        data={"sub": user_data.email, "role": normalized_role}
-    )
+    access_token = create_access_token(data=principal_claims(user_doc))
 
-    user_doc["_id"] = result.inserted_id
     user_response = _build_user_response(user_doc)
 
     return Token(access_token=access_token, user=user_response)
@@ -124,7 +124,7 @@ async def signup(user_data: UserCreate):
 async def login(credentials: UserLogin):
     """Login user and return JWT token"""
     # Find user by email
-    user = users_collection.find_one({"email": credentials.email})
+    user = await users_repo.find_by_email(credentials.email)
 
     if not user:
         raise HTTPException(
@@ -133,7 +133,7 @@ async def login(credentials: UserLogin):
         )
 
     # Verify password
-    if not verify_password(credentials.password, user["password"]):
+    if not await verify_password_async(credentials.password, user["password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -147,7 +147,7 @@ async def login(credentials: UserLogin):
 
     # Upgrade legacy plaintext passwords to bcrypt after successful login.
     if not str(user["password"]).startswith("$2"):
-        updates["password"] = get_password_hash(credentials.password)
+        updates["password"] = await get_password_hash_async(credentials.password)
 
     if user.get("role") != normalized_role:
         updates["role"] = normalized_role
@@ -162,12 +162,11 @@ async def login(credentials: UserLogin):
         user["is_active"] = normalized_is_active
 
     if updates:
-        users_collection.update_one({"_id": user["_id"]}, {"$set": updates})
+        await users_repo.update_by_id(user["_id"], {"$set": updates})
+        invalidate_user(user["email"])
 
     # Create access token
-    access_token = create_access_token(
-        data={"sub": user["email"], "role": normalized_role}
-    )
+    access_token = create_access_token(data=principal_claims(user))
 
     user_response = _build_user_response(user)
 
@@ -177,7 +176,7 @@ async def login(credentials: UserLogin):
 @router.get("/me", response_model=UserResponse)
 async def get_me(current_user: dict = Depends(get_current_user)):
     """Get current user information"""
-    user = users_collection.find_one({"email": current_user["email"]})
+    user = await users_repo.find_by_email(current_user["email"])
 
     if not user:
         raise HTTPException(
@@ -193,7 +192,7 @@ async def forgot_password(payload: ForgotPasswordRequest):
     now = datetime.utcnow()
     expires_at = now + timedelta(minutes=RESET_OTP_EXPIRE_MINUTES)
 
-    user = users_collection.find_one({"email": payload.email})
+    user = await users_repo.find_by_email(payload.email)
 
     response = {
         "message": "If the email exists, OTP has been sent to email.",
@@ -207,8 +206,8 @@ async def forgot_password(payload: ForgotPasswordRequest):
     otp = f"{secrets.randbelow(1000000):06d}"
     otp_hash = hashlib.sha256(otp.encode("utf-8")).hexdigest()
 
-    users_collection.update_one(
-        {"_id": user["_id"]},
+    await users_repo.update_by_id(
+        user["_id"],
         {
             "$set": {
                 "reset_password": {
@@ -223,7 +222,7 @@ async def forgot_password(payload: ForgotPasswordRequest):
     )
 
     try:
-        send_reset_otp_email(user["email"], otp, RESET_OTP_EXPIRE_MINUTES)
+        await run_in_threadpool(send_reset_otp_email, user["email"], otp, RESET_OTP_EXPIRE_MINUTES)
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -241,7 +240,7 @@ async def reset_password(payload: ResetPasswordRequest):
             detail="Password must contain at least one uppercase letter, one lowercase letter, and one number."
         )
 
-    user = users_collection.find_one({"email": payload.email})
+    user = await users_repo.find_by_email(payload.email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -257,8 +256,8 @@ async def reset_password(payload: ResetPasswordRequest):
         )
     now = datetime.utcnow()
     if not expires_at or expires_at < now:
-        users_collection.update_one(
-            {"_id": user["_id"]},
+        await users_repo.update_by_id(
+            user["_id"],
             {"$unset": {"reset_password": ""}, "$set": {"updated_at": now}},
         )
         raise HTTPException(
@@ -269,8 +268,8 @@ async def reset_password(payload: ResetPasswordRequest):
     submitted_otp_hash = hashlib.sha256(payload.otp.strip().encode("utf-8")).hexdigest()
     if submitted_otp_hash != reset_meta.get("otp_hash"):
         attempts = int(reset_meta.get("attempts", 0)) + 1
-        users_collection.update_one(
-            {"_id": user["_id"]},
+        await users_repo.update_by_id(
+            user["_id"],
             {"$set": {"reset_password.attempts": attempts, "updated_at": now}},
         )
         raise HTTPException(
@@ -279,15 +278,17 @@ async def reset_password(payload: ResetPasswordRequest):
         )
 
     now = datetime.utcnow()
-    users_collection.update_one(
-        {"_id": user["_id"]},
+    new_password_hash = await get_password_hash_async(payload.new_password)
+    await users_repo.update_by_id(
+        user["_id"],
         {
             "$set": {
-                "password": get_password_hash(payload.new_password),
+                "password": new_password_hash,
                 "updated_at": now,
             },
             "$unset": {"reset_password": ""},
         },
     )
+    invalidate_user(user["email"])
 
     return {"status": "password_reset"}
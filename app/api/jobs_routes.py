@@ -1,51 +1,38 @@
 import math
+import os
 import re
 from datetime import datetime
 from typing import Any
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
+from app.core import metrics
 from app.core.auth import get_current_user
 from app.core.database import jobs_collection
 from app.models.job import JobCreate, JobListResponse, JobResponse, JobUpdate
+from app.services.job_text import job_content_hash
+from app.services import job_schema, report_rollups, semantic_search, similar_jobs, text_search
+from app.services.skill_matcher import job_skill_fields
+from app.utils.fieldsets import COMPACT_JOB_FIELDS, parse_fields
+from app.utils.pagination import (
+    KEYSET_SORT,
+    cached_count,
+    decode_offset_cursor,
+    keyset_cursor,
+    keyset_filter,
+    offset_cursor,
+    page_slice,
+)
 
 router = APIRouter(prefix="/jobs", tags=["Jobs"])
 
-LEGACY_FIELD_MAP = {
-    "title": "Job Title",
-    "company": "Company Name",
-    "location": "Location",
-    "type": "Job Type",
-    "experience_level": "Experience Level",
-    "salary_min": "Salary Min (?)",
-    "salary_max": "Salary Max (?)",
-    "min_education": "Min Education",
-    "category": "Category",
-    "openings": "Openings",
-    "notice_period": "Notice Period",
-    "year_of_passing": "Year of Passing",
-    "job_link": "Direct Link",
-    "work_type": "Work Type",
-    "interview_type": "Interview Type",
-    "company_website": "Company Website",
-    "company_description": "Company Description",
-    "description": "Job Description",
-    "requirements": "Requirements",
-    "responsibilities": "Responsibilities",
-}
-
-
-def _normalize_skills(skills: Any) -> list[str]:
-    if skills is None:
-        return []
-    if isinstance(skills, list):
-        return [str(item).strip() for item in skills if str(item).strip()]
-    if isinstance(skills, str):
-        parts = [p.strip() for p in re.split(r"[,|]", skills)]
-        return [p for p in parts if p]
-    return [str(skills).strip()]
-
+# Up to this many ranked hits are checked against the filters with one `$in`;
+# larger hit sets are matched by running the filters alone. Nothing is dropped.
+SEARCH_MAX_HITS = int(os.getenv("SEARCH_MAX_HITS", "1000"))
+# Nearest neighbours considered for a semantic search before filters and pagination.
+SEMANTIC_MAX_HITS = int(os.getenv("SEMANTIC_MAX_HITS", "200"))
 
 def _clean_text(value: Any) -> str:
     return str(value or "").strip()
@@ -66,82 +53,45 @@ def _coerce_bool(value: Any, default: bool) -> bool:
     return _clean_text(value).lower() not in {"", "0", "false", "no", "off", "none", "null"}
 
 
-def _serialize_skills(skills: list[str]) -> str:
-    return ", ".join(skills)
-
-
-def _normalize_job_link(raw: Any, fallback: Any = None) -> str | None:
-    primary = str(raw or "").strip()
-    backup = str(fallback or "").strip()
-    candidate = primary or backup
-    if not candidate:
-        return None
-
-    email_match = re.search(r"([A-Za-z0-9._%+-]+)\s*@\s*([A-Za-z0-9.-]+\.[A-Za-z]{2,})", candidate)
-    if email_match:
-        email = f"{email_match.group(1)}@{email_match.group(2)}".rstrip(".,;")
-        return f"mailto:{email}"
-
-    candidate = re.sub(r"^(https?):\s*", r"\1://", candidate, flags=re.IGNORECASE)
-    candidate = re.sub(r"^(https?://[^/\s]+)\s+", r"\1/", candidate, flags=re.IGNORECASE)
-    candidate = candidate.replace("\\", "/").strip().rstrip(".,;")
-    candidate = re.sub(r"\s+", "", candidate)
-
-    http_match = re.search(r"(https?://[^\s]+)", candidate, flags=re.IGNORECASE)
-    if http_match:
-        return http_match.group(1).rstrip(".,;")
-
-    domain_match = re.search(r"((?:www\.)?[A-Za-z0-9.-]+\.[A-Za-z]{2,}(?:/[^\s]*)?)", candidate)
-    if domain_match:
-        normalized = domain_match.group(1).rstrip(".,;")
-        if not normalized.lower().startswith(("http://", "https://")):
-            normalized = f"https://{normalized}"
-        return normalized
-
-    return None
-
-
 def _normalize_job_doc(doc: dict) -> JobResponse:
-    skills = _normalize_skills(doc.get("skills", doc.get("Skills")))
-    title = _clean_text(doc.get("title") or doc.get("Job Title")) or "Untitled Job"
-    company = _clean_text(doc.get("company") or doc.get("Company Name")) or "Unknown Company"
-    location = _clean_text(doc.get("location") or doc.get("Location")) or "Not specified"
-    description = _clean_text(doc.get("description") or doc.get("Job Description"))
+    doc = job_schema.read_job(doc)
+    skills = list(doc.get("skills") or [])
+    title = _clean_text(doc.get("title")) or "Untitled Job"
+    company = _clean_text(doc.get("company")) or "Unknown Company"
+    location = _clean_text(doc.get("location")) or "Not specified"
+    description = _clean_text(doc.get("description"))
     if len(description) < 10:
         description = "No description provided yet."
 
     created_date = doc.get("created_date") or doc.get("created_at") or datetime.utcnow()
     created_at = doc.get("created_at") or created_date or datetime.utcnow()
     updated_at = doc.get("updated_at")
-    company_website = _normalize_job_link(doc.get("company_website") or doc.get("Company Website"))
 
     return JobResponse(
         id=str(doc["_id"]),
         title=title,
         company=company,
         location=location,
-        type=_clean_text(doc.get("type") or doc.get("Job Type") or "Full-time"),
-        experience_level=_optional_text(doc.get("experience_level") or doc.get("Experience Level")),
+        type=_clean_text(doc.get("type") or "Full-time"),
+        experience_level=_optional_text(doc.get("experience_level")),
         description=description,
-        requirements=_clean_text(doc.get("requirements") or doc.get("Requirements")),
-        responsibilities=_clean_text(doc.get("responsibilities") or doc.get("Responsibilities")),
+        requirements=_clean_text(doc.get("requirements")),
+        responsibilities=_clean_text(doc.get("responsibilities")),
         skills=skills,
-        salary_min=(None if doc.get("salary_min") is None else str(doc.get("salary_min")))
-        or (None if doc.get("Salary Min (?)") is None else str(doc.get("Salary Min (?)"))),
-        salary_max=(None if doc.get("salary_max") is None else str(doc.get("salary_max")))
-        or (None if doc.get("Salary Max (?)") is None else str(doc.get("Salary Max (?)"))),
-        min_education=_optional_text(doc.get("min_education") or doc.get("Min Education")),
-        category=_optional_text(doc.get("category") or doc.get("Category")),
-        openings=_optional_text(doc.get("openings") or doc.get("Openings")),
-        notice_period=_optional_text(doc.get("notice_period") or doc.get("Notice Period")),
-        year_of_passing=_optional_text(doc.get("year_of_passing") or doc.get("Year of Passing")),
-        work_type=_optional_text(doc.get("work_type") or doc.get("Work Type")),
-        interview_type=_optional_text(doc.get("interview_type") or doc.get("Interview Type")),
-        company_website=company_website,
-        company_description=_optional_text(doc.get("company_description") or doc.get("Company Description")),
-        source=str(doc.get("source") or ("legacy_import" if "Job Title" in doc else "manual")),
+        salary_min=job_schema.number_text(doc.get("salary_min")),
+        salary_max=job_schema.number_text(doc.get("salary_max")),
+        min_education=_optional_text(doc.get("min_education")),
+        category=_optional_text(doc.get("category")),
+        openings=_optional_text(doc.get("openings")),
+        notice_period=_optional_text(doc.get("notice_period")),
+        year_of_passing=_optional_text(doc.get("year_of_passing")),
+        work_type=_optional_text(doc.get("work_type")),
+        interview_type=_optional_text(doc.get("interview_type")),
+        company_website=doc.get("company_website"),
+        company_description=_optional_text(doc.get("company_description")),
+        source=str(doc.get("source") or "manual"),
         external_id=doc.get("external_id"),
-        job_link=_normalize_job_link(doc.get("job_link") or doc.get("Direct Link"), company_website),
+        job_link=doc.get("job_link"),
         posted_by=doc.get("posted_by"),
         is_active=_coerce_bool(doc.get("is_active", True), True),
         indexed=_coerce_bool(doc.get("indexed", False), False),
@@ -152,32 +102,16 @@ def _normalize_job_doc(doc: dict) -> JobResponse:
 
 
 def _expand_job_storage_fields(values: dict[str, Any]) -> dict[str, Any]:
+    """Request fields as stored; links, numbers and dates are canonicalized by job_schema afterwards."""
     updates: dict[str, Any] = {}
 
     for field, value in values.items():
-        if field == "skills":
-            normalized_skills = _normalize_skills(value)
-            updates["skills"] = normalized_skills
-            updates["Skills"] = _serialize_skills(normalized_skills)
-            continue
-
-        if field in {"job_link", "company_website"}:
-            normalized_link = _normalize_job_link(value)
-            updates[field] = normalized_link
-            updates[LEGACY_FIELD_MAP[field]] = normalized_link
-            continue
-
         if field in {"is_active", "indexed"}:
             normalized_bool = _coerce_bool(value, field == "is_active")
             updates[field] = normalized_bool
             continue
 
-        normalized_value = value.strip() if isinstance(value, str) else value
-        updates[field] = normalized_value
-
-        legacy_field = LEGACY_FIELD_MAP.get(field)
-        if legacy_field:
-            updates[legacy_field] = normalized_value
+        updates[field] = value.strip() if isinstance(value, str) else value
 
     return updates
 
@@ -205,7 +139,8 @@ def _require_job_write_access(current_user: dict):
 def _get_job_or_404(job_id: str) -> dict:
     if not ObjectId.is_valid(job_id):
         raise HTTPException(status_code=400, detail="Invalid job id.")
-    job = jobs_collection.find_one({"_id": ObjectId(job_id), "is_active": {"$ne": False}})
+    with metrics.stage("jobs_mongo"):
+        job = jobs_collection.find_one({"_id": ObjectId(job_id), "is_active": {"$ne": False}})
     if not job:
         raise HTTPException(status_code=404, detail="Job not found.")
     return job
@@ -226,21 +161,38 @@ def _ensure_job_owner_or_admin(job: dict, current_user: dict):
     )
 
 
-@router.get("", response_model=JobListResponse)
-def list_jobs(
-    q: str | None = Query(default=None),
-    location: str | None = Query(default=None),
-    company: str | None = Query(default=None),
-    type: str | None = Query(default=None),
-    category: str | None = Query(default=None),
-    work_type: str | None = Query(default=None),
-    experience_level: str | None = Query(default=None),
-    mine: bool = Query(default=False),
-    include_inactive: bool = Query(default=False),
-    page: int = Query(default=1, ge=1),
-    limit: int = Query(default=20, ge=1, le=100),
-    current_user: dict = Depends(get_current_user),
-):
+# Text fields scanned by the regex fallback of `q`.
+REGEX_SEARCH_FIELDS = (
+    "title", "company", "description", "requirements", "responsibilities",
+    "skills", "category", "experience_level", "work_type", "company_description",
+)
+
+
+def _field_condition(condition: Any, *fields: str) -> dict:
+    """Match `condition` on canonical fields (and their legacy names in compat mode)."""
+    keys = job_schema.fields(*fields)
+    if len(keys) == 1:
+        return {keys[0]: condition}
+    return {"$or": [{key: condition} for key in keys]}
+
+
+def _regex_search_condition(q: str) -> dict:
+    rx = {"$regex": re.escape(q), "$options": "i"}
+    return _field_condition(rx, *REGEX_SEARCH_FIELDS)
+
+
+def _job_filter_query(
+    current_user: dict,
+    mine: bool,
+    include_inactive: bool,
+    location: str | None,
+    company: str | None,
+    type: str | None,
+    category: str | None,
+    work_type: str | None,
+    experience_level: str | None,
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Base query plus the structured-filter conditions shared by every job listing."""
     role = _normalize_role(current_user.get("role"))
 
     query: dict[str, Any] = {}
@@ -254,71 +206,220 @@ def list_jobs(
 
     and_conditions: list[dict[str, Any]] = []
 
-    if q:
-        rx = {"$regex": re.escape(q), "$options": "i"}
-        and_conditions.append({"$or": [
-            {"title": rx},
-            {"company": rx},
-            {"description": rx},
-            {"requirements": rx},
-            {"responsibilities": rx},
-            {"skills": rx},
-            {"category": rx},
-            {"experience_level": rx},
-            {"work_type": rx},
-            {"company_description": rx},
-            {"Job Title": rx},
-            {"Company Name": rx},
-            {"Job Description": rx},
-            {"Requirements": rx},
-            {"Responsibilities": rx},
-            {"Skills": rx},
-            {"Category": rx},
-            {"Experience Level": rx},
-            {"Work Type": rx},
-            {"Company Description": rx},
-        ]})
-
     if location:
         rx = {"$regex": re.escape(location), "$options": "i"}
-        and_conditions.append({"$or": [{"location": rx}, {"Location": rx}]})
+        and_conditions.append(_field_condition(rx, "location"))
 
     if company:
         rx = {"$regex": re.escape(company), "$options": "i"}
-        and_conditions.append({"$or": [{"company": rx}, {"Company Name": rx}]})
+        and_conditions.append(_field_condition(rx, "company"))
 
     if type:
         rx = {"$regex": re.escape(type), "$options": "i"}
-        and_conditions.append({"$or": [{"type": rx}, {"Job Type": rx}]})
+        and_conditions.append(_field_condition(rx, "type"))
 
     if category:
         rx = {"$regex": re.escape(category), "$options": "i"}
-        and_conditions.append({"$or": [{"category": rx}, {"Category": rx}]})
+        and_conditions.append(_field_condition(rx, "category"))
 
     if work_type:
         rx = {"$regex": re.escape(work_type), "$options": "i"}
-        and_conditions.append({"$or": [{"work_type": rx}, {"Work Type": rx}]})
+        and_conditions.append(_field_condition(rx, "work_type"))
 
     if experience_level:
         rx = {"$regex": re.escape(experience_level), "$options": "i"}
-        and_conditions.append({"$or": [{"experience_level": rx}, {"Experience Level": rx}]})
+        and_conditions.append(_field_condition(rx, "experience_level"))
+
+    return query, and_conditions
+
+
+def _job_projection(selected_fields: tuple[str, ...] | None) -> dict[str, int] | None:
+    """Mongo projection for a sparse job list; keeps what read_job and the keyset cursor need."""
+    if selected_fields is None:
+        return None
+    stored = {"_id", "schema_version", "created_at", "created_date"}
+    stored.update(job_schema.fields(*(name for name in selected_fields if name != "id")))
+    if "job_link" in selected_fields:
+        stored.add("company_website")
+    return {name: 1 for name in stored}
+
+
+def _job_list_response(
+    docs: list[dict], selected_fields: tuple[str, ...] | None, **envelope: Any
+) -> JobListResponse | Response:
+    """Full JobListResponse, or only the selected fields per job encoded directly."""
+    if selected_fields is None:
+        return JobListResponse(items=[_normalize_job_doc(doc) for doc in docs], **envelope)
+    include = set(selected_fields)
+    items = [_normalize_job_doc(doc).model_dump(mode="json", include=include) for doc in docs]
+    return Response(content=orjson.dumps({"items": items, **envelope}), media_type="application/json")
+
+
+def _ranked_page(
+    ranked_ids: list[ObjectId],
+    query: dict[str, Any],
+    page: int,
+    limit: int,
+    cursor: str | None,
+    projection: dict[str, int] | None = None,
+    filtered: bool = True,
+) -> tuple[list[dict], int, str | None]:
+    """
+    Filters narrow every ranked hit (not a truncated prefix), then relevance
+    order decides the page. `filtered=False` means `query` only restates what
+    the ranking already guarantees (active jobs), so hits are not re-checked.
+    """
+    offset = decode_offset_cursor(cursor) if cursor else (page - 1) * limit
+    with metrics.stage("jobs_mongo"):
+        if not filtered:
+            ordered_ids = ranked_ids
+        else:
+            if len(ranked_ids) <= SEARCH_MAX_HITS:
+                id_query = {"$and": [query, {"_id": {"$in": ranked_ids}}]}
+            else:
+                id_query = query
+            matching = {doc["_id"] for doc in jobs_collection.find(id_query, {"_id": 1})}
+            ordered_ids = [job_id for job_id in ranked_ids if job_id in matching]
+        total = len(ordered_ids)
+        page_ids = ordered_ids[offset:offset + limit]
+        docs_by_id = {
+            doc["_id"]: doc
+            for doc in jobs_collection.find({"$and": [query, {"_id": {"$in": page_ids}}]}, projection)
+        }
+    docs = [docs_by_id[job_id] for job_id in page_ids if job_id in docs_by_id]
+    next_cursor = offset_cursor(offset + limit) if offset + limit < total else None
+    return docs, total, next_cursor
+
+
+@router.get("", response_model=JobListResponse)
+def list_jobs(
+    q: str | None = Query(default=None),
+    location: str | None = Query(default=None),
+    company: str | None = Query(default=None),
+    type: str | None = Query(default=None),
+    category: str | None = Query(default=None),
+    work_type: str | None = Query(default=None),
+    experience_level: str | None = Query(default=None),
+    mine: bool = Query(default=False),
+    include_inactive: bool = Query(default=False),
+    page: int = Query(default=1, ge=1),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None),
+    include_total: bool = Query(default=True),
+    fields: str | None = Query(default=None, description="Comma-separated job fields to return"),
+    compact: bool = Query(default=False, description="List-view subset of job fields"),
+    current_user: dict = Depends(get_current_user),
+):
+    selected_fields = parse_fields(fields, compact, JobResponse.model_fields, COMPACT_JOB_FIELDS, always=("id",))
+    projection = _job_projection(selected_fields)
+    query, and_conditions = _job_filter_query(
+        current_user, mine, include_inactive,
+        location, company, type, category, work_type, experience_level,
+    )
+
+    # Ranked full-text search over active jobs; falls back to the regex scan
+    # when the index is not built yet or inactive jobs are requested.
+    ranked_ids: list[ObjectId] | None = None
+    filtered = bool(and_conditions) or bool(set(query) - {"is_active"})
+    search_index = text_search.get_index()
+    if q and search_index is not None and "is_active" in query and text_search.tokenize(q):
+        text_search.sync_recent_changes(jobs_collection)
+        with metrics.stage("text_search"):
+            hits = search_index.search(q, limit=None)
+        ranked_ids = [ObjectId(job_id) for job_id, _ in hits]
+    elif q:
+        and_conditions.append(_regex_search_condition(q))
 
     if and_conditions:
         query["$and"] = and_conditions
 
-    total = jobs_collection.count_documents(query)
-    total_pages = max(math.ceil(total / limit), 1)
-    skip = (page - 1) * limit
+    next_cursor = None
+    if ranked_ids is not None:
+        docs, total, next_cursor = _ranked_page(ranked_ids, query, page, limit, cursor, projection, filtered)
+    else:
+        count_query = dict(query)
+        if cursor or page == 1:
+            # Keyset: page N costs the same as page 1.
+            after = keyset_filter(cursor)
+            if after:
+                query["$and"] = query.get("$and", []) + [after]
+            skip = 0
+        else:
+            # Legacy page=N clients; cost grows with N.
+            skip = (page - 1) * limit
+        with metrics.stage("jobs_mongo"):
+            total = cached_count(jobs_collection, count_query) if include_total else None
+            docs, has_more = page_slice(
+                list(jobs_collection.find(query, projection).sort(KEYSET_SORT).skip(skip).limit(limit + 1)),
+                limit,
+            )
+        if has_more:
+            next_cursor = keyset_cursor(docs[-1])
+    total_pages = max(math.ceil(total / limit), 1) if total is not None else None
+
+    return _job_list_response(
+        docs,
+        selected_fields,
+        total=total,
+        page=page,
+        limit=limit,
+        total_pages=total_pages,
+        next_cursor=next_cursor,
+    )
+
 
-    docs = list(
-        jobs_collection.find(query)
-        .sort([("created_at", -1), ("created_date", -1)])
-        .skip(skip)
-        .limit(limit)
+@router.get("/semantic-search", response_model=JobListResponse)
+def semantic_search_jobs(
+    q: str = Query(..., min_length=1, max_length=semantic_search.MAX_QUERY_CHARS),
+    location: str | None = Query(default=None),
+    company: str | None = Query(default=None),
+    type: str | None = Query(default=None),
+    category: str | None = Query(default=None),
+    work_type: str | None = Query(default=None),
+    experience_level: str | None = Query(default=None),
+    mine: bool = Query(default=False),
+    page: int = Query(default=1, ge=1),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None),
+    fields: str | None = Query(default=None, description="Comma-separated job fields to return"),
+    compact: bool = Query(default=False, description="List-view subset of job fields"),
+    current_user: dict = Depends(get_current_user),
+):
+    """Jobs ranked by embedding similarity to `q`; same filters, paging and fieldsets as GET /jobs."""
+    if not semantic_search.normalize_query(q):
+        raise HTTPException(status_code=400, detail="Query must not be blank.")
+    selected_fields = parse_fields(fields, compact, JobResponse.model_fields, COMPACT_JOB_FIELDS, always=("id",))
+
+    # Only active jobs are embedded, so inactive ones can never be returned here.
+    query, and_conditions = _job_filter_query(
+        current_user, mine, False,
+        location, company, type, category, work_type, experience_level,
+    )
+
+    hits = semantic_search.search(q, limit=SEMANTIC_MAX_HITS)
+    if hits is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job index is warming up. Please try again shortly.",
+        )
+
+    ranked_ids = [ObjectId(job_id) for job_id, _ in hits if ObjectId.is_valid(job_id)]
+    if and_conditions:
+        query["$and"] = and_conditions
+
+    docs, total, next_cursor = _ranked_page(
+        ranked_ids, query, page, limit, cursor, _job_projection(selected_fields)
     )
-    items = [_normalize_job_doc(doc) for doc in docs]
 
-    return JobListResponse(items=items, total=total, page=page, limit=limit, total_pages=total_pages)
+    return _job_list_response(
+        docs,
+        selected_fields,
+        total=total,
+        page=page,
+        limit=limit,
+        total_pages=max(math.ceil(total / limit), 1),
+        next_cursor=next_cursor,
+    )
 
 
 @router.get("/{job_id}", response_model=JobResponse)
@@ -328,6 +429,36 @@ def get_job(job_id: str, current_user: dict = Depends(get_current_user)):
     return _normalize_job_doc(job)
 
 
+@router.get("/{job_id}/similar", response_model=list[JobResponse])
+def get_similar_jobs(
+    job_id: str,
+    limit: int = Query(default=similar_jobs.SIMILAR_JOBS_N, ge=1, le=similar_jobs.SIMILAR_JOBS_N),
+    current_user: dict = Depends(get_current_user),
+):
+    """Nearest active jobs by embedding, read from the precomputed neighbour table."""
+    _ = current_user
+    table = similar_jobs.get_table()
+    if table is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job index is warming up. Please try again shortly.",
+        )
+
+    neighbours = table.similar(job_id, limit)
+    if neighbours is None:
+        # Not embedded yet (created since the last reload) or not a job at all.
+        _get_job_or_404(job_id)
+        return []
+
+    neighbour_ids = [ObjectId(neighbour_id) for neighbour_id, _ in neighbours]
+    with metrics.stage("jobs_mongo"):
+        docs_by_id = {
+            doc["_id"]: doc
+            for doc in jobs_collection.find({"_id": {"$in": neighbour_ids}, "is_active": {"$ne": False}})
+        }
+    return [_normalize_job_doc(docs_by_id[oid]) for oid in neighbour_ids if oid in docs_by_id]
+
+
 @router.post("", response_model=JobResponse, status_code=status.HTTP_201_CREATED)
 def create_job(payload: JobCreate, current_user: dict = Depends(get_current_user)):
     _require_job_write_access(current_user)
@@ -341,7 +472,7 @@ def create_job(payload: JobCreate, current_user: dict = Depends(get_current_user
     payload_data = payload.dict()
     payload_data["company"] = company_value
     payload_data["source"] = payload.source.strip() if payload.source else "manual"
-    doc = _expand_job_storage_fields(payload_data)
+    doc = job_schema.canonicalize_job(_expand_job_storage_fields(payload_data))
     doc.update({
         "posted_by": {
             "user_id": current_user["id"],
@@ -351,13 +482,18 @@ def create_job(payload: JobCreate, current_user: dict = Depends(get_current_user
         },
         "is_active": True,
         "indexed": False,
+        "content_hash": job_content_hash(doc),
+        **job_skill_fields(doc),
         "created_date": now,
         "created_at": now,
         "updated_at": now,
     })
 
-    result = jobs_collection.insert_one(doc)
+    with metrics.stage("jobs_mongo"):
+        result = jobs_collection.insert_one(doc)
     doc["_id"] = result.inserted_id
+    text_search.apply_job(doc)
+    report_rollups.record_job_posted(doc["posted_by"], now)
     return _normalize_job_doc(doc)
 
 
@@ -376,9 +512,27 @@ def update_job(job_id: str, payload: JobUpdate, current_user: dict = Depends(get
 
     updates = _expand_job_storage_fields(raw_updates)
     updates["updated_at"] = datetime.utcnow()
-    jobs_collection.update_one({"_id": existing["_id"]}, {"$set": updates})
-
-    updated = jobs_collection.find_one({"_id": existing["_id"]})
+    # Canonicalize the merged job so derived fields (links, experience range) follow
+    # the edit; this also rewrites a job the schema migration has not reached yet.
+    canonical, legacy_fields = job_schema.canonical_job_update({**existing, **updates})
+    updates.update(canonical)
+
+    # Edits to embedded fields make the stored vector stale; flag the job for re-embedding.
+    previous_hash = existing.get("content_hash") or job_content_hash(existing)
+    new_hash = job_content_hash({**existing, **updates})
+    if new_hash != previous_hash:
+        updates["content_hash"] = new_hash
+        updates["indexed"] = False
+    if "skills" in raw_updates:
+        updates.update(job_skill_fields({**existing, **updates}))
+
+    update_doc = {"$set": updates}
+    if legacy_fields:
+        update_doc["$unset"] = legacy_fields
+    with metrics.stage("jobs_mongo"):
+        jobs_collection.update_one({"_id": existing["_id"]}, update_doc)
+        updated = jobs_collection.find_one({"_id": existing["_id"]})
+    text_search.apply_job(updated)
     return _normalize_job_doc(updated)
 
 
@@ -388,8 +542,10 @@ def delete_job(job_id: str, current_user: dict = Depends(get_current_user)):
     existing = _get_job_or_404(job_id)
     _ensure_job_owner_or_admin(existing, current_user)
 
-    jobs_collection.update_one(
-        {"_id": existing["_id"]},
-        {"$set": {"is_active": False, "updated_at": datetime.utcnow()}}
-    )
+    with metrics.stage("jobs_mongo"):
+        jobs_collection.update_one(
+            {"_id": existing["_id"]},
+            {"$set": {"is_active": False, "updated_at": datetime.utcnow()}}
+        )
+    text_search.remove_job(str(existing["_id"]))
     return {"status": "deleted"}
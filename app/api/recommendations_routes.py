@@ -1,12 +1,15 @@
-from datetime import datetime
 from typing import Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 
 from app.core.auth import get_current_user
-from app.core.database import recommendation_items_collection, recommendation_sessions_collection
+from app.repositories import recommendations as recommendations_repo
+from app.repositories import report_rollups as report_rollups_repo
+from app.services.job_cards import RECOMMENDATION_FIELDS
+from app.utils.fieldsets import COMPACT_RECOMMENDATION_FIELDS, parse_fields
+from app.utils.pagination import keyset_cursor, keyset_filter, page_slice
 
 router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
 
@@ -17,17 +20,21 @@ class NotApplyReasonRequest(BaseModel):
 
 
 @router.get("/latest")
-def get_latest_recommendations(current_user: dict = Depends(get_current_user)):
-    session = recommendation_sessions_collection.find_one(
-        {"user_id": current_user["id"]},
-        sort=[("created_at", -1)]
-    )
+async def get_latest_recommendations(
+    fields: Optional[str] = Query(default=None, description="Comma-separated snapshot fields to return"),
+    compact: bool = Query(default=False, description="List-view subset of snapshot fields"),
+    current_user: dict = Depends(get_current_user),
+):
+    selected_fields = parse_fields(fields, compact, RECOMMENDATION_FIELDS, COMPACT_RECOMMENDATION_FIELDS)
+    session = await recommendations_repo.latest_session(current_user["id"])
     if not session:
         return {"session": None, "items": []}
 
-    items = list(
-        recommendation_items_collection.find({"session_id": str(session["_id"])}).sort("rank", 1)
-    )
+    # Unselected snapshot fields are dropped by Mongo, so the long texts never leave the server.
+    projection = None
+    if selected_fields is not None:
+        projection = {f"snapshot.{name}": 0 for name in RECOMMENDATION_FIELDS if name not in selected_fields}
+    items = await recommendations_repo.items_for_session(str(session["_id"]), projection)
     for item in items:
         item["id"] = str(item.pop("_id"))
 
@@ -42,8 +49,32 @@ def get_latest_recommendations(current_user: dict = Depends(get_current_user)):
     }
 
 
+@router.get("/history")
+async def get_recommendation_history(
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None),
+    current_user: dict = Depends(get_current_user),
+):
+    sessions, has_more = page_slice(
+        await recommendations_repo.list_sessions(current_user["id"], keyset_filter(cursor), limit + 1),
+        limit,
+    )
+    return {
+        "items": [
+            {
+                "id": str(session["_id"]),
+                "filename": session.get("filename"),
+                "recommendation_count": session.get("recommendation_count", 0),
+                "created_at": session.get("created_at"),
+            }
+            for session in sessions
+        ],
+        "next_cursor": keyset_cursor(sessions[-1]) if has_more else None,
+    }
+
+
 @router.post("/{item_id}/not-apply-reason")
-def add_not_apply_reason(
+async def add_not_apply_reason(
     item_id: str,
     payload: NotApplyReasonRequest,
     current_user: dict = Depends(get_current_user),
@@ -51,19 +82,15 @@ def add_not_apply_reason(
     if not ObjectId.is_valid(item_id):
         raise HTTPException(status_code=400, detail="Invalid recommendation item id.")
 
-    result = recommendation_items_collection.update_one(
-        {"_id": ObjectId(item_id), "user_id": current_user["id"]},
-        {
-            "$set": {
-                "decision": "not_applied",
-                "decision_reason": payload.reason.strip(),
-                "decision_note": (payload.note or "").strip(),
-                "decision_at": datetime.utcnow(),
-            }
-        },
+    previous = await recommendations_repo.set_not_applied(
+        ObjectId(item_id),
+        current_user["id"],
+        payload.reason.strip(),
+        (payload.note or "").strip(),
     )
 
-    if result.matched_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Recommendation item not found.")
+    await report_rollups_repo.record_decision(current_user["id"], previous, "not_applied")
 
     return {"status": "saved"}
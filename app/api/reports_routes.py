@@ -1,16 +1,19 @@
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional
 
 from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.core.auth import get_current_admin
 from app.core.database import (
-    applications_collection,
     jobs_collection,
     recommendation_items_collection,
     users_collection,
 )
+from app.services import job_schema, report_rollups
+from app.services.job_schema import job_field
+from app.utils.exports import EXPORT_CHUNK_ROWS, ExportFormat, batched, stream_rows
+from app.utils.pagination import cached_count
 
 router = APIRouter(prefix="/admin/reports", tags=["Reports"])
 
@@ -42,52 +45,72 @@ def _parse_dt(raw: Optional[str], end_of_day: bool = False) -> Optional[datetime
     return dt
 
 
+def _parse_day(raw: Optional[str], end_of_day: bool = False) -> Optional[datetime]:
+    """Rollup-backed reports count whole UTC days, so `from` / `to` must be plain dates."""
+    if not raw:
+        return None
+    try:
+        day = date.fromisoformat(raw)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid date: {raw}. This report counts whole UTC days; use YYYY-MM-DD.",
+        )
+    dt = datetime(day.year, day.month, day.day)
+    if end_of_day:
+        return dt + timedelta(days=1) - timedelta(microseconds=1)
+    return dt
+
+
+DAY_FROM = Query(default=None, alias="from", description="First UTC day, YYYY-MM-DD")
+DAY_TO = Query(default=None, alias="to", description="Last UTC day (inclusive), YYYY-MM-DD")
+
+
 @router.get("/overview")
 def overview(
-    from_date: Optional[str] = Query(default=None, alias="from"),
-    to_date: Optional[str] = Query(default=None, alias="to"),
+    from_date: Optional[str] = DAY_FROM,
+    to_date: Optional[str] = DAY_TO,
     current_admin: dict = Depends(get_current_admin),
 ):
     _ = current_admin
-    from_dt = _parse_dt(from_date)
-    to_dt = _parse_dt(to_date, end_of_day=True)
-    app_filter = _date_filter("created_at", from_dt, to_dt)
-    rec_filter = _date_filter("created_at", from_dt, to_dt)
+    from_dt = _parse_day(from_date)
+    to_dt = _parse_day(to_date, end_of_day=True)
 
-    total_candidates = users_collection.count_documents({"role": "job_seeker"})
-    total_employers = users_collection.count_documents({"role": "employer"})
-    active_jobs = jobs_collection.count_documents({"is_active": {"$ne": False}})
+    # Current-state counts are not date-ranged; a short-TTL cached count is enough.
+    total_candidates = cached_count(users_collection, {"role": "job_seeker"})
+    total_employers = cached_count(users_collection, {"role": "employer"})
+    active_jobs = cached_count(jobs_collection, {"is_active": {"$ne": False}})
 
-    total_recommendations = recommendation_items_collection.count_documents(rec_filter)
-    total_applications = applications_collection.count_documents(app_filter)
+    events = report_rollups.global_totals(from_dt, to_dt)
+    total_recommendations = events.get("recommended", 0)
+    total_applications = events.get("applied", 0)
     conversion_rate = round((total_applications / total_recommendations) * 100, 2) if total_recommendations else 0.0
 
-    top_jobs = list(
-        applications_collection.aggregate(
-            [
-                {"$match": app_filter if app_filter else {}},
-                {"$group": {"_id": "$job_id", "applications": {"$sum": 1}}},
-                {"$sort": {"applications": -1}},
-                {"$limit": 5},
-            ]
+    top_jobs = [
+        (row["_id"], row["applied"])
+        for row in report_rollups.totals_cursor(
+            "job", from_dt, to_dt, having={"applied": {"$gt": 0}}, sort={"applied": -1}, limit=5
         )
-    )
+    ]
 
-    job_ids = [x["_id"] for x in top_jobs if ObjectId.is_valid(x["_id"])]
+    job_ids = [job_id for job_id, _ in top_jobs if ObjectId.is_valid(job_id)]
     jobs_map = {
         str(job["_id"]): job
-        for job in jobs_collection.find({"_id": {"$in": [ObjectId(x) for x in job_ids]}})
+        for job in jobs_collection.find(
+            {"_id": {"$in": [ObjectId(x) for x in job_ids]}},
+            {name: 1 for name in job_schema.fields("title", "company")},
+        )
     }
 
     top_jobs_payload = []
-    for row in top_jobs:
-        job = jobs_map.get(row["_id"], {})
+    for job_id, applications in top_jobs:
+        job = jobs_map.get(job_id, {})
         top_jobs_payload.append(
             {
-                "job_id": row["_id"],
-                "title": job.get("title") or job.get("Job Title", ""),
-                "company": job.get("company") or job.get("Company Name", ""),
-                "applications": row["applications"],
+                "job_id": job_id,
+                "title": job_field(job, "title", ""),
+                "company": job_field(job, "company", ""),
+                "applications": applications,
             }
         )
 
@@ -102,95 +125,115 @@ def overview(
     }
 
 
-@router.get("/candidates")
-def candidates_report(
-    from_date: Optional[str] = Query(default=None, alias="from"),
-    to_date: Optional[str] = Query(default=None, alias="to"),
-    current_admin: dict = Depends(get_current_admin),
-):
-    _ = current_admin
-    from_dt = _parse_dt(from_date)
-    to_dt = _parse_dt(to_date, end_of_day=True)
-    rec_filter = _date_filter("created_at", from_dt, to_dt)
-    app_filter = _date_filter("created_at", from_dt, to_dt)
-
-    rec_pipeline = [
-        {"$match": rec_filter if rec_filter else {}},
-        {
-            "$group": {
-                "_id": "$user_id",
-                "recommended": {"$sum": 1},
-                "not_applied": {
-                    "$sum": {"$cond": [{"$eq": ["$decision", "not_applied"]}, 1, 0]}
-                },
-            }
-        },
-    ]
-    app_pipeline = [
-        {"$match": app_filter if app_filter else {}},
-        {"$group": {"_id": "$user_id", "applied": {"$sum": 1}}},
-    ]
+CANDIDATE_COLUMNS = ("user_id", "email", "full_name", "recommended", "applied", "not_applied")
+EMPLOYER_COLUMNS = ("user_id", "company_name", "email", "jobs_posted")
+NOT_APPLY_REASON_COLUMNS = ("reason", "count")
 
-    rec_rows = {x["_id"]: x for x in recommendation_items_collection.aggregate(rec_pipeline)}
-    app_rows = {x["_id"]: x for x in applications_collection.aggregate(app_pipeline)}
 
-    user_ids = list(set(list(rec_rows.keys()) + list(app_rows.keys())))
-    users = list(users_collection.find({"_id": {"$in": [ObjectId(x) for x in user_ids if ObjectId.is_valid(x)]}}))
-    users_map = {str(u["_id"]): u for u in users}
+def _export_filename(name: str, from_date: Optional[str], to_date: Optional[str]) -> str:
+    return "-".join(part for part in (name, from_date, to_date) if part)
 
-    report = []
-    for uid in user_ids:
-        rec = rec_rows.get(uid, {})
-        app = app_rows.get(uid, {})
-        u = users_map.get(uid, {})
-        report.append(
-            {
-                "user_id": uid,
+
+def _candidate_rows(from_dt: Optional[datetime], to_dt: Optional[datetime]) -> Iterator[dict]:
+    """Candidates by recommendations, sorted by Mongo; user details are fetched one cursor batch at a time."""
+    cursor = report_rollups.totals_cursor(
+        "user", from_dt, to_dt,
+        having={"$or": [{"recommended": {"$gt": 0}}, {"applied": {"$gt": 0}}]},
+        sort={"recommended": -1},
+        batch_size=EXPORT_CHUNK_ROWS,
+    )
+    for batch in batched(cursor, EXPORT_CHUNK_ROWS):
+        user_ids = [ObjectId(row["_id"]) for row in batch if ObjectId.is_valid(row["_id"])]
+        users_map = {
+            str(u["_id"]): u
+            for u in users_collection.find({"_id": {"$in": user_ids}}, {"email": 1, "full_name": 1})
+        }
+        for row in batch:
+            u = users_map.get(row["_id"], {})
+            yield {
+                "user_id": row["_id"],
                 "email": u.get("email", ""),
                 "full_name": u.get("full_name", ""),
-                "recommended": rec.get("recommended", 0),
-                "applied": app.get("applied", 0),
-                "not_applied": rec.get("not_applied", 0),
+                "recommended": row["recommended"],
+                "applied": row["applied"],
+                "not_applied": row["not_applied"],
             }
-        )
 
-    report.sort(key=lambda x: x["recommended"], reverse=True)
-    return report
+
+def _employer_rows(from_dt: Optional[datetime], to_dt: Optional[datetime]) -> Iterator[dict]:
+    cursor = report_rollups.totals_cursor(
+        "employer", from_dt, to_dt,
+        having={"jobs_posted": {"$gt": 0}},
+        sort={"jobs_posted": -1},
+        batch_size=EXPORT_CHUNK_ROWS,
+    )
+    for row in cursor:
+        yield {
+            "company_name": row.get("company_name"),
+            "email": row.get("email"),
+            "jobs_posted": row["jobs_posted"],
+            "user_id": row["_id"],
+        }
+
+
+def _not_apply_reason_rows(from_dt: Optional[datetime], to_dt: Optional[datetime]) -> Iterator[dict]:
+    query = {"decision": "not_applied"}
+    query.update(_date_filter("decision_at", from_dt, to_dt))
+    cursor = recommendation_items_collection.aggregate(
+        [
+            {"$match": query},
+            {"$group": {"_id": "$decision_reason", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+        ],
+        allowDiskUse=True,
+        batchSize=EXPORT_CHUNK_ROWS,
+    )
+    for row in cursor:
+        yield {"reason": row["_id"] or "Unspecified", "count": row["count"]}
+
+
+@router.get("/candidates")
+def candidates_report(
+    from_date: Optional[str] = DAY_FROM,
+    to_date: Optional[str] = DAY_TO,
+    current_admin: dict = Depends(get_current_admin),
+):
+    _ = current_admin
+    return list(_candidate_rows(_parse_day(from_date), _parse_day(to_date, end_of_day=True)))
+
+
+@router.get("/candidates/export")
+def export_candidates_report(
+    from_date: Optional[str] = DAY_FROM,
+    to_date: Optional[str] = DAY_TO,
+    fmt: ExportFormat = Query(default="csv", alias="format"),
+    current_admin: dict = Depends(get_current_admin),
+):
+    _ = current_admin
+    rows = _candidate_rows(_parse_day(from_date), _parse_day(to_date, end_of_day=True))
+    return stream_rows(rows, CANDIDATE_COLUMNS, fmt, _export_filename("candidates", from_date, to_date))
 
 
 @router.get("/employers")
 def employers_report(
-    from_date: Optional[str] = Query(default=None, alias="from"),
-    to_date: Optional[str] = Query(default=None, alias="to"),
+    from_date: Optional[str] = DAY_FROM,
+    to_date: Optional[str] = DAY_TO,
     current_admin: dict = Depends(get_current_admin),
 ):
     _ = current_admin
-    from_dt = _parse_dt(from_date)
-    to_dt = _parse_dt(to_date, end_of_day=True)
-    date_filter = _date_filter("created_at", from_dt, to_dt)
-    query = {"posted_by.role": "employer"}
-    query.update(date_filter)
-
-    rows = list(
-        jobs_collection.aggregate(
-            [
-                {"$match": query},
-                {
-                    "$group": {
-                        "_id": "$posted_by.user_id",
-                        "company_name": {"$first": "$posted_by.company_name"},
-                        "email": {"$first": "$posted_by.email"},
-                        "jobs_posted": {"$sum": 1},
-                    }
-                },
-                {"$sort": {"jobs_posted": -1}},
-            ]
-        )
-    )
+    return list(_employer_rows(_parse_day(from_date), _parse_day(to_date, end_of_day=True)))
 
-    for row in rows:
-        row["user_id"] = row.pop("_id")
-    return rows
+
+@router.get("/employers/export")
+def export_employers_report(
+    from_date: Optional[str] = DAY_FROM,
+    to_date: Optional[str] = DAY_TO,
+    fmt: ExportFormat = Query(default="csv", alias="format"),
+    current_admin: dict = Depends(get_current_admin),
+):
+    _ = current_admin
+    rows = _employer_rows(_parse_day(from_date), _parse_day(to_date, end_of_day=True))
+    return stream_rows(rows, EMPLOYER_COLUMNS, fmt, _export_filename("employers", from_date, to_date))
 
 
 @router.get("/not-apply-reasons")
@@ -200,20 +243,18 @@ def not_apply_reasons(
     current_admin: dict = Depends(get_current_admin),
 ):
     _ = current_admin
-    from_dt = _parse_dt(from_date)
-    to_dt = _parse_dt(to_date, end_of_day=True)
-    date_filter = _date_filter("decision_at", from_dt, to_dt)
-    query = {"decision": "not_applied"}
-    query.update(date_filter)
-
-    rows = list(
-        recommendation_items_collection.aggregate(
-            [
-                {"$match": query},
-                {"$group": {"_id": "$decision_reason", "count": {"$sum": 1}}},
-                {"$sort": {"count": -1}},
-            ]
-        )
-    )
+    return list(_not_apply_reason_rows(_parse_dt(from_date), _parse_dt(to_date, end_of_day=True)))
+
 
-    return [{"reason": row["_id"] or "Unspecified", "count": row["count"]} for row in rows]
+@router.get("/not-apply-reasons/export")
+def export_not_apply_reasons(
+    from_date: Optional[str] = Query(default=None, alias="from"),
+    to_date: Optional[str] = Query(default=None, alias="to"),
+    fmt: ExportFormat = Query(default="csv", alias="format"),
+    current_admin: dict = Depends(get_current_admin),
+):
+    _ = current_admin
+    rows = _not_apply_reason_rows(_parse_dt(from_date), _parse_dt(to_date, end_of_day=True))
+    return stream_rows(
+        rows, NOT_APPLY_REASON_COLUMNS, fmt, _export_filename("not-apply-reasons", from_date, to_date)
+    )
@@ -1,24 +1,46 @@
 from datetime import datetime
+import math
 import os
-import tempfile
 
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
+from app.core import metrics
 from app.core.auth import get_current_admin, get_current_user
-from app.core.database import (
-    recommendation_items_collection,
-    recommendation_sessions_collection,
-    users_collection,
-)
-from app.services.drive_service import delete_resume, list_resumes, upload_to_drive
+from app.repositories import recommendations as recommendations_repo
+from app.repositories import report_rollups as report_rollups_repo
+from app.repositories import users as users_repo
+from app.services import job_cards
+from app.services.drive_service import delete_resume, list_resumes, upload_bytes_to_drive
 from app.services.index_builder import incremental_index_new_jobs
 from app.services.index_manager import reload_index_and_jobs
 from app.services.recommender import recommend_jobs
-from app.services.resume_parser import parse_resume_file
+from app.services.resume_parser import parse_resume_bytes
+from app.utils.file_reader import EXTRACTION_TIMEOUT_SECONDS
+from app.utils.fieldsets import COMPACT_RECOMMENDATION_FIELDS, parse_fields
 
 router = APIRouter()
 
+MAX_RESUME_UPLOAD_BYTES = int(os.getenv("MAX_RESUME_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+_UPLOAD_CHUNK_BYTES = 64 * 1024
+
+
+async def _read_upload_bounded(file: UploadFile, max_bytes: int) -> bytes:
+    """Read an upload once into memory, rejecting it as soon as it exceeds max_bytes."""
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(_UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+        if len(buffer) > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Resume exceeds the {max_bytes // (1024 * 1024)} MB upload limit.",
+            )
+    return bytes(buffer)
+
 
 class DeleteRequest(BaseModel):
     key: str
@@ -27,35 +49,56 @@ class DeleteRequest(BaseModel):
 @router.post("/recommend")
 async def recommend(
     file: UploadFile = File(...),
+    fields: str | None = Query(default=None, description="Comma-separated recommendation fields to return"),
+    compact: bool = Query(default=False, description="List-view subset of recommendation fields"),
     current_user: dict = Depends(get_current_user),
 ):
-    suffix = os.path.splitext(file.filename)[1]
-
-    data = await file.read()
-    await file.close()
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        tmp.write(data)
-        tmp_path = tmp.name
-
-    resume_text = parse_resume_file(tmp_path)
-    drive_file_id = upload_to_drive(tmp_path, file.filename, delete_after=True)
-
-    users_collection.update_one(
-        {"email": current_user["email"]},
-        {
-            "$set": {
-                "resume": {
-                    "drive_file_id": drive_file_id,
-                    "filename": file.filename,
-                    "uploaded_at": datetime.utcnow(),
-                },
-                "updated_at": datetime.utcnow(),
-            }
-        },
+    selected_fields = parse_fields(
+        fields, compact, job_cards.RECOMMENDATION_FIELDS, COMPACT_RECOMMENDATION_FIELDS,
+        always=("job_id", "recommendation_item_id"),
     )
-
-    results = recommend_jobs(resume_text)
+    try:
+        data = await _read_upload_bounded(file, MAX_RESUME_UPLOAD_BYTES)
+    finally:
+        await file.close()
+
+    # One in-memory buffer feeds both extraction and archival; nothing touches disk.
+    # Blocking work (extraction wait, Drive upload, scoring) runs in the threadpool
+    # so the event loop keeps serving other requests meanwhile.
+    with metrics.stage("extraction"):
+        resume_text, extraction = await run_in_threadpool(parse_resume_bytes, data, file.filename)
+    if extraction.get("queue_full"):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many resumes are being processed. Please retry shortly.",
+            headers={"Retry-After": str(math.ceil(EXTRACTION_TIMEOUT_SECONDS))},
+        )
+    # Partial text is still usable; an empty resume must not replace the stored one.
+    if not resume_text:
+        detail = "No text could be extracted from the resume."
+        if extraction.get("timed_out"):
+            detail = "Reading the resume took too long. Try a shorter or simpler file."
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
+
+    with metrics.stage("drive_upload"):
+        drive_file_id = await run_in_threadpool(upload_bytes_to_drive, data, file.filename)
+
+    with metrics.stage("mongo_write"):
+        await users_repo.update_by_email(
+            current_user["email"],
+            {
+                "$set": {
+                    "resume": {
+                        "drive_file_id": drive_file_id,
+                        "filename": file.filename,
+                        "uploaded_at": datetime.utcnow(),
+                    },
+                    "updated_at": datetime.utcnow(),
+                }
+            },
+        )
+
+    results = await run_in_threadpool(recommend_jobs, resume_text, extraction["text"])
     if isinstance(results, dict) and results.get("error"):
         return results
 
@@ -67,34 +110,42 @@ async def recommend(
         "recommendation_count": len(results),
         "created_at": datetime.utcnow(),
     }
-    session_result = recommendation_sessions_collection.insert_one(session_doc)
-    session_id = str(session_result.inserted_id)
-
-    enriched_results = []
-    for rank, rec in enumerate(results, start=1):
-        item_doc = {
-            "session_id": session_id,
-            "user_id": current_user["id"],
-            "job_id": rec.get("job_id"),
-            "rank": rank,
-            "match_percentage": rec.get("match_percentage"),
-            "decision": "pending",
-            "snapshot": rec,
-            "created_at": datetime.utcnow(),
-        }
-        item_result = recommendation_items_collection.insert_one(item_doc)
-
-        rec_copy = dict(rec)
-        rec_copy["recommendation_item_id"] = str(item_result.inserted_id)
-        enriched_results.append(rec_copy)
-
-    return {
-        "session_id": session_id,
-        "resume_drive_file_id": drive_file_id,
-        "filename": file.filename,
-        "no. of recommendations": len(enriched_results),
-        "recommendations": enriched_results,
-    }
+    with metrics.stage("mongo_write"):
+        session_id = str(await recommendations_repo.create_session(session_doc))
+
+        item_docs = [
+            {
+                "session_id": session_id,
+                "user_id": current_user["id"],
+                "job_id": rec.get("job_id"),
+                "rank": rank,
+                "match_percentage": rec.get("match_percentage"),
+                "decision": "pending",
+                "snapshot": rec,
+                "created_at": datetime.utcnow(),
+            }
+            for rank, rec in enumerate(results, start=1)
+        ]
+        item_ids = await recommendations_repo.insert_items(item_docs)
+        await report_rollups_repo.record_recommendations(
+            current_user["id"], [rec.get("job_id") for rec in results], session_doc["created_at"]
+        )
+
+    # Cards are pre-encoded per job; only match_percentage and the item id are encoded here.
+    with metrics.stage("serialize"):
+        body = job_cards.render_recommendations(
+            {
+                "session_id": session_id,
+                "resume_drive_file_id": drive_file_id,
+                "filename": file.filename,
+                "no. of recommendations": len(results),
+            },
+            "recommendations",
+            results,
+            item_ids,
+            fields=selected_fields,
+        )
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/resumes")
@@ -118,5 +169,7 @@ def reload_index(current_admin: dict = Depends(get_current_admin)):
     return {
         "status": "reloaded",
         "indexed_count": index_result["indexed_count"],
+        "reindexed_count": index_result["reindexed_count"],
+        "changed_count": index_result["changed_count"],
         "index_status": index_result["status"],
     }
@@ -4,8 +4,8 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
-from app.core.auth import get_current_user
-from app.core.user_db import users_collection
+from app.core.auth import get_current_user, invalidate_user
+from app.repositories import users as users_repo
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -40,8 +40,8 @@ def _serialize_user(user: dict) -> dict:
 
 
 @router.get("/profile")
-def get_profile(current_user: dict = Depends(get_current_user)):
-    user = users_collection.find_one({"email": current_user["email"]}, {"password": 0})
+async def get_profile(current_user: dict = Depends(get_current_user)):
+    user = await users_repo.find_by_email(current_user["email"], {"password": 0})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -49,7 +49,7 @@ def get_profile(current_user: dict = Depends(get_current_user)):
 
 
 @router.patch("/profile")
-def update_profile(payload: UserProfileUpdate, current_user: dict = Depends(get_current_user)):
+async def update_profile(payload: UserProfileUpdate, current_user: dict = Depends(get_current_user)):
     updates = {}
 
     if payload.full_name is not None:
@@ -67,7 +67,8 @@ def update_profile(payload: UserProfileUpdate, current_user: dict = Depends(get_
         return {"status": "no_changes"}
 
     updates["updated_at"] = datetime.utcnow()
-    users_collection.update_one({"email": current_user["email"]}, {"$set": updates})
+    await users_repo.update_by_email(current_user["email"], {"$set": updates})
+    invalidate_user(current_user["email"])
 
-    user = users_collection.find_one({"email": current_user["email"]}, {"password": 0})
+    user = await users_repo.find_by_email(current_user["email"], {"password": 0})
     return _serialize_user(user)
@@ -1,4 +1,9 @@
+import asyncio
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -7,6 +12,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from passlib.context import CryptContext
 import dotenv
 
+from app.core import metrics
+
 dotenv.load_dotenv()
 
 # JWT Configuration
@@ -14,10 +21,34 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# Resolved principals are cached per worker so authenticated requests skip the
+# users lookup. Profile / status / approval changes invalidate the entry on
+# this worker; other workers pick the change up within the TTL.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+# When > 0, tokens younger than this many seconds are trusted for role/status
+# without any lookup. Approval changes then take up to this long to apply.
+TRUST_TOKEN_CLAIMS_SECONDS = int(os.getenv("TRUST_TOKEN_CLAIMS_SECONDS", "0"))
+# bcrypt is deliberately slow CPU work. It runs on its own small pool, sized
+# apart from the request threadpool, so a login burst queues here instead of
+# stalling the event loop or starving other requests. bcrypt releases the GIL,
+# so the pool scales with cores.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hash/verify jobs allowed to wait for a worker before logins are shed with 503.
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+_PRINCIPAL_FIELDS = {"email": 1, "role": 1, "status": 1, "is_active": 1, "company_name": 1}
+
 # HTTP Bearer for token extraction
 security = HTTPBearer()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+_password_pool = None
+_password_pool_lock = threading.Lock()
+_password_pending = 0
+
+_user_cache: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+_user_cache_lock = threading.Lock()
+
 
 def _normalize_role(role: Optional[str]) -> str:
     if role == "admin":
@@ -41,6 +72,46 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _get_password_pool() -> ThreadPoolExecutor:
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is None:
+            _password_pool = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+            )
+        return _password_pool
+
+
+async def _run_password_job(fn, *args):
+    global _password_pending
+    with _password_pool_lock:
+        if _password_pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_PENDING:
+            metrics.PASSWORD_HASH_REJECTED.inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests. Please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+        _password_pending += 1
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_password_pool(), fn, *args)
+    finally:
+        with _password_pool_lock:
+            _password_pending -= 1
+        metrics.PASSWORD_HASH_SECONDS.observe(time.perf_counter() - start, operation=fn.__name__)
+
+
+async def verify_password_async(plain_password: str, stored_password: str) -> bool:
+    """verify_password on the password pool; use from async routes."""
+    return await _run_password_job(verify_password, plain_password, stored_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the password pool; use from async routes."""
+    return await _run_password_job(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -50,7 +121,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
     return encoded_jwt
@@ -69,6 +140,85 @@ def decode_access_token(token: str) -> dict:
         )
 
 
+def _principal_from_user(user: dict) -> dict:
+    return {
+        "id": str(user["_id"]),
+        "email": user["email"],
+        "role": _normalize_role(user.get("role")),
+        "status": user.get("status", "active"),
+        "is_active": bool(user.get("is_active", user.get("status", "active") == "active")),
+        "company_name": user.get("company_name"),
+    }
+
+
+def principal_claims(user: dict) -> dict:
+    """Token claims for `user`; role/status claims are only trusted under TRUST_TOKEN_CLAIMS_SECONDS."""
+    principal = _principal_from_user(user)
+    return {
+        "sub": principal["email"],
+        "uid": principal["id"],
+        "role": principal["role"],
+        "status": principal["status"],
+        "is_active": principal["is_active"],
+        "company_name": principal["company_name"],
+    }
+
+
+def _principal_from_claims(payload: dict) -> Optional[dict]:
+    if TRUST_TOKEN_CLAIMS_SECONDS <= 0:
+        return None
+    issued_at = payload.get("iat")
+    if not isinstance(issued_at, (int, float)) or time.time() - issued_at > TRUST_TOKEN_CLAIMS_SECONDS:
+        return None
+    if not all(key in payload for key in ("uid", "role", "status", "is_active")):
+        return None
+    return {
+        "id": payload["uid"],
+        "email": payload["sub"],
+        "role": _normalize_role(payload["role"]),
+        "status": payload["status"],
+        "is_active": bool(payload["is_active"]),
+        "company_name": payload.get("company_name"),
+    }
+
+
+def _cached_principal(email: str) -> Optional[dict]:
+    now = time.monotonic()
+    with _user_cache_lock:
+        entry = _user_cache.get(email)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at <= now:
+            del _user_cache[email]
+            return None
+        _user_cache.move_to_end(email)
+        return dict(principal)
+
+
+def _cache_principal(principal: dict):
+    if USER_CACHE_TTL_SECONDS <= 0:
+        return
+    with _user_cache_lock:
+        _user_cache[principal["email"]] = (time.monotonic() + USER_CACHE_TTL_SECONDS, dict(principal))
+        _user_cache.move_to_end(principal["email"])
+        while len(_user_cache) > USER_CACHE_MAX_ENTRIES:
+            _user_cache.popitem(last=False)
+
+
+def invalidate_user(email: Optional[str]):
+    """Drop a cached principal after its role, status or profile changed."""
+    if not email:
+        return
+    with _user_cache_lock:
+        _user_cache.pop(email, None)
+
+
+def clear_user_cache():
+    with _user_cache_lock:
+        _user_cache.clear()
+
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Dependency to get the current authenticated user from token"""
     token = credentials.credentials
@@ -83,10 +233,19 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    principal = _principal_from_claims(payload)
+    if principal is not None:
+        return principal
+
+    principal = _cached_principal(email)
+    metrics.record_cache("user", principal is not None)
+    if principal is not None:
+        return principal
+
     # Late import avoids circular dependency.
-    from app.core.user_db import users_collection
+    from app.repositories import users as users_repo
 
-    user = users_collection.find_one({"email": email})
+    user = await users_repo.find_by_email(email, _PRINCIPAL_FIELDS)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -94,14 +253,9 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return {
-        "id": str(user["_id"]),
-        "email": user["email"],
-        "role": _normalize_role(user.get("role")),
-        "status": user.get("status", "active"),
-        "is_active": bool(user.get("is_active", user.get("status", "active") == "active")),
-        "company_name": user.get("company_name"),
-    }
+    principal = _principal_from_user(user)
+    _cache_principal(principal)
+    return principal
 
 
 async def get_current_admin(current_user: dict = Depends(get_current_user)) -> dict:
@@ -1,7 +1,9 @@
 import os
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient
 import dotenv 
 
+from app.core.mongo_monitor import MONITOR
+
 dotenv.load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
@@ -11,29 +13,72 @@ if not MONGO_URI:
 
 DB_NAME = "job_recommendation"
 
-client = MongoClient(MONGO_URI)
+# Pool settings shared by both clients. A bounded wait queue makes a saturated
+# pool fail fast instead of piling requests up behind it.
+POOL_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "5")),
+    "maxConnecting": int(os.getenv("MONGO_MAX_CONNECTING", "4")),
+    "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+    "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000")),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "10000")),
+}
+
+# connect=False defers the first network round trip to the first query.
+client = MongoClient(MONGO_URI, connect=False, event_listeners=[MONITOR], **POOL_OPTIONS)
+MONITOR.attach(client)
 db = client[DB_NAME]
 
-jobs_collection = db["jobs"]
-jobs_collection.create_index([("is_active", 1)])
-jobs_collection.create_index([("posted_by.user_id", 1), ("is_active", 1)])
-jobs_collection.create_index([("created_at", -1)])
+# Async client for `async def` routes (see app/repositories). It binds to the
+# serving event loop on first use; sync routes, services and tools keep `client`.
+async_client = AsyncMongoClient(MONGO_URI, connect=False, event_listeners=[MONITOR], **POOL_OPTIONS)
+async_db = async_client[DB_NAME]
 
+jobs_collection = db["jobs"]
 users_collection = db["users"]
-users_collection.create_index([("email", 1)], unique=True)
-users_collection.create_index([("role", 1), ("status", 1)])
-users_collection.create_index([("is_active", 1), ("role", 1)])
-users_collection.create_index([("reset_password.otp_hash", 1)], sparse=True)
-
 applications_collection = db["applications"]
-applications_collection.create_index([("user_id", 1), ("job_id", 1)], unique=True)
-applications_collection.create_index([("user_id", 1), ("created_at", -1)])
-applications_collection.create_index([("job_id", 1), ("created_at", -1)])
-
 recommendation_sessions_collection = db["recommendation_sessions"]
-recommendation_sessions_collection.create_index([("user_id", 1), ("created_at", -1)])
-
 recommendation_items_collection = db["recommendation_items"]
-recommendation_items_collection.create_index([("session_id", 1), ("rank", 1)])
-recommendation_items_collection.create_index([("user_id", 1), ("created_at", -1)])
-recommendation_items_collection.create_index([("job_id", 1), ("created_at", -1)])
+# Progress markers for data migrations and backfills (tools/migrate_*.py, report rollups).
+migrations_collection = db["migrations"]
+# Daily report counters per user / job / employer (app/services/report_rollups.py).
+report_rollups_collection = db["report_rollups"]
+
+async_jobs_collection = async_db["jobs"]
+async_users_collection = async_db["users"]
+async_applications_collection = async_db["applications"]
+async_recommendation_sessions_collection = async_db["recommendation_sessions"]
+async_recommendation_items_collection = async_db["recommendation_items"]
+async_report_rollups_collection = async_db["report_rollups"]
+
+
+def ensure_indexes():
+    """Create collection indexes. Called once from the app startup phase, not at import."""
+    jobs_collection.create_index([("is_active", 1)])
+    jobs_collection.create_index([("posted_by.user_id", 1), ("is_active", 1)])
+    jobs_collection.create_index([("created_at", -1)])
+    # Search index catch-up reads jobs changed since its last sync.
+    jobs_collection.create_index([("updated_at", 1)])
+    # Keyset pagination sorts on (created_at, _id).
+    jobs_collection.create_index([("is_active", 1), ("created_at", -1), ("_id", -1)])
+
+    users_collection.create_index([("email", 1)], unique=True)
+    users_collection.create_index([("role", 1), ("status", 1)])
+    users_collection.create_index([("is_active", 1), ("role", 1)])
+    users_collection.create_index([("reset_password.otp_hash", 1)], sparse=True)
+
+    applications_collection.create_index([("user_id", 1), ("job_id", 1)], unique=True)
+    applications_collection.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
+    applications_collection.create_index([("job_id", 1), ("created_at", -1)])
+    # Rollup reconciliation re-aggregates recent days.
+    applications_collection.create_index([("created_at", 1)])
+
+    recommendation_sessions_collection.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)])
+
+    recommendation_items_collection.create_index([("session_id", 1), ("rank", 1)])
+    recommendation_items_collection.create_index([("user_id", 1), ("created_at", -1)])
+    recommendation_items_collection.create_index([("job_id", 1), ("created_at", -1)])
+    recommendation_items_collection.create_index([("created_at", 1)])
+
+    # Reports sum one scope's daily buckets over a date range.
+    report_rollups_collection.create_index([("scope", 1), ("day", 1), ("key", 1)])
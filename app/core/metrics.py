@@ -0,0 +1,234 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.core import profiling
+
+# Minimal in-process metrics with Prometheus text exposition. Each update is a
+# dict lookup and an add under a lock, cheap enough to leave on in production.
+# Metrics are per worker process.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values: dict[tuple, float] = {}
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        return self._header() + [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in values.items()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., +Inf count, sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [0] * (len(self.buckets) + 1) + [0.0]
+                self._series[key] = series
+            series[slot] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+
+        lines = self._header()
+        for key, values in series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, (('le', _format_value(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {values[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._register(Counter(name, documentation))
+
+    def gauge(self, name: str, documentation: str) -> Gauge:
+        return self._register(Gauge(name, documentation))
+
+    def histogram(self, name: str, documentation: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ---------------- Application metrics ----------------
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template, method and status."
+)
+PIPELINE_STAGE_SECONDS = REGISTRY.histogram(
+    "pipeline_stage_duration_seconds", "Latency of each recommendation / jobs pipeline stage."
+)
+CACHE_REQUESTS = REGISTRY.counter("cache_requests_total", "Cache lookups by cache name and result (hit/miss).")
+INDEX_RELOADS = REGISTRY.counter("index_reloads_total", "FAISS index + jobs reloads by result.")
+INDEX_RELOAD_SECONDS = REGISTRY.histogram(
+    "index_reload_duration_seconds", "Duration of FAISS index + jobs reloads.", buckets=(1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+INDEX_VECTORS = REGISTRY.gauge("index_vectors", "Vectors in the live FAISS index (including orphaned ones).")
+INDEX_ORPHANED_VECTORS = REGISTRY.gauge("index_orphaned_vectors", "FAISS vectors not mapped to any live job.")
+JOBS_LOADED = REGISTRY.gauge("jobs_loaded", "Active jobs in the live job snapshot.")
+EXTRACTION_QUEUE_DEPTH = REGISTRY.gauge(
+    "extraction_queue_depth", "Document extractions submitted to the worker pool and not yet finished."
+)
+EXTRACTION_RESULTS = REGISTRY.counter("extraction_results_total", "Document extractions by outcome.")
+PASSWORD_HASH_SECONDS = REGISTRY.histogram(
+    "password_hash_duration_seconds", "bcrypt hash/verify latency including time queued for a worker."
+)
+PASSWORD_HASH_REJECTED = REGISTRY.counter(
+    "password_hash_rejected_total", "Auth requests shed because the password hashing queue was full."
+)
+MONGO_COMMAND_SECONDS = REGISTRY.histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by command, collection and outcome."
+)
+
+
+# Per-request stage totals (seconds), set by the request middleware and
+# surfaced as the Server-Timing header. None outside a request.
+_request_timings: ContextVar = ContextVar("request_timings", default=None)
+
+
+def begin_request_timings():
+    """Start collecting stage timings for the current request. Returns a reset token."""
+    return _request_timings.set({})
+
+
+def end_request_timings(token) -> dict:
+    timings = _request_timings.get() or {}
+    _request_timings.reset(token)
+    return timings
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time one pipeline stage into pipeline_stage_duration_seconds and, inside
+    a request, into that request's Server-Timing breakdown.
+    """
+    start = time.perf_counter()
+    try:
+        with profiling.track_thread():
+            yield
+    finally:
+        elapsed = time.perf_counter() - start
+        PIPELINE_STAGE_SECONDS.observe(elapsed, stage=name)
+        record_request_timing(name, elapsed)
+
+
+def record_request_timing(name: str, seconds: float):
+    """Add to the current request's Server-Timing entry; a no-op outside a request."""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def format_server_timing(timings: dict, total: float) -> str:
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
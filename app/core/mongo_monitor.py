@@ -0,0 +1,276 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from pymongo import monitoring
+
+from app.core import metrics
+
+# Command-level Mongo monitoring. Every command is timed and folded into a
+# per-"query shape" row: the filter / pipeline with literal values replaced by
+# "?", so `{"title": {"$regex": "python"}}` and `{"title": {"$regex": "java"}}`
+# count as the same query. Slow read shapes are explained in the background
+# (at most once per shape per interval) to record docs examined vs returned.
+
+MONGO_SLOW_MS = float(os.getenv("MONGO_SLOW_MS", "100"))
+# Seconds between explains of the same shape; 0 disables explain sampling.
+MONGO_EXPLAIN_INTERVAL_SECONDS = float(os.getenv("MONGO_EXPLAIN_INTERVAL_SECONDS", "600"))
+MAX_TRACKED_SHAPES = 500
+
+_IGNORED_COMMANDS = {
+    "explain", "hello", "ismaster", "isMaster", "ping", "buildinfo", "buildInfo",
+    "endSessions", "saslStart", "saslContinue", "getMore", "killCursors",
+}
+_EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct"}
+# Session / routing fields that explain rejects or that are re-added by the driver.
+_EXPLAIN_DROP_FIELDS = {"lsid", "txnNumber", "readConcern", "writeConcern", "autocommit", "startTransaction"}
+
+
+def _shape(value):
+    if isinstance(value, dict):
+        return {k: _shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $and / $or / pipelines are lists of sub-documents whose structure matters;
+        # $in lists and other literal arrays collapse to one placeholder.
+        if value and all(isinstance(v, dict) for v in value):
+            return [_shape(v) for v in value]
+        return "[?]"
+    return "?"
+
+
+def _pipeline_shape(pipeline):
+    stages = []
+    for stage in pipeline or []:
+        if not isinstance(stage, dict) or not stage:
+            continue
+        name, body = next(iter(stage.items()))
+        # Sort keys and directions decide index use, so keep them verbatim.
+        stages.append({name: body if name == "$sort" else _shape(body)})
+    return stages
+
+
+def query_shape(command_name: str, command: dict):
+    """Normalized, literal-free description of what a command asks Mongo to do."""
+    if command_name == "find":
+        shape = {"filter": _shape(command.get("filter", {}))}
+        if command.get("sort"):
+            shape["sort"] = command["sort"]
+        return shape
+    if command_name == "aggregate":
+        return {"pipeline": _pipeline_shape(command.get("pipeline"))}
+    if command_name == "count":
+        return {"query": _shape(command.get("query", {}))}
+    if command_name == "distinct":
+        return {"key": command.get("key"), "query": _shape(command.get("query", {}))}
+    if command_name == "findAndModify":
+        return {"query": _shape(command.get("query", {}))}
+    if command_name in ("update", "delete"):
+        ops = command.get("updates" if command_name == "update" else "deletes") or []
+        return {"q": _shape(ops[0].get("q", {}))} if ops else {}
+    return {}
+
+
+def _find_key(doc, key):
+    """Depth-first search for the first value stored under `key`."""
+    if isinstance(doc, dict):
+        if key in doc:
+            return doc[key]
+        values = doc.values()
+    elif isinstance(doc, list):
+        values = doc
+    else:
+        return None
+    for value in values:
+        found = _find_key(value, key)
+        if found is not None:
+            return found
+    return None
+
+
+def _plan_stages(plan) -> list[str]:
+    stages = []
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(_plan_stages(value))
+    return stages
+
+
+def summarize_explain(explain: dict) -> dict:
+    stats = _find_key(explain, "executionStats") or {}
+    plan_stages = _plan_stages(_find_key(explain, "winningPlan") or {})
+    return {
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "plan": ">".join(reversed(plan_stages)) or None,
+        "collscan": "COLLSCAN" in plan_stages,
+    }
+
+
+class MongoCommandMonitor(monitoring.CommandListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: dict[int, tuple] = {}
+        self._shapes: dict[str, dict] = {}
+        self._client = None
+        self._explain_pool = None
+
+    def attach(self, client):
+        """Client used for background explains. Without one, only timings are recorded."""
+        self._client = client
+
+    # ---------------- listener callbacks ----------------
+
+    def started(self, event):
+        if event.command_name in _IGNORED_COMMANDS:
+            return
+        command = event.command
+        collection = command.get(event.command_name)
+        shape = query_shape(event.command_name, command)
+        key = f"{event.database_name}.{collection}.{event.command_name} {json.dumps(shape, sort_keys=True, default=str)}"
+        with self._lock:
+            self._inflight[event.request_id] = (key, event.database_name, collection, shape, command)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool):
+        seconds = event.duration_micros / 1_000_000
+        with self._lock:
+            inflight = self._inflight.pop(event.request_id, None)
+
+        collection = inflight[2] if inflight else None
+        metrics.MONGO_COMMAND_SECONDS.observe(
+            seconds,
+            command=event.command_name,
+            collection=collection if isinstance(collection, str) else "",
+            outcome="failed" if failed else "ok",
+        )
+        metrics.record_request_timing("mongo", seconds)
+        if inflight is None:
+            return
+
+        key, database, collection, shape, command = inflight
+        elapsed_ms = seconds * 1000
+        slow = elapsed_ms >= MONGO_SLOW_MS
+        explain = False
+        with self._lock:
+            entry = self._shapes.get(key)
+            if entry is None:
+                if len(self._shapes) >= MAX_TRACKED_SHAPES:
+                    # Drop the cheapest shape so new hot spots are still tracked.
+                    cheapest = min(self._shapes, key=lambda k: self._shapes[k]["total_ms"])
+                    del self._shapes[cheapest]
+                entry = {
+                    "database": database,
+                    "collection": collection,
+                    "command": event.command_name,
+                    "shape": shape,
+                    "count": 0,
+                    "slow_count": 0,
+                    "failures": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "explain": None,
+                    "explained_at": None,
+                    "explain_pending": False,
+                }
+                self._shapes[key] = entry
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["last_seen"] = datetime.utcnow()
+            if failed:
+                entry["failures"] += 1
+            if slow:
+                entry["slow_count"] += 1
+                if self._explain_due(entry, command):
+                    entry["explain_pending"] = True
+                    explain = True
+
+        if slow:
+            print(f"🐢 Slow Mongo {event.command_name} on {database}.{collection}: {elapsed_ms:.0f} ms {json.dumps(shape, default=str)}")
+        if explain:
+            self._submit_explain(key, database, event.command_name, command)
+
+    # ---------------- explain sampling ----------------
+
+    def _explain_due(self, entry: dict, command: dict) -> bool:
+        if self._client is None or MONGO_EXPLAIN_INTERVAL_SECONDS <= 0 or entry["explain_pending"]:
+            return False
+        if entry["command"] not in _EXPLAINABLE_COMMANDS:
+            return False
+        if entry["command"] == "aggregate" and any(
+            isinstance(s, dict) and ("$out" in s or "$merge" in s) for s in command.get("pipeline") or []
+        ):
+            return False
+        explained_at = entry["explained_at"]
+        return explained_at is None or time.time() - explained_at >= MONGO_EXPLAIN_INTERVAL_SECONDS
+
+    def _submit_explain(self, key: str, database: str, command_name: str, command: dict):
+        if self._explain_pool is None:
+            with self._lock:
+                if self._explain_pool is None:
+                    # One worker: explains are diagnostics and must never compete with traffic.
+                    self._explain_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mongo-explain")
+        explain_command = {
+            k: v for k, v in command.items() if not k.startswith("$") and k not in _EXPLAIN_DROP_FIELDS
+        }
+        self._explain_pool.submit(self._run_explain, key, database, explain_command)
+
+    def _run_explain(self, key: str, database: str, command: dict):
+        try:
+            result = self._client[database].command({"explain": command, "verbosity": "executionStats"})
+            summary = summarize_explain(result)
+        except Exception as e:
+            summary = {"error": str(e)}
+        with self._lock:
+            entry = self._shapes.get(key)
+            if entry is not None:
+                entry["explain"] = summary
+                entry["explained_at"] = time.time()
+                entry["explain_pending"] = False
+
+    # ---------------- reporting ----------------
+
+    def top_shapes(self, limit: int = 20, sort: str = "total_ms") -> list[dict]:
+        with self._lock:
+            entries = [dict(e) for e in self._shapes.values()]
+
+        rows = []
+        for entry in entries:
+            explain = entry.pop("explain") or {}
+            explained_at = entry.pop("explained_at")
+            entry.pop("explain_pending", None)
+            entry["avg_ms"] = round(entry["total_ms"] / entry["count"], 2) if entry["count"] else 0.0
+            entry["total_ms"] = round(entry["total_ms"], 2)
+            entry["max_ms"] = round(entry["max_ms"], 2)
+            entry["explain"] = explain or None
+            entry["explained_at"] = datetime.utcfromtimestamp(explained_at) if explained_at else None
+            returned = explain.get("returned")
+            examined = explain.get("docs_examined")
+            entry["examined_per_returned"] = (
+                round(examined / max(returned, 1), 1) if isinstance(examined, int) and isinstance(returned, int) else None
+            )
+            rows.append(entry)
+
+        rows.sort(key=lambda r: r.get(sort) or 0, reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+
+
+MONITOR = MongoCommandMonitor()
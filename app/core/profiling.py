@@ -0,0 +1,153 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+from uuid import uuid4
+
+# Opt-in sampling profiler for single requests. An admin sends the
+# `X-Profile: 1` header; the middleware samples the stacks of the request's
+# threads until the response is ready and keeps the result in memory. The
+# request's threads are the event-loop thread it started on plus any worker
+# thread while it runs a metrics.stage() of that request (the profiler rides
+# the request context into run_in_threadpool and copy_context() workers).
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+SAMPLE_INTERVAL_SECONDS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5")) / 1000
+MAX_STORED_PROFILES = 20
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_THIS_FILE = os.path.abspath(__file__)
+
+_active_profiler: ContextVar[Optional["SamplingProfiler"]] = ContextVar("active_profiler", default=None)
+
+_profiles: "OrderedDict[str, dict]" = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def _collapse(frame) -> Optional[str]:
+    """Render a stack root-first in collapsed (flamegraph) format, or None if no app code is on it."""
+    names = []
+    touches_app = False
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename.startswith(APP_DIR) and code.co_filename != _THIS_FILE:
+            touches_app = True
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    if not touches_app:
+        return None
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._started_at = 0.0
+        self._elapsed = 0.0
+        self._loop_thread: Optional[int] = None
+        self._worker_threads: Counter = Counter()
+        self._threads_lock = threading.Lock()
+        self._seen_threads: set[int] = set()
+        self._token = None
+
+    def start(self):
+        """Start sampling the calling thread and, from now on, the worker threads of its context."""
+        self._loop_thread = threading.get_ident()
+        self._token = _active_profiler.set(self)
+        self._started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._elapsed = time.perf_counter() - self._started_at
+        _active_profiler.reset(self._token)
+        return self
+
+    def _enter_thread(self, thread_id: int):
+        with self._threads_lock:
+            self._worker_threads[thread_id] += 1
+
+    def _leave_thread(self, thread_id: int):
+        with self._threads_lock:
+            self._worker_threads[thread_id] -= 1
+            if self._worker_threads[thread_id] <= 0:
+                del self._worker_threads[thread_id]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._threads_lock:
+                thread_ids = {self._loop_thread, *self._worker_threads}
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                stack = _collapse(frame) if frame is not None else None
+                if stack:
+                    self.stacks[stack] += 1
+            self._seen_threads |= thread_ids
+            self.samples += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "duration_ms": round(self._elapsed * 1000, 2),
+            "interval_ms": round(self.interval * 1000, 2),
+            "samples": self.samples,
+            # The event-loop thread also runs other requests' async code in between.
+            "scope": "request",
+            "threads": len(self._seen_threads),
+            "collapsed": "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()),
+        }
+
+
+@contextmanager
+def track_thread():
+    """Attribute the current thread's samples to the request being profiled, if any, while inside."""
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    profiler._enter_thread(thread_id)
+    try:
+        yield
+    finally:
+        profiler._leave_thread(thread_id)
+
+
+def store_profile(profiler: SamplingProfiler, method: str, path: str, server_timing: str) -> str:
+    profile_id = uuid4().hex
+    entry = {
+        "id": profile_id,
+        "method": method,
+        "path": path,
+        "server_timing": server_timing,
+        "created_at": datetime.utcnow(),
+        **profiler.to_dict(),
+    }
+    with _profiles_lock:
+        _profiles[profile_id] = entry
+        while len(_profiles) > MAX_STORED_PROFILES:
+            _profiles.popitem(last=False)
+    return profile_id
+
+
+def list_profiles() -> list[dict]:
+    with _profiles_lock:
+        entries = list(_profiles.values())
+    return [{k: v for k, v in entry.items() if k != "collapsed"} for entry in reversed(entries)]
+
+
+def get_profile(profile_id: str) -> Optional[dict]:
+    with _profiles_lock:
+        return _profiles.get(profile_id)
@@ -1,5 +1,10 @@
-from fastapi import FastAPI
+import os
+import time
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
 
 from app.api.routes import router
@@ -11,23 +16,26 @@ from app.api.applications_routes import router as applications_router
 from app.api.recommendations_routes import router as recommendations_router
 from app.api.reports_routes import router as reports_router
 from app.api.external_jobs_routes import router as external_jobs_router
-from app.services.index_manager import initialize_index, start_auto_refresh
+from app.core import metrics, profiling
+from app.core.auth import decode_access_token
+from app.core.database import async_client
+from app.repositories import users as users_repo
+from app.services import readiness
+from app.services.startup import start_background_startup
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # ✅ Fast, non-blocking startup
-    try:
-        initialize_index()
-    except Exception as e:
-        print(f"Index init failed: {e}")
-
-    # ✅ Start refresh in background INSIDE the function
-    start_auto_refresh(900)
+    # ✅ Import is side-effect free; Mongo indexes, FAISS index, jobs, model
+    # and spaCy load concurrently in the background. /ready stays 503 until
+    # they are loaded and warmed up
+    start_background_startup(refresh_interval=900)
 
-    yield  # 👈 app is READY here
+    yield  # 👈 app is SERVING here (liveness), not necessarily READY
 
     print("App shutting down")
+    await async_client.close()
 
 
 app = FastAPI(
@@ -41,8 +49,67 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", profiling.PROFILE_ID_HEADER, NEXT_CURSOR_HEADER],
 )
 
+# Compress large JSON bodies (job lists, recommendations) for clients that send
+# Accept-Encoding: gzip; small responses are not worth the CPU.
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1024")),
+    compresslevel=int(os.getenv("GZIP_LEVEL", "5")),
+)
+
+
+async def _is_admin_request(request: Request) -> bool:
+    auth_header = request.headers.get("authorization", "")
+    scheme, _, token = auth_header.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        payload = decode_access_token(token)
+    except HTTPException:
+        return False
+    email = payload.get("sub")
+    if not email:
+        return False
+    user = await users_repo.find_by_email(email, {"role": 1})
+    return bool(user) and user.get("role") == "admin"
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status_code = 500
+    timings_token = metrics.begin_request_timings()
+    profiler = None
+    if request.headers.get(profiling.PROFILE_HEADER) == "1" and await _is_admin_request(request):
+        profiler = profiling.SamplingProfiler().start()
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        timings = metrics.end_request_timings(timings_token)
+        if profiler is not None:
+            profiler.stop()
+        # Label by route template, not raw path, to keep cardinality bounded.
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_SECONDS.observe(
+            elapsed,
+            route=getattr(route, "path", "unmatched"),
+            method=request.method,
+            status=status_code,
+        )
+
+    server_timing = metrics.format_server_timing(timings, elapsed)
+    response.headers["Server-Timing"] = server_timing
+    if profiler is not None:
+        profile_id = profiling.store_profile(profiler, request.method, request.url.path, server_timing)
+        response.headers[profiling.PROFILE_ID_HEADER] = profile_id
+    return response
+
+
 app.include_router(router)
 app.include_router(auth_router)
 app.include_router(admin_router)
@@ -56,3 +123,14 @@ app.include_router(external_jobs_router)
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+def ready():
+    state = readiness.snapshot()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
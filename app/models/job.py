@@ -81,7 +81,10 @@ class JobResponse(JobBase):
 
 class JobListResponse(BaseModel):
     items: list[JobResponse]
-    total: int
+    # Cached for a short TTL; None when include_total=false.
+    total: Optional[int] = None
     page: int
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    # Opaque cursor for the next page; None on the last page.
+    next_cursor: Optional[str] = None
@@ -0,0 +1,17 @@
+from bson import ObjectId
+
+from app.core.database import async_applications_collection
+from app.utils.pagination import KEYSET_SORT
+
+
+async def insert(doc: dict) -> ObjectId:
+    """Raises DuplicateKeyError when the user already applied to the job."""
+    result = await async_applications_collection.insert_one(doc)
+    return result.inserted_id
+
+
+async def list_for_user(user_id: str, after: dict, limit: int) -> list[dict]:
+    """Up to `limit` applications newest first, starting after a keyset filter."""
+    query = {"$and": [{"user_id": user_id}, after]} if after else {"user_id": user_id}
+    cursor = async_applications_collection.find(query).sort(KEYSET_SORT).limit(limit)
+    return await cursor.to_list(length=limit)
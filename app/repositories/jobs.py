@@ -0,0 +1,18 @@
+from typing import Optional
+
+from bson import ObjectId
+
+from app.core.database import async_jobs_collection
+
+
+async def get_active(job_id: ObjectId) -> Optional[dict]:
+    return await async_jobs_collection.find_one({"_id": job_id, "is_active": {"$ne": False}})
+
+
+async def find_by_ids(job_ids: list[str]) -> dict[str, dict]:
+    """Jobs keyed by string id; invalid ids are skipped."""
+    object_ids = [ObjectId(i) for i in job_ids if ObjectId.is_valid(i)]
+    if not object_ids:
+        return {}
+    cursor = async_jobs_collection.find({"_id": {"$in": object_ids}})
+    return {str(job["_id"]): job async for job in cursor}
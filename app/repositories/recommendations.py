@@ -0,0 +1,82 @@
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+
+from app.core.database import (
+    async_recommendation_items_collection,
+    async_recommendation_sessions_collection,
+)
+from app.utils.pagination import KEYSET_SORT
+
+# What report rollups need to move a decision counter.
+DECISION_PROJECTION = {"decision": 1, "created_at": 1}
+
+
+async def create_session(doc: dict) -> ObjectId:
+    result = await async_recommendation_sessions_collection.insert_one(doc)
+    return result.inserted_id
+
+
+async def insert_items(docs: list[dict]) -> list[ObjectId]:
+    """Insert a session's items in one round trip; ids come back in input order."""
+    if not docs:
+        return []
+    result = await async_recommendation_items_collection.insert_many(docs, ordered=True)
+    return result.inserted_ids
+
+
+async def latest_session(user_id: str) -> Optional[dict]:
+    return await async_recommendation_sessions_collection.find_one(
+        {"user_id": user_id},
+        sort=[("created_at", -1)],
+    )
+
+
+async def list_sessions(user_id: str, after: dict, limit: int) -> list[dict]:
+    """Up to `limit` recommendation sessions newest first, starting after a keyset filter."""
+    query = {"$and": [{"user_id": user_id}, after]} if after else {"user_id": user_id}
+    cursor = async_recommendation_sessions_collection.find(query).sort(KEYSET_SORT).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+async def items_for_session(session_id: str, projection: Optional[dict] = None) -> list[dict]:
+    cursor = async_recommendation_items_collection.find({"session_id": session_id}, projection).sort("rank", 1)
+    return await cursor.to_list(length=None)
+
+
+async def mark_applied(user_id: str, recommendation_item_id: Optional[str], job_id: str) -> Optional[dict]:
+    """Mark the item applied; returns its decision and created_at from before the update."""
+    now = datetime.utcnow()
+    applied = {"$set": {"decision": "applied", "decision_at": now, "updated_at": now}}
+
+    if recommendation_item_id and ObjectId.is_valid(recommendation_item_id):
+        return await async_recommendation_items_collection.find_one_and_update(
+            {"_id": ObjectId(recommendation_item_id), "user_id": user_id},
+            applied,
+            projection=DECISION_PROJECTION,
+        )
+
+    # Fallback: mark the latest pending recommendation item for this user+job as applied.
+    return await async_recommendation_items_collection.find_one_and_update(
+        {"user_id": user_id, "job_id": job_id, "decision": "pending"},
+        applied,
+        projection=DECISION_PROJECTION,
+        sort=[("created_at", -1)],
+    )
+
+
+async def set_not_applied(item_id: ObjectId, user_id: str, reason: str, note: str) -> Optional[dict]:
+    """Returns the item's decision and created_at from before the update, or None when not found."""
+    return await async_recommendation_items_collection.find_one_and_update(
+        {"_id": item_id, "user_id": user_id},
+        {
+            "$set": {
+                "decision": "not_applied",
+                "decision_reason": reason,
+                "decision_note": note,
+                "decision_at": datetime.utcnow(),
+            }
+        },
+        projection=DECISION_PROJECTION,
+    )
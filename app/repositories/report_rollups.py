@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo import UpdateOne
+
+from app.core.database import async_report_rollups_collection
+
+# One bucket per (scope, key, UTC day) holding event counters:
+#   global   key "all"           recommended, applied
+#   user     key user id         recommended, applied, not_applied
+#   job      key job id          recommended, applied
+#   employer key employer id     jobs_posted (+ company_name, email)
+# Live events $inc the bucket of the day the event belongs to; the nightly
+# reconciliation in app/services/report_rollups.py rewrites closed days from
+# the raw collections, so a lost increment only skews reports until then.
+
+GLOBAL_KEY = "all"
+
+
+def day_of(value: datetime) -> datetime:
+    """UTC midnight of `value` (naive, like every stored datetime)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return datetime(value.year, value.month, value.day)
+
+
+def bucket_id(scope: str, key: str, day: datetime) -> str:
+    return f"{scope}:{key}:{day:%Y-%m-%d}"
+
+
+def increment(scope: str, key: str, day: datetime, counters: dict, fields: Optional[dict] = None) -> UpdateOne:
+    update = {
+        "$inc": counters,
+        "$setOnInsert": {"scope": scope, "key": key, "day": day},
+    }
+    if fields:
+        update["$set"] = fields
+    return UpdateOne({"_id": bucket_id(scope, key, day)}, update, upsert=True)
+
+
+async def _write(ops: list[UpdateOne]) -> None:
+    # Reports tolerate a missed increment until the nightly reconciliation;
+    # the request that produced the event must not fail because of it.
+    if not ops:
+        return
+    try:
+        await async_report_rollups_collection.bulk_write(ops, ordered=False)
+    except Exception as e:
+        print(f"⚠️ Report rollup update failed: {e}")
+
+
+async def record_recommendations(user_id: str, job_ids: list[Optional[str]], at: datetime) -> None:
+    day = day_of(at)
+    count = len(job_ids)
+    ops = [
+        increment("global", GLOBAL_KEY, day, {"recommended": count}),
+        increment("user", user_id, day, {"recommended": count}),
+    ]
+    per_job: dict[str, int] = {}
+    for job_id in job_ids:
+        if job_id:
+            per_job[job_id] = per_job.get(job_id, 0) + 1
+    ops += [increment("job", job_id, day, {"recommended": n}) for job_id, n in per_job.items()]
+    await _write(ops)
+
+
+async def record_application(user_id: str, job_id: str, at: datetime) -> None:
+    day = day_of(at)
+    await _write([
+        increment("global", GLOBAL_KEY, day, {"applied": 1}),
+        increment("user", user_id, day, {"applied": 1}),
+        increment("job", job_id, day, {"applied": 1}),
+    ])
+
+
+async def record_decision(user_id: str, previous: Optional[dict], decision: str) -> None:
+    """
+    Keep `not_applied` equal to the user's items currently marked not applied,
+    counted on the day the item was recommended (as the raw report did).
+    `previous` is the item before the update.
+    """
+    if not previous or not previous.get("created_at"):
+        return
+    was_not_applied = previous.get("decision") == "not_applied"
+    delta = int(decision == "not_applied") - int(was_not_applied)
+    if delta:
+        await _write([increment("user", user_id, day_of(previous["created_at"]), {"not_applied": delta})])
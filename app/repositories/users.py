@@ -0,0 +1,33 @@
+from typing import Optional
+
+from bson import ObjectId
+
+from app.core.database import async_users_collection
+
+
+async def find_by_email(email: str, projection: Optional[dict] = None) -> Optional[dict]:
+    return await async_users_collection.find_one({"email": email}, projection)
+
+
+async def find_by_id(user_id: ObjectId) -> Optional[dict]:
+    return await async_users_collection.find_one({"_id": user_id})
+
+
+async def insert(doc: dict) -> ObjectId:
+    result = await async_users_collection.insert_one(doc)
+    return result.inserted_id
+
+
+async def update_by_id(user_id: ObjectId, update: dict) -> int:
+    result = await async_users_collection.update_one({"_id": user_id}, update)
+    return result.matched_count
+
+
+async def update_by_email(email: str, update: dict) -> int:
+    result = await async_users_collection.update_one({"email": email}, update)
+    return result.matched_count
+
+
+async def list_pending_employers() -> list[dict]:
+    cursor = async_users_collection.find({"role": "employer", "status": "pending"}).sort("created_at", -1)
+    return await cursor.to_list(length=None)
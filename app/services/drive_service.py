@@ -106,17 +106,13 @@ def _find_file_by_name(folder_id: str, name: str):
 # RESUMES
 # ==================================================
 
-def upload_to_drive(file_path: str, original_name: str, delete_after: bool = False) -> str:
+def upload_bytes_to_drive(data: bytes, original_name: str) -> str:
     if not RESUMES_FOLDER_ID:
         raise RuntimeError("GDRIVE_RESUMES_FOLDER_ID missing in env")
 
     ext = os.path.splitext(original_name)[1] or ""
     drive_name = f"{uuid4()}{ext}"
 
-    # ✅ Read file into memory first (avoids Windows file lock issues)
-    with open(file_path, "rb") as f:
-        data = f.read()
-
     service = _drive()
 
     media = MediaIoBaseUpload(
@@ -131,10 +127,20 @@ def upload_to_drive(file_path: str, original_name: str, delete_after: bool = Fal
         fields="id"
     ).execute()
 
+    return created["id"]
+
+
+def upload_to_drive(file_path: str, original_name: str, delete_after: bool = False) -> str:
+    # ✅ Read file into memory first (avoids Windows file lock issues)
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    file_id = upload_bytes_to_drive(data, original_name)
+
     if delete_after:
         _safe_delete(file_path)
 
-    return created["id"]
+    return file_id
 
 
 def list_resumes() -> list:
@@ -4,6 +4,9 @@ from datetime import datetime
 import requests
 
 from app.core.database import jobs_collection
+from app.services.job_schema import canonicalize_job
+from app.services.job_text import job_content_hash
+from app.services.skill_matcher import job_skill_fields
 
 JSEARCH_URL = "https://jsearch.p.rapidapi.com/search"
 
@@ -36,8 +39,8 @@ def _normalize_jsearch_item(item: dict) -> dict:
         "requirements": "",
         "responsibilities": "",
         "skills": [],
-        "salary_min": str(item.get("job_min_salary")) if item.get("job_min_salary") is not None else None,
-        "salary_max": str(item.get("job_max_salary")) if item.get("job_max_salary") is not None else None,
+        "salary_min": item.get("job_min_salary"),
+        "salary_max": item.get("job_max_salary"),
         "source": "external_jsearch",
         "external_id": item.get("job_id"),
         "job_link": item.get("job_apply_link"),
@@ -64,13 +67,17 @@ def import_jobs_from_jsearch(query: str, page: int = 1, num_pages: int = 1) -> d
     updated = 0
 
     for item in items:
-        normalized = _normalize_jsearch_item(item)
+        normalized = canonicalize_job(_normalize_jsearch_item(item))
         ext_id = normalized.get("external_id")
         if not ext_id:
             continue
 
         existing = jobs_collection.find_one({"external_id": ext_id, "source": "external_jsearch"})
+        normalized["content_hash"] = job_content_hash(normalized)
+        normalized.update(job_skill_fields(normalized))
         if existing:
+            if normalized["content_hash"] != (existing.get("content_hash") or job_content_hash(existing)):
+                normalized["indexed"] = False
             jobs_collection.update_one(
                 {"_id": existing["_id"]},
                 {"$set": normalized}
@@ -2,47 +2,18 @@ import os
 from datetime import datetime
 
 import faiss
-import numpy as np
+from pymongo import UpdateOne
 
 from app.core.config import DATA_DIR
 from app.core.database import jobs_collection
 from app.services.drive_service import download_index_from_drive, upload_index_to_drive
+from app.services.job_text import build_job_text, job_content_hash
 from app.services.recommender import get_model
+from app.services.skill_matcher import job_skill_fields
 
 LOCAL_INDEX = f"{DATA_DIR}/jobs.index"
 
 
-def _job_value(job: dict, *keys: str) -> str:
-    for key in keys:
-        raw = job.get(key)
-        if raw is None:
-            continue
-        if isinstance(raw, (float, np.floating)) and np.isnan(raw):
-            continue
-        value = str(raw).strip()
-        if value.lower() in {"nan", "none", "null"}:
-            continue
-        if value:
-            return value
-    return ""
-
-
-def _build_job_text(job: dict) -> str:
-    return "\n".join(
-        [
-            f"Job Title: {_job_value(job, 'title', 'Job Title')}",
-            f"Company: {_job_value(job, 'company', 'Company Name')}",
-            f"Category: {_job_value(job, 'category', 'Category')}",
-            f"Experience Level: {_job_value(job, 'experience_level', 'Experience Level')}",
-            f"Work Type: {_job_value(job, 'work_type', 'Work Type')}",
-            f"Skills: {_job_value(job, 'skills', 'Skills')}",
-            f"Requirements: {_job_value(job, 'requirements', 'Requirements')}",
-            f"Responsibilities: {_job_value(job, 'responsibilities', 'Responsibilities')}",
-            f"Job Description: {_job_value(job, 'description', 'Job Description')}",
-        ]
-    )
-
-
 def _download_existing_index():
     os.makedirs(DATA_DIR, exist_ok=True)
     try:
@@ -60,16 +31,23 @@ def _create_index(dimension: int):
 
 
 def incremental_index_new_jobs() -> dict:
-    new_jobs = list(
+    """
+    Embed jobs that are new or were marked dirty by an edit.
+
+    HNSW indexes cannot delete vectors, so an edited job gets a fresh vector
+    appended and its `index_position` repointed to it. The previous vector is
+    left orphaned in the graph and ignored by the recommender.
+    """
+    pending_jobs = list(
         jobs_collection.find({"is_active": {"$ne": False}, "indexed": {"$ne": True}}).sort(
             [("created_at", 1), ("created_date", 1), ("_id", 1)]
         )
     )
 
-    if not new_jobs:
-        return {"status": "no_new_jobs", "indexed_count": 0}
+    if not pending_jobs:
+        return {"status": "no_new_jobs", "indexed_count": 0, "reindexed_count": 0, "changed_count": 0}
 
-    job_texts = [_build_job_text(job) for job in new_jobs]
+    job_texts = [build_job_text(job) for job in pending_jobs]
     model = get_model()
     embeddings = model.encode(
         job_texts,
@@ -84,15 +62,43 @@ def incremental_index_new_jobs() -> dict:
     elif isinstance(index, faiss.IndexHNSWFlat):
         index.hnsw.efSearch = 64
 
+    first_position = index.ntotal
     index.add(embeddings)
 
     os.makedirs(DATA_DIR, exist_ok=True)
     faiss.write_index(index, LOCAL_INDEX)
     upload_index_to_drive(LOCAL_INDEX)
 
-    jobs_collection.update_many(
-        {"_id": {"$in": [job["_id"] for job in new_jobs]}},
-        {"$set": {"indexed": True, "updated_at": datetime.utcnow()}},
+    now = datetime.utcnow()
+    reindexed_count = sum(1 for job in pending_jobs if job.get("index_position") is not None)
+    # Only mark a job indexed if it still holds the content that was embedded. A job
+    # edited mid-build has a new content_hash, so it stays dirty for the next run
+    # and the vector appended here is left orphaned.
+    result = jobs_collection.bulk_write(
+        [
+            UpdateOne(
+                {"_id": job["_id"], "content_hash": job.get("content_hash")},
+                {
+                    "$set": {
+                        "indexed": True,
+                        "index_position": first_position + offset,
+                        "content_hash": job_content_hash(job),
+                        **job_skill_fields(job),
+                        "updated_at": now,
+                    }
+                },
+            )
+            for offset, job in enumerate(pending_jobs)
+        ],
+        ordered=False,
     )
-
-    return {"status": "indexed", "indexed_count": len(new_jobs)}
+    changed_count = len(pending_jobs) - result.matched_count
+    if changed_count:
+        print(f"ℹ {changed_count} jobs changed while indexing; they stay pending for the next run")
+
+    return {
+        "status": "indexed",
+        "indexed_count": len(pending_jobs) - reindexed_count,
+        "reindexed_count": reindexed_count,
+        "changed_count": changed_count,
+    }
@@ -1,11 +1,18 @@
 import os
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 import faiss
+import numpy as np
 import pandas as pd
 from pymongo import MongoClient
 from app.core.config import DATA_DIR
 import dotenv
+from app.core import metrics
+from app.core.mongo_monitor import MONITOR as MONGO_MONITOR
+from app.services import job_schema, readiness, similar_jobs, text_search
+from app.services.skill_matcher import get_skill_matcher, job_skill_fields
 from app.services.drive_service import (
     download_index_from_drive,
     get_drive_last_modified
@@ -32,8 +39,23 @@ COLLECTION = "jobs"
 
 _index = None
 _jobs_df = None
+_row_lookup = None
+_skill_bits = None
+_job_rows = None
+_row_positions = None
 _last_modified = None
+_orphaned = 0
 _lock = threading.Lock()
+# Serializes loads so a manual reload and the refresh loop never overlap.
+_load_lock = threading.Lock()
+
+
+# Edited jobs leave orphaned vectors behind (HNSW cannot delete). Searches
+# over-fetch to skip them, but by at most this multiple of the hits requested,
+# so search cost stays bounded until the index is rebuilt.
+ORPHAN_OVERFETCH_MULTIPLE = int(os.getenv("ORPHAN_OVERFETCH_MULTIPLE", "2"))
+# Orphaned share of the index above which a full rebuild is due.
+ORPHAN_REBUILD_THRESHOLD = float(os.getenv("ORPHAN_REBUILD_THRESHOLD", "0.2"))
 
 
 # ---------------- Internal helpers ----------------
@@ -43,37 +65,202 @@ def download_index():
 
 
 def load_index_from_disk():
-    global _index
-    _index = faiss.read_index(LOCAL_INDEX)
+    return faiss.read_index(LOCAL_INDEX)
+
+
+def download_and_load_index():
+    download_index()
+    return load_index_from_disk()
 
 
 def load_jobs_from_mongodb():
-    client = MongoClient(MONGO_URI)
+    client = MongoClient(MONGO_URI, event_listeners=[MONGO_MONITOR])
     col = client[DB_NAME][COLLECTION]
     # Backfill missing active flags for legacy rows.
     col.update_many(
         {"is_active": {"$exists": False}},
         {"$set": {"is_active": True}}
     )
-    jobs = list(col.find({"is_active": {"$ne": False}}))
+    # Canonical field names only, whether or not the schema migration has reached a job.
+    jobs = [job_schema.read_job(job) for job in col.find({"is_active": {"$ne": False}})]
     return pd.DataFrame(jobs)
 
 
+def build_row_lookup(index, jobs_df):
+    """
+    Map FAISS positions to jobs_df rows (-1 for orphaned vectors).
+
+    Jobs indexed by the incremental builder carry an explicit `index_position`.
+    Older rows without one keep the legacy assumption that the vector at
+    position i belongs to row i.
+    """
+    total = index.ntotal if index is not None else 0
+    lookup = np.full(total, -1, dtype=np.int64)
+    if jobs_df is None or jobs_df.empty or total == 0:
+        return lookup
+
+    if "index_position" in jobs_df.columns:
+        positions = pd.to_numeric(jobs_df["index_position"], errors="coerce").to_numpy()
+    else:
+        positions = np.full(len(jobs_df), np.nan)
+
+    explicit = ~np.isnan(positions)
+    rows = np.arange(len(jobs_df))
+    explicit_positions = positions[explicit].astype(np.int64)
+    in_range = explicit_positions < total
+    lookup[explicit_positions[in_range]] = rows[explicit][in_range]
+
+    legacy_rows = rows[~explicit]
+    legacy_rows = legacy_rows[legacy_rows < total]
+    free = lookup[legacy_rows] == -1
+    lookup[legacy_rows[free]] = legacy_rows[free]
+    return lookup
+
+
+def build_job_rows(jobs_df):
+    """Job id string -> jobs_df row."""
+    if jobs_df is None or jobs_df.empty or "_id" not in jobs_df.columns:
+        return {}
+    return {str(job_id): row for row, job_id in enumerate(jobs_df["_id"].tolist())}
+
+
+def build_row_positions(row_lookup, n_rows):
+    """Inverse of the row lookup: jobs_df row -> FAISS position (-1 when the job has no vector)."""
+    positions = np.full(n_rows, -1, dtype=np.int64)
+    if row_lookup is None or n_rows == 0:
+        return positions
+    mapped = np.flatnonzero(row_lookup >= 0)
+    positions[row_lookup[mapped]] = mapped
+    return positions
+
+
+def build_skill_bits(jobs_df):
+    """
+    Pack each job's skill ids into a uint64 bitset row aligned with jobs_df.
+
+    Ids stored at ingest are reused; rows without them, or extracted against
+    a different skills vocabulary, are extracted once here.
+    """
+    matcher = get_skill_matcher()
+    n_rows = 0 if jobs_df is None else len(jobs_df)
+    bits = np.zeros((n_rows, matcher.n_words), dtype=np.uint64)
+    if n_rows == 0:
+        return bits
+
+    for row, job in enumerate(jobs_df.to_dict("records")):
+        skill_ids = job.get("skill_ids")
+        if job.get("skill_vocab") != matcher.vocab_hash or not isinstance(skill_ids, list):
+            skill_ids = job_skill_fields(job)["skill_ids"]
+        bits[row] = matcher.to_bits(skill_ids)
+    return bits
+
+
+def _load_snapshot():
+    """
+    Load everything the recommender needs without holding the read lock.
+
+    The Drive download + FAISS read, the Mongo scan and the Drive timestamp
+    lookup are independent, so they run concurrently.
+    """
+    # Job writes after this point are picked up by the search index catch-up.
+    jobs_loaded_at = datetime.utcnow()
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="index-load") as pool:
+        index_future = pool.submit(readiness.run, "faiss_index", download_and_load_index)
+        jobs_future = pool.submit(readiness.run, "jobs", load_jobs_from_mongodb)
+        modified_future = pool.submit(readiness.run, "drive_modified", get_drive_last_modified)
+
+        index = index_future.result()
+        jobs_df = jobs_future.result()
+        try:
+            last_modified = modified_future.result()
+        except Exception as e:
+            print(f"⚠️ Could not read Drive modified time: {e}")
+            last_modified = None
+
+    with readiness.stage("lookups"):
+        row_lookup = build_row_lookup(index, jobs_df)
+        row_positions = build_row_positions(row_lookup, 0 if jobs_df is None else len(jobs_df))
+        job_rows = build_job_rows(jobs_df)
+        skill_bits = build_skill_bits(jobs_df)
+        search_index = text_search.build_index(jobs_df, synced_at=jobs_loaded_at)
+
+    # Job pages still work without related jobs, so a failure here does not fail the load.
+    try:
+        with readiness.stage("similar_jobs"):
+            neighbour_table = similar_jobs.build_table(
+                index, list(job_rows), row_lookup, row_positions, previous=similar_jobs.get_table()
+            )
+    except Exception as e:
+        print(f"⚠️ Similar jobs not computed: {e}")
+        neighbour_table = None
+
+    return (
+        index, jobs_df, row_lookup, skill_bits, job_rows, row_positions, last_modified,
+        search_index, neighbour_table,
+    )
+
+
+def _publish(snapshot):
+    global _index, _jobs_df, _row_lookup, _skill_bits, _job_rows, _row_positions, _last_modified, _orphaned
+
+    index, jobs_df, row_lookup = snapshot[0], snapshot[1], snapshot[2]
+    orphaned = int((row_lookup < 0).sum()) if row_lookup is not None else 0
+    with _lock:
+        _index, _jobs_df, _row_lookup, _skill_bits, _job_rows, _row_positions, _last_modified = snapshot[:7]
+        _orphaned = orphaned
+    text_search.publish(snapshot[7])
+    similar_jobs.publish(snapshot[8])
+
+    ntotal = index.ntotal if index is not None else 0
+    metrics.INDEX_VECTORS.set(ntotal)
+    metrics.INDEX_ORPHANED_VECTORS.set(orphaned)
+    metrics.JOBS_LOADED.set(0 if jobs_df is None else len(jobs_df))
+    if ntotal and orphaned / ntotal > ORPHAN_REBUILD_THRESHOLD:
+        print(f"⚠️ {orphaned} of {ntotal} index vectors are orphaned ({orphaned / ntotal:.0%}); "
+              f"run tools/build_faiss_index.py to compact the index")
+
+
+def _load_and_publish(kind: str):
+    start = time.perf_counter()
+    try:
+        with _load_lock:
+            snapshot = _load_snapshot()
+            _publish(snapshot)
+    except Exception:
+        metrics.INDEX_RELOADS.inc(kind=kind, result="failed")
+        raise
+    finally:
+        metrics.INDEX_RELOAD_SECONDS.observe(time.perf_counter() - start, kind=kind)
+    metrics.INDEX_RELOADS.inc(kind=kind, result="ok")
+    return snapshot
+
+
 # ---------------- Public API ----------------
 
 def initialize_index():
-    global _last_modified, _jobs_df
-
     print("📥 Loading FAISS index at startup...")
 
-    download_index()
-    load_index_from_disk()
-
-    _jobs_df = load_jobs_from_mongodb()
-    _last_modified = get_drive_last_modified()
+    snapshot = _load_and_publish("startup")
 
     print("✅ FAISS index + jobs loaded")
-    print(f"   - Jobs indexed: {_jobs_df.shape[0]}")
+    print(f"   - Jobs indexed: {snapshot[1].shape[0]}")
+
+
+def get_snapshot():
+    """
+    Index, jobs, row lookup, skill bitsets, job id -> row map and row -> position
+    map from the same load, read atomically.
+    """
+    # Timed so lock contention with a reload shows up in Server-Timing.
+    with metrics.stage("index_snapshot"), _lock:
+        return _index, _jobs_df, _row_lookup, _skill_bits, _job_rows, _row_positions
+
+
+def search_k(limit: int, ntotal: int) -> int:
+    """k for an index search that should yield `limit` live jobs despite orphaned vectors."""
+    with _lock:
+        orphaned = _orphaned
+    return min(limit + min(orphaned, ORPHAN_OVERFETCH_MULTIPLE * limit), ntotal)
 
 
 def get_index():
@@ -86,20 +273,24 @@ def get_jobs_df():
         return _jobs_df
 
 
-def reload_index_and_jobs():
-    global _last_modified, _jobs_df
+def get_row_lookup():
+    with _lock:
+        return _row_lookup
 
+
+def get_skill_bits():
     with _lock:
-        print("🔄 Reloading FAISS index + jobs...")
+        return _skill_bits
+
 
-        download_index()
-        load_index_from_disk()
+def reload_index_and_jobs():
+    print("🔄 Reloading FAISS index + jobs...")
 
-        _jobs_df = load_jobs_from_mongodb()
-        _last_modified = get_drive_last_modified()
+    # Readers keep using the current snapshot until the new one is swapped in.
+    snapshot = _load_and_publish("reload")
 
-        print("✅ Reload complete")
-        print(f"   - Jobs indexed: {_jobs_df.shape[0]}")
+    print("✅ Reload complete")
+    print(f"   - Jobs indexed: {snapshot[1].shape[0]}")
 
 
 def check_and_reload():
@@ -121,5 +312,5 @@ def start_auto_refresh(interval=300):
             check_and_reload()
             time.sleep(interval)
 
-    t = threading.Thread(target=loop, daemon=True)
+    t = threading.Thread(target=loop, name="index-refresh", daemon=True)
     t.start()
@@ -0,0 +1,143 @@
+import threading
+
+import numpy as np
+import orjson
+
+from app.core import metrics
+from app.services import job_schema
+from app.services.job_text import job_skills_text
+
+# Pre-rendered recommendation cards. The static part of a recommended job
+# (everything except `match_percentage` and the recommendation item id) is
+# built and JSON-encoded once per job per jobs snapshot, then reused by every
+# request that recommends the job. The response path splices the per-request
+# fields into the cached bytes instead of re-encoding the card.
+
+# Every field a recommendation item can carry (card + per-request fields).
+RECOMMENDATION_FIELDS = (
+    "job_id", "job_title", "company", "location", "type", "experience", "experience_level",
+    "min_education", "category", "openings", "notice_period", "year_of_passing", "work_type",
+    "interview_type", "company_website", "company_description", "description", "requirements",
+    "responsibilities", "skills", "salary_min", "salary_max", "created_date", "job_link",
+    "match_percentage", "recommendation_item_id",
+)
+
+_lock = threading.Lock()
+_store = None  # jobs_df the cached cards were rendered from
+_cards: dict[int, dict] = {}
+_card_json: dict[str, bytes] = {}
+
+
+def clean_text(raw):
+    if raw is None:
+        return ""
+
+    if isinstance(raw, (float, np.floating)) and np.isnan(raw):
+        return ""
+
+    try:
+        if np.isscalar(raw) and np.isnan(raw):
+            return ""
+    except TypeError:
+        pass
+
+    text = str(raw).strip()
+    return "" if text.lower() in {"nan", "none", "null"} else text
+
+
+def pick_first_value(source, *keys):
+    for key in keys:
+        value = clean_text(source.get(key))
+        if value:
+            return value
+    return ""
+
+
+def render_card(job) -> dict:
+    """Static recommendation fields for one jobs_df row."""
+    raw_id = job.get("_id")
+    return {
+        "job_id": str(raw_id) if raw_id is not None else None,
+        "job_title": pick_first_value(job, "title"),
+        "company": pick_first_value(job, "company"),
+        "location": pick_first_value(job, "location"),
+        "type": pick_first_value(job, "type"),
+        "experience": pick_first_value(job, "experience_level"),
+        "experience_level": pick_first_value(job, "experience_level"),
+        "min_education": pick_first_value(job, "min_education"),
+        "category": pick_first_value(job, "category"),
+        "openings": pick_first_value(job, "openings"),
+        "notice_period": pick_first_value(job, "notice_period"),
+        "year_of_passing": pick_first_value(job, "year_of_passing"),
+        "work_type": pick_first_value(job, "work_type"),
+        "interview_type": pick_first_value(job, "interview_type"),
+        "company_website": pick_first_value(job, "company_website"),
+        "company_description": pick_first_value(job, "company_description"),
+        "description": pick_first_value(job, "description"),
+        "requirements": pick_first_value(job, "requirements"),
+        "responsibilities": pick_first_value(job, "responsibilities"),
+        "skills": job_skills_text(job),
+        "salary_min": job_schema.number_text(job.get("salary_min")) or "",
+        "salary_max": job_schema.number_text(job.get("salary_max")) or "",
+        "created_date": clean_text(job.get("created_at") or job.get("created_date", "")),
+        "job_link": pick_first_value(job, "job_link"),
+    }
+
+
+def get_card(jobs_df, row: int) -> dict:
+    """Cached card for a jobs_df row; the cache resets when a new jobs snapshot is published."""
+    global _store, _cards, _card_json
+    with _lock:
+        if _store is not jobs_df:
+            _store, _cards, _card_json = jobs_df, {}, {}
+        card = _cards.get(row)
+    if card is not None:
+        metrics.record_cache("job_card", True)
+        return card
+
+    metrics.record_cache("job_card", False)
+    card = render_card(jobs_df.iloc[row])
+    body = orjson.dumps(card)
+    with _lock:
+        if _store is jobs_df:
+            _cards[row] = card
+            if card["job_id"] is not None:
+                _card_json[card["job_id"]] = body
+    return card
+
+
+def recommendation(card: dict, match_percentage: float) -> dict:
+    return {**card, "match_percentage": match_percentage}
+
+
+def _recommendation_json(rec: dict, item_id) -> bytes:
+    with _lock:
+        body = _card_json.get(rec.get("job_id"))
+    if body is None:
+        # Rendered against a snapshot that has since been replaced.
+        return orjson.dumps({**rec, "recommendation_item_id": str(item_id)})
+    return b"".join((
+        body[:-1],
+        b',"match_percentage":', orjson.dumps(rec["match_percentage"]),
+        b',"recommendation_item_id":', orjson.dumps(str(item_id)),
+        b"}",
+    ))
+
+
+def render_recommendations(
+    envelope: dict, key: str, results: list[dict], item_ids: list, fields: tuple[str, ...] | None = None
+) -> bytes:
+    """
+    `envelope` as JSON with `key` holding the recommendations, spliced from cached
+    card bytes; with `fields`, only those fields of each recommendation are encoded.
+    """
+    if fields is None:
+        items = b",".join(_recommendation_json(rec, item_id) for rec, item_id in zip(results, item_ids))
+    else:
+        items = b",".join(
+            orjson.dumps({name: str(item_id) if name == "recommendation_item_id" else rec.get(name) for name in fields})
+            for rec, item_id in zip(results, item_ids)
+        )
+    head = orjson.dumps(envelope)
+    separator = b"," if len(envelope) else b""
+    return b"".join((head[:-1], separator, orjson.dumps(key), b":[", items, b"]}"))
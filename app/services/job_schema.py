@@ -0,0 +1,253 @@
+import math
+import os
+import re
+from datetime import datetime, timezone
+
+# Canonical job schema: one snake_case key per field and typed values -
+# numeric salaries, datetime dates, skills as a list (v2); normalized links and
+# a numeric experience range (v3). `canonical_job_update` is the single
+# canonicalization stage: job create/update, the CSV uploader and the JSearch
+# importer run it at ingest so read paths are plain field access.
+#
+# Jobs written before it store every field twice (`title` + `Job Title`, ...),
+# and CSV uploads stored only the legacy names. tools/migrate_job_schema.py
+# rewrites stored jobs in place; until it has finished, reads go through the
+# shim below (`read_job` / `job_field`), which accepts either shape.
+
+SCHEMA_VERSION = 3
+
+# Query legacy field names as well while the migration rolls out. Set to 0 once
+# `tools/migrate_job_schema.py --status` reports no legacy jobs left.
+JOB_SCHEMA_COMPAT = os.getenv("JOB_SCHEMA_COMPAT", "1") == "1"
+
+LEGACY_FIELD_MAP = {
+    "title": "Job Title",
+    "company": "Company Name",
+    "location": "Location",
+    "type": "Job Type",
+    "experience_level": "Experience Level",
+    "salary_min": "Salary Min (?)",
+    "salary_max": "Salary Max (?)",
+    "min_education": "Min Education",
+    "category": "Category",
+    "openings": "Openings",
+    "notice_period": "Notice Period",
+    "year_of_passing": "Year of Passing",
+    "job_link": "Direct Link",
+    "work_type": "Work Type",
+    "interview_type": "Interview Type",
+    "company_website": "Company Website",
+    "company_description": "Company Description",
+    "description": "Job Description",
+    "requirements": "Requirements",
+    "responsibilities": "Responsibilities",
+    "skills": "Skills",
+}
+
+NUMERIC_FIELDS = ("salary_min", "salary_max")
+LINK_FIELDS = ("company_website", "job_link")
+DATE_FIELDS = ("created_date", "created_at", "updated_at")
+_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%m/%d/%Y")
+_NUMBER_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(k|m|lakh|lac|lpa)?\b", re.IGNORECASE)
+_NUMBER_SCALE = {"k": 1_000, "m": 1_000_000, "lakh": 100_000, "lac": 100_000, "lpa": 100_000}
+_EMAIL_RE = re.compile(r"([A-Za-z0-9._%+-]+)\s*@\s*([A-Za-z0-9.-]+\.[A-Za-z]{2,})")
+_HTTP_RE = re.compile(r"(https?://[^\s]+)", re.IGNORECASE)
+_DOMAIN_RE = re.compile(r"((?:www\.)?[A-Za-z0-9.-]+\.[A-Za-z]{2,}(?:/[^\s]*)?)")
+_EXPERIENCE_RANGE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:-|–|to)\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+_EXPERIENCE_MIN_RE = re.compile(r"(\d+(?:\.\d+)?)\s*\+")
+_EXPERIENCE_YEARS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:years?|yrs?)", re.IGNORECASE)
+
+
+def _is_missing(value) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    if isinstance(value, datetime) and value != value:  # pandas NaT
+        return True
+    if isinstance(value, str) and value.strip().lower() in {"", "nan", "none", "null"}:
+        return True
+    return False
+
+
+def fields(*names: str) -> list[str]:
+    """Stored keys to query for canonical field names (legacy names too while in compat mode)."""
+    out = list(names)
+    if JOB_SCHEMA_COMPAT:
+        out += [LEGACY_FIELD_MAP[name] for name in names if name in LEGACY_FIELD_MAP]
+    return out
+
+
+def normalize_skills(skills) -> list[str]:
+    if _is_missing(skills):
+        return []
+    if isinstance(skills, (list, tuple)):
+        return [str(item).strip() for item in skills if str(item).strip()]
+    if isinstance(skills, str):
+        parts = [p.strip() for p in re.split(r"[,|]", skills)]
+        return [p for p in parts if p]
+    return [str(skills).strip()]
+
+
+def to_number(value):
+    """`"50,000"`, `"50k"`, `"5 LPA"` -> int/float; None when missing; unparseable text is returned as-is."""
+    if _is_missing(value):
+        return None
+    if isinstance(value, (int, float)):
+        number = value
+    else:
+        match = _NUMBER_RE.search(str(value).replace(",", ""))
+        if not match:
+            return str(value).strip()
+        number = float(match.group(1)) * _NUMBER_SCALE.get((match.group(2) or "").lower(), 1)
+    return int(number) if float(number).is_integer() else float(number)
+
+
+def number_text(value) -> str | None:
+    """Display form of a numeric field: `50000`, not `50000.0`."""
+    if _is_missing(value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def to_datetime(value):
+    """Stored date -> naive UTC datetime; None when missing or unparseable."""
+    if _is_missing(value):
+        return None
+    if hasattr(value, "to_pydatetime"):  # pandas Timestamp
+        value = value.to_pydatetime()
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    text = str(value).strip()
+    try:
+        return to_datetime(datetime.fromisoformat(text.replace("Z", "+00:00")))
+    except ValueError:
+        pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def normalize_link(raw, fallback=None) -> str | None:
+    """`mailto:` for an email, `https://...` for a bare domain, None when there is no link."""
+    primary = "" if _is_missing(raw) else str(raw).strip()
+    backup = "" if _is_missing(fallback) else str(fallback).strip()
+    candidate = primary or backup
+    if not candidate:
+        return None
+
+    email_match = _EMAIL_RE.search(candidate)
+    if email_match:
+        email = f"{email_match.group(1)}@{email_match.group(2)}".rstrip(".,;")
+        return f"mailto:{email}"
+
+    candidate = re.sub(r"^(https?):\s*", r"\1://", candidate, flags=re.IGNORECASE)
+    candidate = re.sub(r"^(https?://[^/\s]+)\s+", r"\1/", candidate, flags=re.IGNORECASE)
+    candidate = candidate.replace("\\", "/").strip().rstrip(".,;")
+    candidate = re.sub(r"\s+", "", candidate)
+
+    http_match = _HTTP_RE.search(candidate)
+    if http_match:
+        return http_match.group(1).rstrip(".,;")
+
+    domain_match = _DOMAIN_RE.search(candidate)
+    if domain_match:
+        normalized = domain_match.group(1).rstrip(".,;")
+        if not normalized.lower().startswith(("http://", "https://")):
+            normalized = f"https://{normalized}"
+        return normalized
+
+    return None
+
+
+def experience_range(text) -> tuple:
+    """`"2-5 years"` -> (2, 5), `"5+ yrs"` -> (5, None), `"Fresher"` -> (0, 0); (None, None) if unknown."""
+    if _is_missing(text):
+        return None, None
+    text = str(text)
+    match = _EXPERIENCE_RANGE_RE.search(text)
+    if match:
+        low, high = to_number(match.group(1)), to_number(match.group(2))
+        return min(low, high), max(low, high)
+    match = _EXPERIENCE_MIN_RE.search(text)
+    if match:
+        return to_number(match.group(1)), None
+    match = _EXPERIENCE_YEARS_RE.search(text)
+    if match:
+        years = to_number(match.group(1))
+        return years, years
+    if re.search(r"\bfresher\b", text, re.IGNORECASE):
+        return 0, 0
+    return None, None
+
+
+def job_field(doc: dict, field: str, default=None):
+    """One field from a stored job in either shape, canonical key first."""
+    value = doc.get(field)
+    if _is_missing(value) and field in LEGACY_FIELD_MAP:
+        value = doc.get(LEGACY_FIELD_MAP[field])
+    return default if _is_missing(value) else value
+
+
+def canonical_job_update(doc: dict) -> tuple[dict, dict]:
+    """`$set` and `$unset` documents that rewrite one stored job into the canonical schema."""
+    updates: dict = {}
+    for field, legacy in LEGACY_FIELD_MAP.items():
+        value = job_field(doc, field)
+        if field == "skills":
+            value = normalize_skills(value)
+        elif field in NUMERIC_FIELDS:
+            value = to_number(value)
+        elif field in LINK_FIELDS:
+            value = normalize_link(value)
+        elif isinstance(value, str):
+            value = value.strip()
+        if value is not None or field in doc or legacy in doc:
+            updates[field] = value
+
+    # Apply links fall back to the company website.
+    if updates.get("job_link") is None and updates.get("company_website"):
+        updates["job_link"] = updates["company_website"]
+    updates["experience_min"], updates["experience_max"] = experience_range(updates.get("experience_level"))
+
+    for field in DATE_FIELDS:
+        if field in doc:
+            parsed = to_datetime(doc[field])
+            # Unparseable text is kept rather than dropped.
+            updates[field] = parsed if parsed is not None or _is_missing(doc[field]) else doc[field]
+    # Keyset pagination sorts on created_at; legacy CSV rows only had created_date.
+    if not isinstance(updates.get("created_at"), datetime):
+        created = to_datetime(doc.get("created_date"))
+        if created is None and doc.get("_id") is not None and hasattr(doc["_id"], "generation_time"):
+            created = doc["_id"].generation_time.replace(tzinfo=None)
+        if created is not None:
+            updates["created_at"] = created
+
+    if _is_missing(doc.get("source")):
+        updates["source"] = "legacy_import" if "Job Title" in doc else "manual"
+    updates["schema_version"] = SCHEMA_VERSION
+
+    unset = {legacy: "" for legacy in LEGACY_FIELD_MAP.values() if legacy in doc}
+    return updates, unset
+
+
+def canonicalize_job(doc: dict) -> dict:
+    """Copy of `doc` in the canonical schema (for inserts and the read shim)."""
+    updates, unset = canonical_job_update(doc)
+    out = {key: value for key, value in doc.items() if key not in unset}
+    out.update(updates)
+    return out
+
+
+def read_job(doc: dict) -> dict:
+    """Compatibility read shim: migrated jobs pass through, legacy ones are canonicalized in memory."""
+    if (doc.get("schema_version") or 0) >= SCHEMA_VERSION:
+        return doc
+    return canonicalize_job(doc)
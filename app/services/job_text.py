@@ -0,0 +1,46 @@
+import hashlib
+
+import numpy as np
+
+
+def _job_value(job: dict, *keys: str) -> str:
+    for key in keys:
+        raw = job.get(key)
+        if raw is None:
+            continue
+        if isinstance(raw, (float, np.floating)) and np.isnan(raw):
+            continue
+        if isinstance(raw, list):
+            raw = ", ".join(str(item).strip() for item in raw if str(item).strip())
+        value = str(raw).strip()
+        if value.lower() in {"nan", "none", "null"}:
+            continue
+        if value:
+            return value
+    return ""
+
+
+def build_job_text(job: dict) -> str:
+    """Canonical text that is embedded into the FAISS index for a job."""
+    return "\n".join(
+        [
+            f"Job Title: {_job_value(job, 'title', 'Job Title')}",
+            f"Company: {_job_value(job, 'company', 'Company Name')}",
+            f"Category: {_job_value(job, 'category', 'Category')}",
+            f"Experience Level: {_job_value(job, 'experience_level', 'Experience Level')}",
+            f"Work Type: {_job_value(job, 'work_type', 'Work Type')}",
+            f"Skills: {_job_value(job, 'skills', 'Skills')}",
+            f"Requirements: {_job_value(job, 'requirements', 'Requirements')}",
+            f"Responsibilities: {_job_value(job, 'responsibilities', 'Responsibilities')}",
+            f"Job Description: {_job_value(job, 'description', 'Job Description')}",
+        ]
+    )
+
+
+def job_skills_text(job: dict) -> str:
+    return _job_value(job, "skills", "Skills")
+
+
+def job_content_hash(job: dict) -> str:
+    """Stable hash of the canonical job text, used to detect edits that need re-embedding."""
+    return hashlib.sha256(build_job_text(job).encode("utf-8")).hexdigest()
@@ -0,0 +1,66 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Startup / reload stages and their last outcome. A stage keeps its previous
+# status while it re-runs, and a stage that has succeeded once stays "ok" when
+# a later re-run fails (the error goes to `last_error`): a failed background
+# reload leaves the previous snapshot serving, so the worker is still ready.
+_lock = threading.Lock()
+_stages: dict[str, dict] = {}
+_required: tuple[str, ...] = ()
+
+
+def expect(*names: str):
+    """Declare the stages that must have succeeded before the worker is ready."""
+    global _required
+    with _lock:
+        _required = tuple(names)
+        for name in names:
+            _stages.setdefault(name, {"status": "pending", "running": False})
+
+
+@contextmanager
+def stage(name: str):
+    start = time.perf_counter()
+    with _lock:
+        entry = _stages.setdefault(name, {"status": "pending"})
+        entry["running"] = True
+    try:
+        yield
+    except Exception as e:
+        _finish(name, "failed", start, str(e))
+        raise
+    _finish(name, "ok", start, None)
+
+
+def _finish(name: str, status: str, start: float, error):
+    now = datetime.now(timezone.utc).isoformat()
+    with _lock:
+        entry = _stages[name]
+        entry.update({"running": False, "duration_ms": round((time.perf_counter() - start) * 1000, 2)})
+        if status == "failed" and entry.get("status") == "ok":
+            entry.update({"last_error": error, "last_failed_at": now})
+            return
+        entry.update({"status": status, "error": error, "completed_at": now})
+
+
+def run(name: str, fn, *args, **kwargs):
+    with stage(name):
+        return fn(*args, **kwargs)
+
+
+def is_ready() -> bool:
+    with _lock:
+        return bool(_required) and all(_stages.get(name, {}).get("status") == "ok" for name in _required)
+
+
+def snapshot() -> dict:
+    with _lock:
+        stages = {name: dict(entry) for name, entry in _stages.items()}
+        required = _required
+    return {
+        "ready": bool(required) and all(stages.get(name, {}).get("status") == "ok" for name in required),
+        "stages": stages,
+    }
@@ -3,24 +3,32 @@
 # Production-safe + optimized
 # =============================
 
+import contextvars
 import os
-import re
 import numpy as np
-import torch
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from sentence_transformers import SentenceTransformer
 
+from app.core import metrics
 from app.core.config import DATA_DIR
+from app.services import job_cards, text_search
+from app.services.job_cards import pick_first_value
 from app.services.resume_parser import parse_resume
-from app.services.index_manager import get_index, get_jobs_df
+from app.services.index_manager import get_snapshot, search_k
+from app.services.skill_matcher import get_skill_matcher, skill_overlap_counts
 
 # -----------------------------
 # HuggingFace cache config
 # -----------------------------
 CACHE_DIR = os.getenv("HF_CACHE_DIR", os.path.join(DATA_DIR, "hf_cache"))
-os.environ["HF_HOME"] = CACHE_DIR
-os.environ["TRANSFORMERS_CACHE"] = CACHE_DIR
-os.makedirs(CACHE_DIR, exist_ok=True)
+
+
+def _configure_hf_cache():
+    # Must run before transformers is imported for the cache location to stick.
+    os.environ["HF_HOME"] = CACHE_DIR
+    os.environ["TRANSFORMERS_CACHE"] = CACHE_DIR
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
 
 # -----------------------------
 # Model config
@@ -28,8 +36,27 @@ os.makedirs(CACHE_DIR, exist_ok=True)
 MODEL_NAME = "BAAI/bge-small-en-v1.5"
 TOP_K = 20
 
+# -----------------------------
+# Hybrid retrieval config
+# A BM25 leg over job texts runs next to the FAISS leg; the two ranked lists
+# are merged with reciprocal-rank fusion before reranking.
+# -----------------------------
+HYBRID_RETRIEVAL = os.getenv("HYBRID_RETRIEVAL", "1") == "1"
+LEXICAL_TOP_K = int(os.getenv("LEXICAL_TOP_K", "40"))
+RRF_K = 60
+CANDIDATE_POOL = 2 * TOP_K
+LEXICAL_WEIGHT = 0.05
+# Resume lines this short are treated as headings / job titles for the BM25 query.
+TITLE_LINE_MAX_WORDS = 5
+TITLE_TERM_WEIGHT = 0.5
+MAX_LEXICAL_TERMS = 64
+
+_lexical_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lexical")
+
 # -----------------------------
 # Load model once (singleton)
+# torch / sentence-transformers are imported here, not at module import,
+# so code paths that never embed don't pay for them.
 # -----------------------------
 _model = None
 
@@ -37,6 +64,10 @@ _model = None
 def get_model():
     global _model
     if _model is None:
+        _configure_hf_cache()
+        import torch
+        from sentence_transformers import SentenceTransformer
+
         print("🔥 Loading embedding model at runtime...")
         _model = SentenceTransformer(
             MODEL_NAME,
@@ -51,87 +82,32 @@ def get_model():
 # -----------------------------
 # Utils
 # -----------------------------
-def clean_text(raw):
-    if raw is None:
-        return ""
-
-    if isinstance(raw, (float, np.floating)) and np.isnan(raw):
-        return ""
-
-    try:
-        if np.isscalar(raw) and np.isnan(raw):
-            return ""
-    except TypeError:
-        pass
-
-    text = str(raw).strip()
-    return "" if text.lower() in {"nan", "none", "null"} else text
-
-
-def pick_first_value(source, *keys):
-    for key in keys:
-        value = clean_text(source.get(key))
-        if value:
-            return value
-    return ""
-
-
-def clean_job_link(raw):
-    raw = clean_text(raw)
-    if not raw:
-        return ""
-
-    email_match = re.search(r"([A-Za-z0-9._%+-]+)\s*@\s*([A-Za-z0-9.-]+\.[A-Za-z]{2,})", raw)
-    if email_match:
-        email = f"{email_match.group(1)}@{email_match.group(2)}".rstrip(".,;")
-        return f"mailto:{email}"
-
-    raw = re.sub(r"^(https?):\s*", r"\1://", raw, flags=re.IGNORECASE)
-    raw = re.sub(r"^(https?://[^/\s]+)\s+", r"\1/", raw, flags=re.IGNORECASE)
-    raw = raw.replace("\\", "/").strip().rstrip(".,;")
-    raw = re.sub(r"\s+", "", raw)
-
-    match = re.search(r"(https?://[^\s]+)", raw)
-    if match:
-        return match.group(1).rstrip(".,;")
-
-    domain_match = re.search(r"((?:www\.)?[A-Za-z0-9.-]+\.[A-Za-z]{2,}(?:/[^\s]*)?)", raw)
-    if domain_match:
-        normalized = domain_match.group(1).rstrip(".,;")
-        if not normalized.lower().startswith(("http://", "https://")):
-            normalized = f"https://{normalized}"
-        return normalized
+def recency_boost(created_date, max_boost=0.08, decay_days=30):
+    # Stored dates are naive UTC datetimes (canonicalized at ingest).
+    if not isinstance(created_date, datetime) or created_date != created_date:
+        return 0.0
+    if created_date.tzinfo is None:
+        created_date = created_date.replace(tzinfo=timezone.utc)
 
-    return raw
+    age_days = max((datetime.now(timezone.utc) - created_date).days, 0)
+    return max_boost * max(0, (decay_days - age_days) / decay_days)
 
 
-def recency_boost(created_date, max_boost=0.08, decay_days=30):
-    try:
-        if isinstance(created_date, str):
-            created_dt = datetime.fromisoformat(created_date.replace("Z", "+00:00"))
-        elif isinstance(created_date, datetime):
-            created_dt = created_date
-        else:
-            return 0.0
-
-        now = datetime.now(timezone.utc)
-        age_days = max((now - created_dt).days, 0)
-        return max_boost * max(0, (decay_days - age_days) / decay_days)
-
-    except Exception:
-        return 0.0
+def experience_matches(years, row) -> bool:
+    low, high = row.get("experience_min"), row.get("experience_max")
+    if low is None or low != low:
+        # No parsed range (e.g. "Senior"): fall back to the text.
+        return str(years) in pick_first_value(row, "experience_level")
+    return low <= years and (high is None or high != high or years <= high)
 
 
-def final_score(similarity, row, resume_data):
+def final_score(similarity, row, resume_data, overlap=0, lexical=0.0):
     score = similarity
-
-    job_skills = pick_first_value(row, "skills", "Skills").lower()
-    overlap = sum(1 for s in resume_data["skills"] if s in job_skills)
     score += 0.07 * overlap
+    score += LEXICAL_WEIGHT * lexical
 
     if resume_data.get("experience_years"):
-        exp_value = pick_first_value(row, "experience_level", "Experience Level")
-        if str(resume_data["experience_years"]) in exp_value:
+        if experience_matches(resume_data["experience_years"], row):
             score += 0.15
 
     score += recency_boost(row.get("created_date"))
@@ -141,80 +117,147 @@ def final_score(similarity, row, resume_data):
 # -----------------------------
 # Main recommender
 # -----------------------------
-def recommend_jobs(resume_text: str):
-    index = get_index()
-    df = get_jobs_df()
+def lexical_query_terms(raw_text: str, resume_data: dict) -> dict[str, float]:
+    """
+    BM25 query from the resume: extracted skills at full weight, heading-like
+    lines as titles. `raw_text` must keep the extracted line breaks; the
+    cleaned text is a single line and yields no titles.
+    """
+    weights: dict[str, float] = {}
+    for skill in resume_data.get("skills") or []:
+        for term in text_search.tokenize(skill):
+            weights[term] = 1.0
+
+    for line in (raw_text or "").splitlines():
+        words = line.split()
+        if not words or len(words) > TITLE_LINE_MAX_WORDS or "@" in line or any(ch.isdigit() for ch in line):
+            continue
+        for term in text_search.tokenize(line):
+            weights.setdefault(term, TITLE_TERM_WEIGHT)
+
+    top = sorted(weights.items(), key=lambda kv: kv[1], reverse=True)[:MAX_LEXICAL_TERMS]
+    return dict(top)
+
+
+def _lexical_search(raw_text, resume_data, job_rows):
+    """Lexical leg: (row, normalized BM25) best first, limited to jobs in this snapshot."""
+    search_index = text_search.get_index()
+    if search_index is None or not job_rows:
+        return []
+    with metrics.stage("lexical"):
+        hits = search_index.score_terms(lexical_query_terms(raw_text, resume_data), LEXICAL_TOP_K)
+    if not hits:
+        return []
+    top_score = hits[0][1] or 1.0
+    return [(job_rows[job_id], score / top_score) for job_id, score in hits if job_id in job_rows]
+
+
+def _fuse(dense, lexical):
+    """Reciprocal-rank fusion of (row, score) lists; returns the candidate pool rows, best first."""
+    fused: dict[int, float] = {}
+    for hits in (dense, lexical):
+        for rank, (row, _) in enumerate(hits):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (RRF_K + rank + 1)
+    return sorted(fused, key=fused.get, reverse=True)[:CANDIDATE_POOL]
+
+
+def recommend_jobs(resume_text: str, raw_text: str | None = None):
+    """`raw_text` is the extracted text before clean_text(); title terms come from its lines."""
+    index, df, row_lookup, skill_bits, job_rows, row_positions = get_snapshot()
 
     if index is None or df is None or df.empty:
         return {
             "error": "Recommendation system is warming up. Please try again shortly."
         }
 
-    resume_data = parse_resume(resume_text)
+    with metrics.stage("parse"):
+        resume_data = parse_resume(resume_text)
+
+    # The lexical leg needs the parsed skills, so it starts after parsing and
+    # overlaps with encoding + FAISS search on this thread.
+    lexical_future = None
+    if HYBRID_RETRIEVAL:
+        lexical_future = _lexical_pool.submit(
+            contextvars.copy_context().run, _lexical_search,
+            raw_text if raw_text is not None else resume_text, resume_data, job_rows,
+        )
+
     model = get_model()
 
-    emb_vec = model.encode(
-        [resume_text],
-        normalize_embeddings=True
-    )[0]
+    with metrics.stage("encode"):
+        emb_vec = model.encode(
+            [resume_text],
+            normalize_embeddings=True
+        )[0]
 
     emb = np.asarray([emb_vec], dtype="float32")
-    scores, indices = index.search(emb, TOP_K)
 
-    ranked = []
-    for rank, idx in enumerate(indices[0]):
-        if idx >= len(df):
+    # Edited jobs leave orphaned vectors behind; over-fetch (bounded) so they don't eat into TOP_K.
+    with metrics.stage("search"):
+        scores, indices = index.search(emb, search_k(TOP_K, index.ntotal))
+
+    dense = []
+    for score, position in zip(scores[0], indices[0]):
+        if position < 0 or row_lookup is None or position >= len(row_lookup):
             continue
+        row = int(row_lookup[position])
+        if row >= 0:
+            dense.append((row, float(score)))
+
+    lexical = []
+    if lexical_future is not None:
+        try:
+            lexical = lexical_future.result()
+        except Exception as e:
+            print(f"⚠️ Lexical retrieval failed, using dense results only: {e}")
+
+    with metrics.stage("rerank"):
+        candidates = _candidate_scores(emb[0], index, dense, lexical, row_positions)
+        return _rerank(resume_data, candidates, df, skill_bits)
+
+
+def _candidate_scores(emb_vec, index, dense, lexical, row_positions):
+    """(row, cosine similarity, normalized BM25) for the fused candidate pool."""
+    similarity = dict(dense)
+    lexical_score = dict(lexical)
+    pool = _fuse(dense, lexical) if lexical else [row for row, _ in dense]
+
+    candidates = []
+    for row in pool:
+        sim = similarity.get(row)
+        if sim is None:
+            # Lexical-only hit: score it with its stored vector, like a dense hit.
+            position = row_positions[row] if row_positions is not None and row < len(row_positions) else -1
+            if position < 0:
+                continue
+            sim = float(np.dot(index.reconstruct(int(position)), emb_vec))
+        candidates.append((row, sim, lexical_score.get(row, 0.0)))
+    return candidates
+
+
+def _rerank(resume_data, candidates, df, skill_bits):
+    # Skill overlap for every candidate in one bitset AND + popcount.
+    resume_bits = get_skill_matcher().to_bits(resume_data["skill_ids"])
+    candidate_rows = np.asarray([idx for idx, _, _ in candidates], dtype=np.int64)
+    if skill_bits is not None and len(skill_bits) == len(df):
+        overlaps = skill_overlap_counts(skill_bits[candidate_rows], resume_bits)
+    else:
+        overlaps = np.zeros(len(candidates), dtype=np.int64)
 
+    ranked = []
+    for (idx, sim, lexical), overlap in zip(candidates, overlaps):
         row = df.iloc[idx]
-        sim = float(scores[0][rank])
-        score = final_score(sim, row, resume_data)
+        score = final_score(sim, row, resume_data, int(overlap), lexical)
 
-        created_date = row.get("created_date")
-        try:
-            if isinstance(created_date, str):
-                created_dt = datetime.fromisoformat(created_date.replace("Z", "+00:00"))
-            else:
-                created_dt = created_date
-        except Exception:
+        created_dt = row.get("created_date")
+        if not isinstance(created_dt, datetime) or created_dt != created_dt:
             created_dt = datetime.min
 
         ranked.append((score, created_dt, idx))
 
     ranked.sort(key=lambda x: (x[0], x[1]), reverse=True)
 
-    results = []
-    for score, _, idx in ranked[:TOP_K]:
-        job = df.iloc[idx]
-        raw_id = job.get("_id")
-        job_id = str(raw_id) if raw_id is not None else None
-
-        results.append({
-            "job_id": job_id,
-            "job_title": pick_first_value(job, "title", "Job Title"),
-            "company": pick_first_value(job, "company", "Company Name"),
-            "location": pick_first_value(job, "location", "Location"),
-            "type": pick_first_value(job, "type", "Job Type"),
-            "experience": pick_first_value(job, "experience_level", "Experience Level"),
-            "experience_level": pick_first_value(job, "experience_level", "Experience Level"),
-            "min_education": pick_first_value(job, "min_education", "Min Education"),
-            "category": pick_first_value(job, "category", "Category"),
-            "openings": pick_first_value(job, "openings", "Openings"),
-            "notice_period": pick_first_value(job, "notice_period", "Notice Period"),
-            "year_of_passing": pick_first_value(job, "year_of_passing", "Year of Passing"),
-            "work_type": pick_first_value(job, "work_type", "Work Type"),
-            "interview_type": pick_first_value(job, "interview_type", "Interview Type"),
-            "company_website": clean_job_link(pick_first_value(job, "company_website", "Company Website")),
-            "company_description": pick_first_value(job, "company_description", "Company Description"),
-            "description": pick_first_value(job, "description", "Job Description"),
-            "requirements": pick_first_value(job, "requirements", "Requirements"),
-            "responsibilities": pick_first_value(job, "responsibilities", "Responsibilities"),
-            "skills": pick_first_value(job, "skills", "Skills"),
-            "salary_min": pick_first_value(job, "salary_min", "Salary Min (?)"),
-            "salary_max": pick_first_value(job, "salary_max", "Salary Max (?)"),
-            "match_percentage": round(min(score * 100, 100), 2),
-            "created_date": clean_text(job.get("created_at") or job.get("created_date", "")),
-            "job_link": clean_job_link(pick_first_value(job, "job_link", "Direct Link")),
-        })
-
-    return results
+    return [
+        job_cards.recommendation(job_cards.get_card(df, idx), round(min(score * 100, 100), 2))
+        for score, _, idx in ranked[:TOP_K]
+    ]
@@ -0,0 +1,266 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.core.database import (
+    applications_collection,
+    jobs_collection,
+    migrations_collection,
+    recommendation_items_collection,
+    report_rollups_collection,
+)
+from app.repositories.report_rollups import GLOBAL_KEY, bucket_id, day_of, increment
+
+# Reports read pre-aggregated daily buckets (see app/repositories/report_rollups.py)
+# instead of scanning raw events. Once a night one worker re-aggregates the last
+# REPORT_ROLLUP_RECONCILE_DAYS closed days from the raw collections and rewrites
+# their buckets; on first start the whole history is backfilled the same way.
+
+RECONCILE_DAYS = int(os.getenv("REPORT_ROLLUP_RECONCILE_DAYS", "3"))
+RECONCILE_HOUR_UTC = int(os.getenv("REPORT_ROLLUP_RECONCILE_HOUR_UTC", "2"))
+# A backfill claim older than this is taken over (its worker died mid-run).
+BACKFILL_LEASE_SECONDS = int(os.getenv("REPORT_ROLLUP_BACKFILL_LEASE_SECONDS", "3600"))
+SCHEDULER_POLL_SECONDS = 600
+WRITE_BATCH_SIZE = 1000
+
+STATE_ID = "report_rollups"
+COUNTERS = {
+    "global": ("recommended", "applied"),
+    "user": ("recommended", "applied", "not_applied"),
+    "job": ("recommended", "applied"),
+    "employer": ("jobs_posted",),
+}
+
+
+def record_job_posted(posted_by: dict, at: datetime) -> None:
+    """Count a job created by an employer (sync twin of the repository recorders)."""
+    if posted_by.get("role") != "employer" or not posted_by.get("user_id"):
+        return
+    op = increment(
+        "employer", posted_by["user_id"], day_of(at), {"jobs_posted": 1},
+        {"company_name": posted_by.get("company_name"), "email": posted_by.get("email")},
+    )
+    try:
+        report_rollups_collection.bulk_write([op])
+    except Exception as e:
+        print(f"⚠️ Report rollup update failed: {e}")
+
+
+# ---------- Reading ----------
+
+def totals_cursor(
+    scope: str,
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    having: Optional[dict] = None,
+    sort: Optional[dict] = None,
+    limit: int = 0,
+    batch_size: int = 0,
+):
+    """
+    Cursor over counters per key (as `_id`) summed over the days in
+    [date_from, date_to] (inclusive, day granularity). `having` filters,
+    `sort` orders and `limit` caps the summed rows on the server.
+    """
+    query = {"scope": scope}
+    if date_from or date_to:
+        query["day"] = {}
+        if date_from:
+            query["day"]["$gte"] = day_of(date_from)
+        if date_to:
+            query["day"]["$lte"] = day_of(date_to)
+
+    group = {"_id": "$key", **{name: {"$sum": f"${name}"} for name in COUNTERS[scope]}}
+    if scope == "employer":
+        group.update({"company_name": {"$last": "$company_name"}, "email": {"$last": "$email"}})
+
+    pipeline = [{"$match": query}, {"$sort": {"day": 1}}, {"$group": group}]
+    if having:
+        pipeline.append({"$match": having})
+    if sort:
+        pipeline.append({"$sort": {**sort, "_id": 1}})
+    if limit:
+        pipeline.append({"$limit": limit})
+    return report_rollups_collection.aggregate(pipeline, allowDiskUse=True, batchSize=batch_size)
+
+
+def totals(scope: str, date_from: Optional[datetime], date_to: Optional[datetime]) -> dict[str, dict]:
+    """Counters per key summed over the days in [date_from, date_to]."""
+    return {row.pop("_id"): row for row in totals_cursor(scope, date_from, date_to)}
+
+
+def global_totals(date_from: Optional[datetime], date_to: Optional[datetime]) -> dict:
+    totals_by_key = totals("global", date_from, date_to)
+    return totals_by_key.get(GLOBAL_KEY) or {name: 0 for name in COUNTERS["global"]}
+
+
+# ---------- Reconciliation ----------
+
+def _daily_counts(collection, match: dict, key_field: str, counters: dict, extra: Optional[dict] = None):
+    """Raw events grouped by (key, UTC day), yielding (key, day, row)."""
+    group = {
+        "_id": {"key": f"${key_field}", "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}},
+        **counters,
+        **(extra or {}),
+    }
+    for row in collection.aggregate([{"$match": match}, {"$sort": {"created_at": 1}}, {"$group": group}]):
+        key = row["_id"]["key"]
+        if key is None or row["_id"]["day"] is None:
+            continue
+        yield str(key), datetime.strptime(row["_id"]["day"], "%Y-%m-%d"), row
+
+
+def _aggregate_raw(since: Optional[datetime], until: Optional[datetime]) -> dict[str, dict]:
+    created = {}
+    if since:
+        created["$gte"] = since
+    if until:
+        created["$lt"] = until
+    match = {"created_at": created} if created else {"created_at": {"$type": "date"}}
+
+    buckets: dict[str, dict] = {}
+
+    def add(scope, key, day, counts, fields=None):
+        bucket = buckets.setdefault(bucket_id(scope, key, day), {
+            "scope": scope, "key": key, "day": day, **{name: 0 for name in COUNTERS[scope]},
+        })
+        for name, value in counts.items():
+            bucket[name] += value
+        if fields:
+            bucket.update(fields)
+
+    not_applied = {"$sum": {"$cond": [{"$eq": ["$decision", "not_applied"]}, 1, 0]}}
+    for key, day, row in _daily_counts(recommendation_items_collection, match, "user_id",
+                                       {"recommended": {"$sum": 1}, "not_applied": not_applied}):
+        add("user", key, day, {"recommended": row["recommended"], "not_applied": row["not_applied"]})
+        add("global", GLOBAL_KEY, day, {"recommended": row["recommended"]})
+    for key, day, row in _daily_counts(recommendation_items_collection, match, "job_id",
+                                       {"recommended": {"$sum": 1}}):
+        add("job", key, day, {"recommended": row["recommended"]})
+
+    for key, day, row in _daily_counts(applications_collection, match, "user_id", {"applied": {"$sum": 1}}):
+        add("user", key, day, {"applied": row["applied"]})
+        add("global", GLOBAL_KEY, day, {"applied": row["applied"]})
+    for key, day, row in _daily_counts(applications_collection, match, "job_id", {"applied": {"$sum": 1}}):
+        add("job", key, day, {"applied": row["applied"]})
+
+    employer_match = {**match, "posted_by.role": "employer"}
+    for key, day, row in _daily_counts(
+        jobs_collection, employer_match, "posted_by.user_id", {"jobs_posted": {"$sum": 1}},
+        {"company_name": {"$last": "$posted_by.company_name"}, "email": {"$last": "$posted_by.email"}},
+    ):
+        add("employer", key, day, {"jobs_posted": row["jobs_posted"]},
+            {"company_name": row["company_name"], "email": row["email"]})
+
+    return buckets
+
+
+def reconcile(since: Optional[datetime] = None, until: Optional[datetime] = None) -> int:
+    """
+    Rewrite the buckets of days in [since, until) from the raw collections and
+    drop buckets in that range that no longer have events. None means unbounded.
+    Returns the number of buckets written.
+    """
+    since = day_of(since) if since else None
+    until = day_of(until) if until else None
+    stamp = datetime.utcnow()
+    buckets = _aggregate_raw(since, until)
+
+    ops = [
+        UpdateOne({"_id": _id}, {"$set": {**bucket, "reconciled_at": stamp}}, upsert=True)
+        for _id, bucket in buckets.items()
+    ]
+    for start in range(0, len(ops), WRITE_BATCH_SIZE):
+        report_rollups_collection.bulk_write(ops[start:start + WRITE_BATCH_SIZE], ordered=False)
+
+    day_range = {}
+    if since:
+        day_range["$gte"] = since
+    if until:
+        day_range["$lt"] = until
+    stale = {"reconciled_at": {"$ne": stamp}}
+    if day_range:
+        stale["day"] = day_range
+    report_rollups_collection.delete_many(stale)
+    return len(ops)
+
+
+def reconcile_recent(days: int = RECONCILE_DAYS) -> int:
+    """Nightly pass: the last `days` closed days. Today stays with the live counters."""
+    today = day_of(datetime.utcnow())
+    return reconcile(since=today - timedelta(days=days), until=today)
+
+
+def _claim(field: str, value) -> bool:
+    """True for the single worker that moves the state's `field` to `value`."""
+    try:
+        migrations_collection.update_one(
+            {"_id": STATE_ID, field: {"$ne": value}},
+            {"$set": {field: value, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def _claim_backfill() -> bool:
+    """True for the single worker that gets to run the first-start backfill."""
+    now = datetime.utcnow()
+    try:
+        migrations_collection.update_one(
+            {
+                "_id": STATE_ID,
+                "backfilled_at": {"$exists": False},
+                "$or": [
+                    {"backfill_claimed_at": {"$exists": False}},
+                    {"backfill_claimed_at": {"$lt": now - timedelta(seconds=BACKFILL_LEASE_SECONDS)}},
+                ],
+            },
+            {"$set": {"backfill_claimed_at": now, "updated_at": now}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def run_scheduled() -> None:
+    state = migrations_collection.find_one({"_id": STATE_ID}) or {}
+    if not state.get("backfilled_at") and _claim_backfill():
+        if state.get("backfill_claimed_at"):
+            print(f"↪️ Taking over a report rollup backfill claimed at {state['backfill_claimed_at']}")
+        print("🔄 Backfilling report rollups from raw events...")
+        try:
+            written = reconcile()
+        except Exception:
+            migrations_collection.update_one({"_id": STATE_ID}, {"$unset": {"backfill_claimed_at": ""}})
+            raise
+        migrations_collection.update_one({"_id": STATE_ID}, {"$set": {"backfilled_at": datetime.utcnow()}})
+        print(f"✅ Report rollups backfilled ({written} buckets)")
+
+    now = datetime.utcnow()
+    if now.hour >= RECONCILE_HOUR_UTC and _claim("reconciled_day", f"{now:%Y-%m-%d}"):
+        started = time.perf_counter()
+        written = reconcile_recent()
+        print(f"✅ Report rollups reconciled for the last {RECONCILE_DAYS} days "
+              f"({written} buckets, {time.perf_counter() - started:.1f}s)")
+
+
+def start_scheduler():
+    def loop():
+        while True:
+            try:
+                run_scheduled()
+            except Exception as e:
+                print(f"⚠️ Report rollup reconciliation failed: {e}")
+            time.sleep(SCHEDULER_POLL_SECONDS)
+
+    t = threading.Thread(target=loop, name="report-rollups", daemon=True)
+    t.start()
+    return t
@@ -1,20 +1,41 @@
+import os
 import re
 import phonenumbers
-from app.utils.file_reader import read_resume_from_upload
-from app.services.skill_matcher import nlp, matcher
+from app.utils.file_reader import extract_document, read_resume_from_upload
+from app.services.skill_matcher import get_nlp, extract_skills, extract_skill_ids
 
-def extract_skills_from_doc(doc):
-    # We now receive a doc instead of text
-    matches = matcher(doc)
+# "full" runs the whole en_core_web_sm pipeline over the resume.
+# "lite" tokenizes only, splits sentences with a rule-based sentencizer
+# and runs NER on the resume header alone. Skills come from the
+# Aho-Corasick matcher on raw text in both modes.
+PARSER_MODE = os.getenv("RESUME_PARSER_MODE", "full").strip().lower()
+HEADER_TOKENS = 100
+PROJECT_SECTION_CHARS = 2000
+
+_sentencizer = None
+
+
+def _get_sentencizer():
+    global _sentencizer
+    if _sentencizer is None:
+        from spacy.pipeline import Sentencizer
+
+        _sentencizer = Sentencizer()
+    return _sentencizer
+
+def extract_skills_from_text(text):
     skills = set()
-    for _, start, end in matches:
-        skill = doc[start:end].text.lower().strip()
-        skill = re.sub(r"[^a-zA-Z0-9+.# ]", "", skill)
+    for skill in extract_skills(text):
+        skill = re.sub(r"[^a-zA-Z0-9+.# ]", "", skill).strip()
         if len(skill) > 1:
             skills.add(skill)
     return sorted(skills)
 
 
+def extract_skills_from_doc(doc):
+    return extract_skills_from_text(doc.text)
+
+
 def extract_experience_years(text):
     patterns = [
         r"(\d+)\+?\s*years",
@@ -39,13 +60,14 @@ def extract_education_from_doc(doc):
             results.append(sent.text.strip())
     return results
 
-def extract_projects_from_doc(doc):
+def extract_projects_from_doc(doc, lite=False):
     projects = []
     text_lower = doc.text.lower()
     if "project" in text_lower:
         # Fallback to text for slicing but could be optimized further
-        section = text_lower.split("project", 1)[1][:2000]
-        temp_doc = nlp(section)
+        section = text_lower.split("project", 1)[1][:PROJECT_SECTION_CHARS]
+        nlp = get_nlp()
+        temp_doc = _get_sentencizer()(nlp.make_doc(section)) if lite else nlp(section)
         for sent in temp_doc.sents:
             if len(sent.text.strip()) > 20:
                 projects.append(sent.text.strip())
@@ -63,25 +85,61 @@ def extract_phone(text):
     return None
 
 def extract_name_from_doc(doc):
-    # Use the first 300 tokens of the already processed doc
-    for ent in doc[:100].ents:
+    # Use the first 100 tokens of the already processed doc
+    for ent in doc[:HEADER_TOKENS].ents:
         if ent.label_ == "PERSON":
             return ent.text
     return None
 
-def parse_resume(text):
-    doc = nlp(text)
+
+def _ner_pipes(nlp):
+    return [name for name in ("tok2vec", "ner") if name in nlp.pipe_names]
+
+
+def _build_result(text, doc, name_doc, lite):
     return {
-        "name": extract_name_from_doc(doc),
-        "skills": extract_skills_from_doc(doc),
+        "name": extract_name_from_doc(name_doc),
+        "skills": extract_skills_from_text(text),
+        "skill_ids": extract_skill_ids(text),
         "experience_years": extract_experience_years(text),
         "education": extract_education_from_doc(doc),
-        "projects": extract_projects_from_doc(doc),
+        "projects": extract_projects_from_doc(doc, lite=lite),
         "email": extract_email(text),
         "phone": extract_phone(text)
     }
 
 
+def _lite_docs(texts, batch_size):
+    nlp = get_nlp()
+    sentencizer = _get_sentencizer()
+    docs = [sentencizer(doc) for doc in nlp.tokenizer.pipe(texts, batch_size=batch_size)]
+    headers = [doc[:HEADER_TOKENS].text for doc in docs]
+    with nlp.select_pipes(enable=_ner_pipes(nlp)):
+        header_docs = list(nlp.pipe(headers, batch_size=batch_size))
+    return docs, header_docs
+
+
+def parse_resume(text, mode=None):
+    return parse_resumes([text], mode=mode)[0]
+
+
+def parse_resumes(texts, mode=None, batch_size=8):
+    """Parse several resumes in one nlp.pipe pass. `mode` overrides RESUME_PARSER_MODE."""
+    texts = list(texts)
+    lite = (mode or PARSER_MODE) == "lite"
+
+    if lite:
+        docs, name_docs = _lite_docs(texts, batch_size)
+    else:
+        docs = list(get_nlp().pipe(texts, batch_size=batch_size))
+        name_docs = docs
+
+    return [
+        _build_result(text, doc, name_doc, lite)
+        for text, doc, name_doc in zip(texts, docs, name_docs)
+    ]
+
+
 def clean_text(text):
     text = re.sub(r"[^\x20-\x7E]", " ", text)
     text = re.sub(r"\s+", " ", text)
@@ -89,4 +147,10 @@ def clean_text(text):
 
 def parse_resume_file(file):
     raw = read_resume_from_upload(file) # supports UploadFile or str path
-    return clean_text(raw)
\ No newline at end of file
+    return clean_text(raw)
+
+
+def parse_resume_bytes(data, filename):
+    """Extract and clean resume text from an in-memory upload. Returns (text, extraction stats)."""
+    extraction = extract_document(data, filename)
+    return clean_text(extraction["text"]), extraction
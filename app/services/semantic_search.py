@@ -0,0 +1,85 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.core import metrics
+from app.services.index_manager import get_snapshot, search_k
+from app.services.recommender import get_model
+
+# Short-text job search over the live FAISS snapshot used for recommendations.
+# Queries are embedded with the same bge-small model; bge expects an instruction
+# prefix on short queries matched against longer passages (the job texts).
+
+QUERY_INSTRUCTION = "Represent this sentence for searching relevant passages: "
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+MAX_QUERY_CHARS = 256
+
+_embedding_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+
+def normalize_query(q: str) -> str:
+    """Cache key: case and whitespace don't change the meaning of a search box query."""
+    return re.sub(r"\s+", " ", (q or "").strip().lower())[:MAX_QUERY_CHARS]
+
+
+def encode_query(q: str) -> np.ndarray:
+    """Normalized float32 query vector, served from an LRU for repeated queries."""
+    key = normalize_query(q)
+    with _embedding_cache_lock:
+        vector = _embedding_cache.get(key)
+        if vector is not None:
+            _embedding_cache.move_to_end(key)
+    if vector is not None:
+        metrics.record_cache("query_embedding", True)
+        return vector
+
+    metrics.record_cache("query_embedding", False)
+    with metrics.stage("encode"):
+        vector = np.asarray(
+            get_model().encode([QUERY_INSTRUCTION + key], normalize_embeddings=True)[0],
+            dtype="float32",
+        )
+    vector.setflags(write=False)
+
+    with _embedding_cache_lock:
+        _embedding_cache[key] = vector
+        _embedding_cache.move_to_end(key)
+        while len(_embedding_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+    return vector
+
+
+def clear_query_cache():
+    with _embedding_cache_lock:
+        _embedding_cache.clear()
+
+
+def search(q: str, limit: int) -> list[tuple[str, float]] | None:
+    """
+    (job_id, cosine similarity) best first, or None while the index is not loaded.
+    Orphaned vectors from edited jobs are skipped.
+    """
+    index, df, row_lookup, _, _, _ = get_snapshot()
+    if index is None or df is None or df.empty or "_id" not in df.columns or row_lookup is None or index.ntotal == 0:
+        return None
+
+    vector = encode_query(q)
+    with metrics.stage("search"):
+        scores, positions = index.search(vector.reshape(1, -1), search_k(limit, index.ntotal))
+
+    job_ids = df["_id"]
+    hits = []
+    for score, position in zip(scores[0], positions[0]):
+        if position < 0 or position >= len(row_lookup):
+            continue
+        row = int(row_lookup[position])
+        if row < 0:
+            continue
+        hits.append((str(job_ids.iat[row]), float(score)))
+        if len(hits) >= limit:
+            break
+    return hits
@@ -0,0 +1,174 @@
+import os
+import threading
+
+import numpy as np
+
+# Precomputed "similar jobs": the SIMILAR_JOBS_N nearest active jobs for every
+# job, computed from the stored FAISS vectors when a snapshot is loaded, so a
+# job page costs one row read instead of an ANN query.
+#
+# The table is aligned with the snapshot's jobs_df rows: neighbours[row] holds
+# jobs_df rows as int32 (-1 padded) and scores[row] their cosine similarity.
+# When a reload only adds jobs (same ids at the same FAISS positions, new
+# vectors appended), the previous table is remapped and patched instead of
+# being recomputed.
+
+SIMILAR_JOBS_N = int(os.getenv("SIMILAR_JOBS_N", "10"))
+SEARCH_BATCH_SIZE = 1024
+# Above this share of new jobs a full recompute is cheaper than patching.
+MAX_PATCH_FRACTION = 0.2
+# Stored vectors compared on reload to tell an appended index from a rebuilt one.
+PROBE_VECTORS = 32
+
+
+class NeighbourTable:
+    def __init__(self, job_ids, positions, ntotal, neighbours, scores):
+        self.job_ids = job_ids  # jobs_df row -> job id string
+        self.job_rows = {job_id: row for row, job_id in enumerate(job_ids)}
+        self.positions = positions  # jobs_df row -> FAISS position (-1 without a vector)
+        self.ntotal = ntotal
+        self.neighbours = neighbours
+        self.scores = scores
+        self.probe_positions = np.empty(0, dtype=np.int64)
+        self.probe_vectors = None
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.neighbours.nbytes + self.scores.nbytes)
+
+    def similar(self, job_id: str, limit: int = SIMILAR_JOBS_N) -> list[tuple[str, float]] | None:
+        """(job_id, similarity) best first; None when the job is not in this table."""
+        row = self.job_rows.get(job_id)
+        if row is None:
+            return None
+        out = []
+        for neighbour, score in zip(self.neighbours[row, :limit], self.scores[row, :limit]):
+            if neighbour < 0:
+                break
+            out.append((self.job_ids[neighbour], float(score)))
+        return out
+
+
+def _top_n(candidate_rows, candidate_scores, n):
+    """Per query row: the n best candidates by score, skipping -1, padded with -1."""
+    scores = np.where(candidate_rows >= 0, candidate_scores, -np.inf)
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :n]
+    rows = np.take_along_axis(candidate_rows, order, axis=1)
+    top_scores = np.take_along_axis(scores, order, axis=1)
+    missing = ~np.isfinite(top_scores)
+    rows[missing] = -1
+    top_scores[missing] = 0.0
+    return rows.astype(np.int32), top_scores.astype(np.float32)
+
+
+def _search_rows(index, row_lookup, row_positions, query_rows, n):
+    """ANN neighbours of `query_rows`, mapped to jobs_df rows, self and orphans removed."""
+    neighbours = np.full((len(query_rows), n), -1, dtype=np.int32)
+    scores = np.zeros((len(query_rows), n), dtype=np.float32)
+    # Over-fetch: orphaned vectors and the job itself come back as hits too.
+    k = min(index.ntotal, 2 * n + 1)
+    for start in range(0, len(query_rows), SEARCH_BATCH_SIZE):
+        batch = query_rows[start:start + SEARCH_BATCH_SIZE]
+        vectors = index.reconstruct_batch(row_positions[batch])
+        sims, positions = index.search(vectors, k)
+        rows = np.where(positions >= 0, row_lookup[np.clip(positions, 0, None)], -1)
+        rows[rows == batch[:, None]] = -1
+        neighbours[start:start + len(batch)], scores[start:start + len(batch)] = _top_n(rows, sims, n)
+    return neighbours, scores
+
+
+def build_table(index, job_ids, row_lookup, row_positions, previous=None, n=SIMILAR_JOBS_N):
+    """Neighbour table for a snapshot, patched from `previous` when the reload only added jobs."""
+    n_rows = len(job_ids)
+    neighbours = np.full((n_rows, n), -1, dtype=np.int32)
+    scores = np.zeros((n_rows, n), dtype=np.float32)
+    ntotal = index.ntotal if index is not None else 0
+    table = NeighbourTable(job_ids, row_positions, ntotal, neighbours, scores)
+    if n_rows == 0 or ntotal == 0:
+        return table
+
+    mapped = row_positions[row_positions >= 0]
+    table.probe_positions = mapped[np.linspace(0, len(mapped) - 1, min(PROBE_VECTORS, len(mapped))).astype(np.int64)]
+    table.probe_vectors = index.reconstruct_batch(table.probe_positions) if len(mapped) else None
+
+    if previous is not None and _patch(table, previous, index, row_lookup):
+        return table
+
+    query_rows = np.flatnonzero(row_positions >= 0)
+    table.neighbours[query_rows], table.scores[query_rows] = _search_rows(
+        index, row_lookup, row_positions, query_rows, n
+    )
+    return table
+
+
+def _patch(table, previous, index, row_lookup) -> bool:
+    """
+    Fill `table` from `previous` plus the newly added jobs.
+    Returns False (table untouched) when anything other than additions changed.
+    """
+    n = table.neighbours.shape[1]
+    if previous.neighbours.shape[1] != n or table.ntotal < previous.ntotal:
+        return False
+    # A rebuilt index can reuse positions with different vectors.
+    if previous.probe_vectors is None or not np.allclose(
+        index.reconstruct_batch(previous.probe_positions), previous.probe_vectors, atol=1e-6
+    ):
+        return False
+
+    old_to_new = np.full(len(previous), -1, dtype=np.int32)
+    for old_row, job_id in enumerate(previous.job_ids):
+        new_row = table.job_rows.get(job_id)
+        # Removed, deactivated or re-embedded jobs invalidate other jobs' lists.
+        if new_row is None or table.positions[new_row] != previous.positions[old_row]:
+            return False
+        old_to_new[old_row] = new_row
+
+    is_new = np.ones(len(table), dtype=bool)
+    is_new[old_to_new] = False
+    added_rows = np.flatnonzero(is_new & (table.positions >= 0))
+    if np.any(table.positions[added_rows] < previous.ntotal):
+        return False
+    if len(added_rows) > MAX_PATCH_FRACTION * len(table):
+        return False
+
+    # Carry existing lists over to the new row numbering.
+    carried = np.where(previous.neighbours >= 0, old_to_new[np.clip(previous.neighbours, 0, None)], -1)
+    table.neighbours[old_to_new] = carried
+    table.scores[old_to_new] = previous.scores
+    if len(added_rows) == 0:
+        return True
+
+    # New jobs get a fresh ANN query; existing jobs take a new job in when it
+    # beats their current list (exact dot products against the added vectors).
+    table.neighbours[added_rows], table.scores[added_rows] = _search_rows(
+        index, row_lookup, table.positions, added_rows, n
+    )
+    added_vectors = index.reconstruct_batch(table.positions[added_rows])
+    existing_rows = old_to_new[previous.positions >= 0]
+    for start in range(0, len(existing_rows), SEARCH_BATCH_SIZE):
+        batch = existing_rows[start:start + SEARCH_BATCH_SIZE]
+        sims = index.reconstruct_batch(table.positions[batch]) @ added_vectors.T
+        candidate_rows = np.hstack([table.neighbours[batch], np.broadcast_to(added_rows, sims.shape)])
+        candidate_scores = np.hstack([table.scores[batch], sims])
+        table.neighbours[batch], table.scores[batch] = _top_n(candidate_rows, candidate_scores, n)
+    return True
+
+
+# ---------------- module-level table ----------------
+
+_table: NeighbourTable | None = None
+_table_lock = threading.Lock()
+
+
+def publish(table: NeighbourTable | None):
+    global _table
+    with _table_lock:
+        _table = table
+
+
+def get_table() -> NeighbourTable | None:
+    with _table_lock:
+        return _table
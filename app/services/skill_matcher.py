@@ -1,15 +1,188 @@
-import spacy
-from spacy.matcher import PhraseMatcher
+import hashlib
+import os
+import pickle
+import re
+from collections import deque
+
+import numpy as np
+from app.core import metrics
 from app.core.config import DATA_DIR
+from app.services.job_text import job_skills_text
+
+SPACY_MODEL = "en_core_web_sm"
+
+SKILLS_PATH = f"{DATA_DIR}/skills.txt"
+AUTOMATON_CACHE_PATH = f"{DATA_DIR}/skills_automaton.pkl"
+# Bump when the automaton layout changes so stale caches are rebuilt.
+AUTOMATON_FORMAT = 2
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_skill_text(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", text.casefold())
 
-nlp = spacy.load("en_core_web_sm")
 
 def load_skill_db():
-    with open(f"{DATA_DIR}/skills.txt", encoding="utf-8") as f:
+    with open(SKILLS_PATH, encoding="utf-8") as f:
         return set(line.strip().lower() for line in f)
 
-SKILL_DB = load_skill_db()
 
-matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-patterns = [nlp.make_doc(skill) for skill in SKILL_DB]
-matcher.add("SKILLS", patterns)
\ No newline at end of file
+class SkillMatcher:
+    """
+    Case-folded Aho-Corasick automaton over the skills vocabulary.
+
+    Matches raw text in a single pass. A match is only accepted when it sits
+    on token boundaries, so "java" does not fire inside "javascript" while
+    patterns that start or end in punctuation ("c++", ".net") still match.
+    """
+
+    def __init__(self, skills):
+        self.skills = sorted({normalize_skill_text(s).strip() for s in skills if s.strip()})
+        # Skill ids are positions in self.skills; stored ids are only valid for the same vocab.
+        self.vocab_hash = hashlib.sha256("\n".join(self.skills).encode("utf-8")).hexdigest()[:16]
+        self.n_words = (len(self.skills) + 63) // 64
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for skill_id, skill in enumerate(self.skills):
+            self._add(skill, skill_id)
+        self._link()
+
+    def _add(self, pattern, skill_id):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(skill_id)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text):
+        """Yield (start, end, skill_id) over the normalized form of `text`."""
+        text = normalize_skill_text(text)
+        goto, fail, out, skills = self._goto, self._fail, self._out, self.skills
+        size = len(text)
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for skill_id in out[state]:
+                skill = skills[skill_id]
+                start = i - len(skill) + 1
+                if skill[0].isalnum() and start > 0 and text[start - 1].isalnum():
+                    continue
+                if skill[-1].isalnum() and i + 1 < size and text[i + 1].isalnum():
+                    continue
+                yield start, i + 1, skill_id
+
+    def match_ids(self, text):
+        return sorted({skill_id for _, _, skill_id in self.iter_matches(text)})
+
+    def match(self, text):
+        return [self.skills[skill_id] for skill_id in self.match_ids(text)]
+
+    def to_bits(self, skill_ids):
+        """Pack skill ids into a uint64 bitset of length n_words."""
+        bits = np.zeros(self.n_words, dtype=np.uint64)
+        for skill_id in skill_ids:
+            bits[skill_id >> 6] |= np.uint64(1) << np.uint64(skill_id & 63)
+        return bits
+
+
+def _skills_file_hash() -> str:
+    with open(SKILLS_PATH, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _load_or_build_matcher() -> SkillMatcher:
+    skills_hash = _skills_file_hash()
+    try:
+        with open(AUTOMATON_CACHE_PATH, "rb") as f:
+            cached = pickle.load(f)
+        if cached.get("format") == AUTOMATON_FORMAT and cached.get("skills_hash") == skills_hash:
+            metrics.record_cache("skill_automaton", hit=True)
+            return cached["matcher"]
+    except Exception:
+        pass
+
+    metrics.record_cache("skill_automaton", hit=False)
+    built = SkillMatcher(load_skill_db())
+    try:
+        tmp_path = f"{AUTOMATON_CACHE_PATH}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(
+                {"format": AUTOMATON_FORMAT, "skills_hash": skills_hash, "matcher": built},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, AUTOMATON_CACHE_PATH)
+    except OSError as e:
+        print(f"⚠️ Could not cache skill automaton: {e}")
+    return built
+
+
+_nlp = None
+_skill_matcher = None
+
+
+def get_nlp():
+    """Load the spaCy pipeline on first use so importing this module stays cheap."""
+    global _nlp
+    if _nlp is None:
+        import spacy
+
+        _nlp = spacy.load(SPACY_MODEL)
+    return _nlp
+
+
+def get_skill_matcher() -> SkillMatcher:
+    global _skill_matcher
+    if _skill_matcher is None:
+        _skill_matcher = _load_or_build_matcher()
+    return _skill_matcher
+
+
+def extract_skills(text: str) -> list[str]:
+    """Skills from the shared vocabulary found in `text` (resumes and job postings alike)."""
+    return get_skill_matcher().match(text or "")
+
+
+def extract_skill_ids(text: str) -> list[int]:
+    """Sorted skill ids, ignoring single-character skills that match too loosely."""
+    matcher = get_skill_matcher()
+    return [i for i in matcher.match_ids(text or "") if len(matcher.skills[i]) > 1]
+
+
+def job_skill_fields(job: dict) -> dict:
+    """Fields stored on a job document at ingest so scoring never re-extracts skills."""
+    return {
+        "skill_ids": extract_skill_ids(job_skills_text(job)),
+        "skill_vocab": get_skill_matcher().vocab_hash,
+    }
+
+
+def skill_overlap_counts(job_bits: np.ndarray, resume_bits: np.ndarray) -> np.ndarray:
+    """Popcount of (job_bits & resume_bits) per row, for all candidate rows at once."""
+    if job_bits.size == 0:
+        return np.zeros(job_bits.shape[0], dtype=np.int64)
+    shared = np.bitwise_and(job_bits, resume_bits)
+    return np.unpackbits(shared.view(np.uint8), axis=1).sum(axis=1, dtype=np.int64)
@@ -0,0 +1,91 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.core.database import ensure_indexes
+from app.services import readiness, report_rollups
+from app.services.index_manager import get_snapshot, initialize_index, start_auto_refresh
+from app.services.recommender import get_model
+from app.services.resume_parser import parse_resume
+from app.services.skill_matcher import get_nlp, get_skill_matcher
+
+# Stages that must succeed before /ready reports the worker as hot.
+# "drive_modified" and "mongo_indexes" are informational only: serving does
+# not depend on them.
+REQUIRED_STAGES = ("faiss_index", "jobs", "lookups", "model", "nlp", "warmup")
+RETRY_INTERVAL_SECONDS = 30
+
+WARMUP_TEXT = "Python developer with SQL, machine learning and project management experience."
+
+
+def _load_nlp():
+    get_nlp()
+    get_skill_matcher()
+
+
+def _warm_up():
+    """One encode + search + parse so the first real request doesn't pay for lazy init."""
+    index = get_snapshot()[0]
+    if index is None:
+        raise RuntimeError("FAISS index not loaded")
+
+    embedding = get_model().encode([WARMUP_TEXT], normalize_embeddings=True)
+    index.search(np.asarray(embedding, dtype="float32"), 1)
+    parse_resume(WARMUP_TEXT)
+
+
+def run_startup():
+    """Load index/jobs, the embedding model and spaCy concurrently, then warm up."""
+    readiness.expect(*REQUIRED_STAGES)
+
+    with ThreadPoolExecutor(max_workers=4, thread_name_prefix="startup") as pool:
+        index_setup = pool.submit(readiness.run, "mongo_indexes", ensure_indexes)
+        futures = {
+            "index": pool.submit(initialize_index),
+            "model": pool.submit(readiness.run, "model", get_model),
+            "nlp": pool.submit(readiness.run, "nlp", _load_nlp),
+        }
+        failed = []
+        for name, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                print(f"❌ Startup stage '{name}' failed: {e}")
+                failed.append(name)
+
+        try:
+            index_setup.result()
+        except Exception as e:
+            print(f"⚠️ Mongo index setup failed: {e}")
+
+    if failed:
+        return False
+
+    try:
+        readiness.run("warmup", _warm_up)
+    except Exception as e:
+        print(f"❌ Warm-up failed: {e}")
+        return False
+
+    print("✅ Worker is ready")
+    return True
+
+
+def start_background_startup(refresh_interval=900):
+    """
+    Run startup off the event loop, retrying until every required stage has
+    succeeded, then hand over to the periodic index refresh. The nightly
+    report rollup reconciliation starts alongside.
+    """
+    def loop():
+        while not run_startup():
+            time.sleep(RETRY_INTERVAL_SECONDS)
+        start_auto_refresh(refresh_interval)
+
+    # Report rollups only need Mongo; they do not wait for the index or model.
+    report_rollups.start_scheduler()
+    t = threading.Thread(target=loop, name="startup", daemon=True)
+    t.start()
+    return t
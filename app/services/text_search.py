@@ -0,0 +1,246 @@
+import bisect
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from app.core import metrics
+from app.services.job_text import _job_value
+
+# In-process BM25 inverted index over active jobs, keyed by job id string.
+# Built from the same Mongo scan as the FAISS snapshot, then kept current by
+# job writes on this worker and by a periodic `updated_at` catch-up query, so
+# writes handled by other workers show up within SEARCH_SYNC_INTERVAL_SECONDS.
+
+SEARCH_SYNC_INTERVAL_SECONDS = float(os.getenv("SEARCH_SYNC_INTERVAL_SECONDS", "30"))
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Completions considered for a typeahead prefix, and their weight vs an exact term.
+MAX_PREFIX_EXPANSIONS = 50
+PREFIX_WEIGHT = 0.6
+MIN_PREFIX_CHARS = 2
+
+# Field weights: a hit in the title counts three times a hit in the description.
+SEARCH_FIELDS = (
+    (("title", "Job Title"), 3.0),
+    (("skills", "Skills"), 2.0),
+    (("company", "Company Name"), 1.5),
+    (("category", "Category"), 1.0),
+    (("experience_level", "Experience Level"), 0.5),
+    (("work_type", "Work Type"), 0.5),
+    (("requirements", "Requirements"), 1.0),
+    (("responsibilities", "Responsibilities"), 1.0),
+    (("description", "Job Description"), 1.0),
+    (("company_description", "Company Description"), 0.5),
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+_STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our the to we will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word tokens; keeps `c++`, `c#`, `node.js` and `.net`-style terms intact."""
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in _STOP_WORDS]
+
+
+def job_term_weights(job: dict) -> Counter:
+    """Field-weighted term frequencies for one job."""
+    weights = Counter()
+    for keys, weight in SEARCH_FIELDS:
+        text = _job_value(job, *keys)
+        if not text:
+            continue
+        for term, count in Counter(tokenize(text)).items():
+            weights[term] += count * weight
+    return weights
+
+
+class InvertedIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: dict[str, dict[str, float]] = {}
+        self._doc_terms: dict[str, Counter] = {}
+        self._doc_len: dict[str, float] = {}
+        self._total_len = 0.0
+        self._vocab: list[str] = []  # sorted, for prefix lookups
+        self.synced_at = datetime.utcnow()
+        self._last_sync_check = time.monotonic()
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    # ---------------- writes ----------------
+
+    def upsert(self, job_id: str, job: dict):
+        terms = job_term_weights(job)
+        with self._lock:
+            self._remove_locked(job_id)
+            self._insert_locked(job_id, terms, keep_vocab_sorted=True)
+
+    def bulk_load(self, jobs):
+        """Index many jobs at once, sorting the vocabulary a single time at the end."""
+        with self._lock:
+            for job in jobs:
+                if job.get("_id") is None:
+                    continue
+                job_id = str(job["_id"])
+                self._remove_locked(job_id)
+                self._insert_locked(job_id, job_term_weights(job), keep_vocab_sorted=False)
+            self._vocab = sorted(self._postings)
+
+    def _insert_locked(self, job_id: str, terms: Counter, keep_vocab_sorted: bool):
+        if not terms:
+            return
+        for term, weight in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                if keep_vocab_sorted:
+                    bisect.insort(self._vocab, term)
+            postings[job_id] = weight
+        length = sum(terms.values())
+        self._doc_terms[job_id] = terms
+        self._doc_len[job_id] = length
+        self._total_len += length
+
+    def remove(self, job_id: str):
+        with self._lock:
+            self._remove_locked(job_id)
+
+    def _remove_locked(self, job_id: str):
+        terms = self._doc_terms.pop(job_id, None)
+        if terms is None:
+            return
+        self._total_len -= self._doc_len.pop(job_id, 0.0)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(job_id, None)
+            if not postings:
+                del self._postings[term]
+                i = bisect.bisect_left(self._vocab, term)
+                if i < len(self._vocab) and self._vocab[i] == term:
+                    del self._vocab[i]
+
+    def apply_job(self, job: dict):
+        """Upsert an active job or drop an inactive one."""
+        job_id = str(job["_id"])
+        if job.get("is_active") is False:
+            self.remove(job_id)
+        else:
+            self.upsert(job_id, job)
+
+    # ---------------- reads ----------------
+
+    def _expand_prefix(self, prefix: str) -> list[str]:
+        start = bisect.bisect_left(self._vocab, prefix)
+        out = []
+        for term in self._vocab[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            out.append(term)
+        return out
+
+    def query_terms(self, query: str, prefix: bool = True) -> dict[str, float]:
+        """Query terms with weights; the last token also matches as a prefix (typeahead)."""
+        tokens = tokenize(query)
+        weighted = {t: 1.0 for t in tokens}
+        if prefix and tokens and len(tokens[-1]) >= MIN_PREFIX_CHARS and not query.endswith(" "):
+            with self._lock:
+                completions = self._expand_prefix(tokens[-1])
+            for term in completions:
+                weighted.setdefault(term, PREFIX_WEIGHT)
+        return weighted
+
+    def score_terms(self, weighted_terms: dict[str, float], limit: int | None) -> list[tuple[str, float]]:
+        """BM25 over pre-weighted terms; returns (job_id, score) best first, all of them when limit is None."""
+        scores: dict[str, float] = {}
+        with self._lock:
+            n_docs = len(self._doc_terms)
+            if n_docs == 0:
+                return []
+            avg_len = self._total_len / n_docs
+            for term, query_weight in weighted_terms.items():
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for job_id, tf in postings.items():
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[job_id] / avg_len)
+                    scores[job_id] = scores.get(job_id, 0.0) + query_weight * idf * tf * (BM25_K1 + 1) / norm
+
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        return ranked[:limit]
+
+    def search(self, query: str, limit: int | None = 1000, prefix: bool = True) -> list[tuple[str, float]]:
+        return self.score_terms(self.query_terms(query, prefix=prefix), limit)
+
+
+# ---------------- module-level index ----------------
+
+_index: InvertedIndex | None = None
+_index_lock = threading.Lock()
+_sync_lock = threading.Lock()
+
+
+def build_index(jobs_df, synced_at: datetime | None = None) -> InvertedIndex:
+    """Index every job in jobs_df; `synced_at` is when jobs_df was read from Mongo."""
+    index = InvertedIndex()
+    if synced_at is not None:
+        index.synced_at = synced_at
+    if jobs_df is not None and not jobs_df.empty:
+        index.bulk_load(jobs_df.to_dict("records"))
+    return index
+
+
+def publish(index: InvertedIndex):
+    global _index
+    with _index_lock:
+        _index = index
+
+
+def get_index() -> InvertedIndex | None:
+    with _index_lock:
+        return _index
+
+
+def apply_job(job: dict):
+    """Keep this worker's index current after a job write; no-op before the first build."""
+    index = get_index()
+    if index is not None:
+        index.apply_job(job)
+
+
+def remove_job(job_id: str):
+    index = get_index()
+    if index is not None:
+        index.remove(job_id)
+
+
+def sync_recent_changes(jobs_collection):
+    """
+    Fold in jobs written since the last sync (by any worker or importer).
+    Runs at most once per SEARCH_SYNC_INTERVAL_SECONDS; concurrent callers skip.
+    """
+    index = get_index()
+    if index is None or time.monotonic() - index._last_sync_check < SEARCH_SYNC_INTERVAL_SECONDS:
+        return
+    if not _sync_lock.acquire(blocking=False):
+        return
+    try:
+        index._last_sync_check = time.monotonic()
+        started_at = datetime.utcnow()
+        with metrics.stage("search_sync"):
+            for job in jobs_collection.find({"updated_at": {"$gte": index.synced_at}}):
+                index.apply_job(job)
+        index.synced_at = started_at
+    except Exception as e:
+        print(f"⚠️ Search index sync failed: {e}")
+    finally:
+        _sync_lock.release()
@@ -0,0 +1,74 @@
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+
+# Sparse fieldsets: `?fields=title,company` returns only those fields per item,
+# `?compact=true` a fixed list-view subset. Long texts (description,
+# requirements, ...) dominate payload size, so list screens skip them.
+
+COMPACT_RECOMMENDATION_FIELDS = (
+    "job_id",
+    "job_title",
+    "company",
+    "location",
+    "type",
+    "experience_level",
+    "work_type",
+    "salary_min",
+    "salary_max",
+    "match_percentage",
+    "job_link",
+    "created_date",
+)
+
+COMPACT_JOB_FIELDS = (
+    "id",
+    "title",
+    "company",
+    "location",
+    "type",
+    "experience_level",
+    "work_type",
+    "category",
+    "salary_min",
+    "salary_max",
+    "skills",
+    "created_at",
+)
+
+
+def parse_fields(
+    fields: Optional[str],
+    compact: bool,
+    allowed: Iterable[str],
+    compact_fields: tuple[str, ...],
+    always: tuple[str, ...] = (),
+) -> Optional[tuple[str, ...]]:
+    """
+    Requested field names in request order, or None for full items.
+    `always` fields (ids clients need to act on an item) are added to any selection.
+    """
+    if fields is None and not compact:
+        return None
+
+    allowed = set(allowed)
+    selected = list(compact_fields) if compact else []
+    if fields:
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = sorted(set(requested) - allowed)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(sorted(allowed))}.",
+            )
+        selected += requested
+    selected += always
+
+    seen = set()
+    return tuple(name for name in selected if not (name in seen or seen.add(name)))
+
+
+def project(item: dict, fields: Optional[tuple[str, ...]]) -> dict:
+    if fields is None:
+        return item
+    return {name: item.get(name) for name in fields}
@@ -1,19 +1,239 @@
 from io import BytesIO
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from concurrent.futures.process import BrokenProcessPool
 from typing import Union
+import multiprocessing
 import os
+import threading
+import time
 
 from pypdf import PdfReader
 from docx import Document
 
+from app.core import metrics
 
-def _read_pdf_from_bytes(data: bytes) -> str:
+# Extraction runs in separate worker processes so one huge or malformed
+# document cannot pin a request thread. Workers stop early at the page/char
+# limits or when the time budget runs out and return whatever they have.
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "2"))
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "8"))
+EXTRACTION_MAX_PAGES = int(os.getenv("EXTRACTION_MAX_PAGES", "15"))
+EXTRACTION_MAX_CHARS = int(os.getenv("EXTRACTION_MAX_CHARS", "30000"))
+# Extractions allowed to wait for a worker before uploads are shed with 503.
+EXTRACTION_MAX_PENDING = int(os.getenv("EXTRACTION_MAX_PENDING", "16"))
+# Extra wait on top of the worker's own budget before the pool is recycled.
+_HARD_TIMEOUT_GRACE_SECONDS = 2.0
+
+_pool = None
+_pool_lock = threading.Lock()
+# Futures submitted to each pool and not finished yet, and pools being retired
+# with the reason ("timeout" or "crash").
+_inflight: dict[ProcessPoolExecutor, set] = {}
+_retiring: dict[ProcessPoolExecutor, str] = {}
+
+
+def _read_pdf_from_bytes(data: bytes, max_pages=None, max_chars=None, deadline=None) -> dict:
     reader = PdfReader(BytesIO(data))
-    return " ".join([p.extract_text() or "" for p in reader.pages])
+    parts = []
+    chars = 0
+    pages_read = 0
+    stopped_early = False
+    error = None
 
+    for page in reader.pages:
+        if max_pages is not None and pages_read >= max_pages:
+            stopped_early = True
+            break
+        if deadline is not None and time.monotonic() > deadline:
+            stopped_early = True
+            break
+        try:
+            page_text = page.extract_text() or ""
+        except Exception as e:
+            error = f"page {pages_read + 1}: {e}"
+            break
+        parts.append(page_text)
+        chars += len(page_text)
+        pages_read += 1
+        if max_chars is not None and chars >= max_chars:
+            stopped_early = pages_read < len(reader.pages)
+            break
 
-def _read_docx_from_bytes(data: bytes) -> str:
+    return {"text": " ".join(parts), "pages": pages_read, "truncated": stopped_early, "error": error}
+
+
+def _read_docx_from_bytes(data: bytes, max_chars=None, deadline=None) -> dict:
     doc = Document(BytesIO(data))
-    return "\n".join(p.text for p in doc.paragraphs if p.text)
+    parts = []
+    chars = 0
+    stopped_early = False
+
+    for p in doc.paragraphs:
+        if not p.text:
+            continue
+        if (max_chars is not None and chars >= max_chars) or (deadline is not None and time.monotonic() > deadline):
+            stopped_early = True
+            break
+        parts.append(p.text)
+        chars += len(p.text)
+
+    return {"text": "\n".join(parts), "pages": 0, "truncated": stopped_early, "error": None}
+
+
+def _extract_in_worker(data: bytes, ext: str, max_pages: int, max_chars: int, time_budget: float) -> dict:
+    deadline = time.monotonic() + time_budget
+    try:
+        if ext == ".pdf":
+            return _read_pdf_from_bytes(data, max_pages, max_chars, deadline)
+        return _read_docx_from_bytes(data, max_chars, deadline)
+    except Exception as e:
+        return {"text": "", "pages": 0, "truncated": False, "error": str(e)}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn keeps torch/faiss state out of the workers.
+            _pool = ProcessPoolExecutor(
+                max_workers=EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _retire_pool(pool: ProcessPoolExecutor, reason: str, stuck=None):
+    """
+    Stop handing out `pool` and terminate it once its other in-flight
+    extractions have finished (they are bounded by their own time budget).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+        if pool in _retiring:
+            return
+        _retiring[pool] = reason
+        others = [future for future in _inflight.get(pool, ()) if future is not stuck]
+
+    def reap():
+        wait(others, timeout=EXTRACTION_TIMEOUT_SECONDS + _HARD_TIMEOUT_GRACE_SECONDS)
+        # ProcessPoolExecutor cannot cancel a running task; terminate its processes directly.
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        with _pool_lock:
+            _inflight.pop(pool, None)
+            _retiring.pop(pool, None)
+
+    threading.Thread(target=reap, name="extraction-reaper", daemon=True).start()
+
+
+def _retire_reason(pool: ProcessPoolExecutor) -> str | None:
+    with _pool_lock:
+        return _retiring.get(pool)
+
+
+def _submit(pool: ProcessPoolExecutor, data: bytes, ext: str):
+    """Submit an extraction to `pool`, or return None when its queue is full."""
+    with _pool_lock:
+        inflight = _inflight.setdefault(pool, set())
+        if len(inflight) >= EXTRACTION_WORKERS + EXTRACTION_MAX_PENDING:
+            return None
+        future = pool.submit(
+            _extract_in_worker,
+            data,
+            ext,
+            EXTRACTION_MAX_PAGES,
+            EXTRACTION_MAX_CHARS,
+            EXTRACTION_TIMEOUT_SECONDS,
+        )
+        inflight.add(future)
+    metrics.EXTRACTION_QUEUE_DEPTH.inc()
+
+    def done(_):
+        metrics.EXTRACTION_QUEUE_DEPTH.dec()
+        with _pool_lock:
+            _inflight.get(pool, set()).discard(future)
+
+    future.add_done_callback(done)
+    return future
+
+
+def _extract_in_pool(data: bytes, ext: str) -> dict:
+    for attempt in (1, 2):
+        pool = _get_pool()
+        future = None
+        try:
+            future = _submit(pool, data, ext)
+            if future is None:
+                return {"text": "", "pages": 0, "truncated": False, "error": "extraction queue full", "queue_full": True}
+            return future.result(timeout=EXTRACTION_TIMEOUT_SECONDS + _HARD_TIMEOUT_GRACE_SECONDS)
+        except FutureTimeoutError:
+            if future.cancel():
+                # Never started: the pool is saturated, not stuck.
+                return {"text": "", "pages": 0, "truncated": False, "error": "extraction queue full", "queue_full": True}
+            _retire_pool(pool, "timeout", future)
+            return {"text": "", "pages": 0, "truncated": False, "error": "extraction timed out", "timed_out": True}
+        except (BrokenProcessPool, CancelledError, RuntimeError) as e:
+            # A worker crashed (OOM, segfault in a parser) or the pool was retired
+            # under this task; retire it and try once more on a fresh pool.
+            # RuntimeError is submit() on a pool shut down in between.
+            retire_reason = _retire_reason(pool)
+            if not isinstance(e, (BrokenProcessPool, CancelledError)) and retire_reason is None:
+                raise
+            # Collateral of another request's timeout is reported as a timeout too.
+            retired_by_timeout = retire_reason == "timeout"
+            _retire_pool(pool, "crash")
+            if attempt == 2:
+                return {
+                    "text": "",
+                    "pages": 0,
+                    "truncated": False,
+                    "error": f"extraction worker lost: {e or type(e).__name__}",
+                    "timed_out": retired_by_timeout,
+                }
+            print(f"⚠️ Extraction pool lost a worker ({type(e).__name__}); retrying on a new pool")
+
+
+def extract_document(data: bytes, filename: str) -> dict:
+    """
+    Extract text from an uploaded document in the worker pool.
+
+    Returns a dict with `text`, `pages`, `truncated`, `timed_out`, `queue_full`,
+    `error` and `elapsed_ms`. Failures never raise; they return partial or empty text.
+    """
+    start = time.perf_counter()
+    ext = os.path.splitext(filename or "")[1].lower()
+
+    if ext not in {".pdf", ".docx"}:
+        result = {"text": bytes(data).decode("utf-8", errors="ignore"), "pages": 0, "truncated": False, "error": None}
+    else:
+        try:
+            result = _extract_in_pool(bytes(data), ext)
+        except Exception as e:
+            result = {"text": "", "pages": 0, "truncated": False, "error": str(e)}
+
+    result.setdefault("timed_out", False)
+    result.setdefault("queue_full", False)
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    if result["queue_full"]:
+        outcome = "rejected"
+    elif result["timed_out"]:
+        outcome = "timeout"
+    elif result["error"]:
+        outcome = "partial" if result["text"] else "failed"
+    else:
+        outcome = "truncated" if result["truncated"] else "ok"
+    metrics.EXTRACTION_RESULTS.inc(outcome=outcome)
+
+    if result["error"] or result["timed_out"]:
+        print(f"⚠️ Resume extraction failed for {filename}: {result['error']} ({result['elapsed_ms']} ms)")
+    elif result["truncated"]:
+        print(f"ℹ Resume extraction stopped early for {filename}: {result['pages']} pages ({result['elapsed_ms']} ms)")
+
+    return result
 
 
 def read_resume_from_upload(file: Union["UploadFile", str, bytes]) -> str:
@@ -32,34 +252,12 @@ def read_resume_from_upload(file: Union["UploadFile", str, bytes]) -> str:
 
     # -------- Case 2: file path input --------
     if isinstance(file, str):
-        path = file
-        ext = os.path.splitext(path)[1].lower()
-
-        with open(path, "rb") as f:
+        with open(file, "rb") as f:
             data = f.read()
-
-        if ext == ".pdf":
-            return _read_pdf_from_bytes(data)
-        elif ext == ".docx":
-            return _read_docx_from_bytes(data)
-        else:
-            return data.decode("utf-8", errors="ignore")
+        return extract_document(data, file)["text"]
 
     # -------- Case 3: UploadFile input --------
     # Avoid importing UploadFile here to keep it pure utility
-    name = (getattr(file, "filename", "") or "").lower()
-
-    # Reset pointer
     file.file.seek(0)
-
-    if name.endswith(".pdf"):
-        # pypdf can read file-like objects directly
-        reader = PdfReader(file.file)
-        return " ".join([p.extract_text() or "" for p in reader.pages])
-
-    elif name.endswith(".docx"):
-        data = file.file.read()
-        return _read_docx_from_bytes(data)
-
-    else:
-        return file.file.read().decode("utf-8", errors="ignore")
+    data = file.file.read()
+    return extract_document(data, getattr(file, "filename", "") or "")["text"]
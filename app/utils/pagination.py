@@ -0,0 +1,123 @@
+import base64
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Optional
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.core import metrics
+
+# Keyset pagination on (created_at desc, _id desc). A cursor is the sort key of
+# the last row served, so every page is an index seek instead of a skip over
+# all previous pages. Cursors are opaque to clients (base64url JSON).
+
+KEYSET_SORT = [("created_at", -1), ("_id", -1)]
+# For endpoints whose body is a bare list.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+COUNT_CACHE_TTL_SECONDS = float(os.getenv("COUNT_CACHE_TTL_SECONDS", "60"))
+_COUNT_CACHE_MAX_ENTRIES = 1000
+
+_count_cache: dict[str, tuple[float, int]] = {}
+_count_cache_lock = threading.Lock()
+
+
+def encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return payload
+
+
+def keyset_cursor(doc: dict) -> str:
+    created_at = doc.get("created_at")
+    payload = {
+        "t": created_at.isoformat() if isinstance(created_at, datetime) else None,
+        "id": str(doc["_id"]),
+    }
+    # Legacy rows still carry created_at as a string (see JOB_SCHEMA_COMPAT).
+    if isinstance(created_at, str):
+        payload["s"] = created_at
+    return encode_cursor(payload)
+
+
+def keyset_filter(cursor: Optional[str]) -> dict:
+    """Mongo filter for rows strictly after `cursor` in KEYSET_SORT order ({} for the first page)."""
+    if not cursor:
+        return {}
+    payload = decode_cursor(cursor)
+    try:
+        last_id = ObjectId(payload["id"])
+        last_created = datetime.fromisoformat(payload["t"]) if payload.get("t") else None
+        last_legacy = payload.get("s")
+        if last_legacy is not None and not isinstance(last_legacy, str):
+            raise TypeError
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    # Descending BSON order puts dated rows first, then legacy string dates,
+    # then rows without created_at; `$lt` only compares values of the same type.
+    if last_created is not None:
+        return {"$or": [
+            {"created_at": {"$lt": last_created}},
+            {"created_at": last_created, "_id": {"$lt": last_id}},
+            {"created_at": {"$type": "string"}},
+            {"created_at": None},
+        ]}
+    if last_legacy is not None:
+        return {"$or": [
+            {"created_at": {"$lt": last_legacy}},
+            {"created_at": last_legacy, "_id": {"$lt": last_id}},
+            {"created_at": None},
+        ]}
+    return {"created_at": None, "_id": {"$lt": last_id}}
+
+
+def offset_cursor(offset: int) -> str:
+    """Cursor into an already-ranked, bounded list (e.g. search hits)."""
+    return encode_cursor({"o": offset})
+
+
+def decode_offset_cursor(cursor: Optional[str]) -> int:
+    if not cursor:
+        return 0
+    offset = decode_cursor(cursor).get("o")
+    if not isinstance(offset, int) or offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return offset
+
+
+def cached_count(collection, query: dict) -> int:
+    """count_documents, cached per collection + query for COUNT_CACHE_TTL_SECONDS."""
+    key = f"{collection.name}:{json.dumps(query, sort_keys=True, default=str)}"
+    now = time.monotonic()
+    with _count_cache_lock:
+        entry = _count_cache.get(key)
+    if entry is not None and entry[0] > now:
+        metrics.record_cache("count", True)
+        return entry[1]
+
+    metrics.record_cache("count", False)
+    total = collection.count_documents(query)
+    with _count_cache_lock:
+        if len(_count_cache) >= _COUNT_CACHE_MAX_ENTRIES:
+            _count_cache.clear()
+        _count_cache[key] = (now + COUNT_CACHE_TTL_SECONDS, total)
+    return total
+
+
+def page_slice(docs: list[Any], limit: int) -> tuple[list[Any], bool]:
+    """Split a limit+1 fetch into the page and whether another page exists."""
+    return docs[:limit], len(docs) > limit
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# app.core.database refuses to import without a URI; the clients connect lazily,
+# so a placeholder is enough for tests that never query Mongo.
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
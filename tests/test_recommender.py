@@ -0,0 +1,25 @@
+from app.services.recommender import lexical_query_terms
+from app.services.resume_parser import clean_text
+
+RAW_RESUME = """Jane Smith
+jane.smith@example.com | +1 555 0100
+CNC Operator
+Experience
+Operated 5-axis CNC machines and lathes, reading blueprints to tight tolerances.
+"""
+
+
+def test_title_terms_come_from_raw_lines():
+    # /recommend passes clean_text(raw) as resume_text and the raw extraction for titles.
+    resume_text = clean_text(RAW_RESUME)
+    assert "\n" not in resume_text
+
+    terms = lexical_query_terms(RAW_RESUME, {"skills": ["blueprints"]})
+
+    assert terms["cnc"] == 0.5
+    assert terms["operator"] == 0.5
+    assert terms["blueprints"] == 1.0
+
+
+def test_cleaned_text_yields_no_titles():
+    assert lexical_query_terms(clean_text(RAW_RESUME), {"skills": []}) == {}
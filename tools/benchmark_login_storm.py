@@ -0,0 +1,125 @@
+# =============================
+# tools/benchmark_login_storm.py
+# Login throughput + collateral latency during a burst of logins
+# =============================
+
+import sys
+import os
+import time
+import argparse
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(label, latencies_ms, elapsed=None):
+    line = (
+        f"{label:<8} n={len(latencies_ms):<5} "
+        f"p50={percentile(latencies_ms, 50):8.1f} ms  "
+        f"p95={percentile(latencies_ms, 95):8.1f} ms  "
+        f"p99={percentile(latencies_ms, 99):8.1f} ms  "
+        f"max={max(latencies_ms, default=float('nan')):8.1f} ms"
+    )
+    if elapsed:
+        line += f"  throughput={len(latencies_ms) / elapsed:6.1f} req/s"
+    print(line)
+
+
+def login_once(session, base_url, email, password):
+    start = time.perf_counter()
+    response = session.post(f"{base_url}/auth/login", json={"email": email, "password": password}, timeout=60)
+    return (time.perf_counter() - start) * 1000, response.status_code
+
+
+def probe_loop(base_url, path, interval, stop, latencies):
+    """Hit a cheap endpoint on a fixed schedule to see what the storm does to everyone else."""
+    session = requests.Session()
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            session.get(f"{base_url}{path}", timeout=60)
+            latencies.append((time.perf_counter() - start) * 1000)
+        except requests.RequestException:
+            pass
+        stop.wait(interval)
+
+
+def run_storm(args):
+    sessions = threading.local()
+
+    def worker(_):
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+        return login_once(sessions.session, args.base_url, args.email, args.password)
+
+    probe_latencies = []
+    stop = threading.Event()
+    probe = threading.Thread(
+        target=probe_loop, args=(args.base_url, args.probe_path, args.probe_interval, stop, probe_latencies)
+    )
+
+    # Baseline probe latency on an idle server.
+    probe.start()
+    time.sleep(args.baseline_seconds)
+    baseline = list(probe_latencies)
+    probe_latencies.clear()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(worker, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    probe.join()
+
+    statuses = {}
+    for _, code in results:
+        statuses[code] = statuses.get(code, 0) + 1
+    ok = [ms for ms, code in results if code == 200]
+
+    print(f"\n{args.requests} logins, concurrency {args.concurrency}, {elapsed:.2f}s wall")
+    print(f"status codes: {dict(sorted(statuses.items()))}\n")
+    summarize("login", ok, elapsed)
+    summarize("idle", baseline)
+    summarize("storm", probe_latencies)
+    if baseline and probe_latencies:
+        print(f"\n{args.probe_path} p99 slowdown during storm: "
+              f"{percentile(probe_latencies, 99) / max(statistics.median(baseline), 0.001):.1f}x idle median")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fire concurrent logins at a running API and measure login throughput, "
+                    "tail latency and the latency of other requests during the storm."
+    )
+    parser.add_argument("--base-url", default=os.getenv("API_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--email", required=True, help="Existing account to log in as")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--probe-path", default="/health", help="Cheap endpoint sampled during the storm")
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    parser.add_argument("--baseline-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    try:
+        requests.get(f"{args.base_url}/health", timeout=5).raise_for_status()
+    except requests.RequestException as e:
+        print(f"❌ API not reachable at {args.base_url}: {e}")
+        sys.exit(1)
+
+    run_storm(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# =============================
+# tools/benchmark_resume_parser.py
+# Latency + parity check: full vs lite resume parsing
+# =============================
+
+import sys
+import os
+import time
+import argparse
+import statistics
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.services.resume_parser import parse_resume_file, parse_resume, parse_resumes
+
+MODES = ("full", "lite")
+
+
+def time_mode(texts, mode, repeats):
+    per_resume = []
+    for _ in range(repeats):
+        for text in texts:
+            start = time.perf_counter()
+            parse_resume(text, mode=mode)
+            per_resume.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        parse_resumes(texts, mode=mode)
+    batched = (time.perf_counter() - start) * 1000 / (repeats * len(texts))
+
+    return per_resume, batched
+
+
+def compare_outputs(path, full, lite):
+    mismatches = []
+    for field in full:
+        if full[field] != lite[field]:
+            mismatches.append(field)
+
+    if not mismatches:
+        print(f"   ✅ {os.path.basename(path)}: identical")
+        return True
+
+    print(f"   ⚠️ {os.path.basename(path)}: differs in {', '.join(mismatches)}")
+    if "skills" in mismatches:
+        full_skills, lite_skills = set(full["skills"]), set(lite["skills"])
+        print(f"      skills only in full: {sorted(full_skills - lite_skills)}")
+        print(f"      skills only in lite: {sorted(lite_skills - full_skills)}")
+    if "name" in mismatches:
+        print(f"      name: full={full['name']!r} lite={lite['name']!r}")
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full vs lite resume parsing.")
+    parser.add_argument("files", nargs="+", help="Resume files (.pdf, .docx or .txt)")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = [parse_resume_file(path) for path in args.files]
+    print(f"📄 Resumes loaded: {len(texts)}")
+
+    # Warm up the pipelines so model loading is not measured.
+    for mode in MODES:
+        parse_resume(texts[0], mode=mode)
+
+    print("🔍 Parity (full vs lite):")
+    identical = sum(
+        compare_outputs(path, parse_resume(text, mode="full"), parse_resume(text, mode="lite"))
+        for path, text in zip(args.files, texts)
+    )
+    print(f"   {identical}/{len(texts)} resumes identical")
+
+    print("⏱️ Latency per resume (ms):")
+    for mode in MODES:
+        per_resume, batched = time_mode(texts, mode, args.repeats)
+        p95 = sorted(per_resume)[int(len(per_resume) * 0.95) - 1 if len(per_resume) > 1 else 0]
+        print(
+            f"   {mode:<4} median={statistics.median(per_resume):.1f} "
+            f"p95={p95:.1f} batched={batched:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,6 @@
 import sys
 import os
 import dotenv
-import pandas as pd
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, PROJECT_ROOT)
@@ -17,9 +16,10 @@ dotenv.load_dotenv(ENV_PATH)
 # ---------------- Imports ----------------
 import numpy as np
 import faiss
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from app.services.drive_service import upload_index_to_drive
 from app.core.config import DATA_DIR
+from app.services.job_text import build_job_text, job_content_hash
 from app.services.recommender import get_model
 
 # ---------------- Config ----------------
@@ -31,34 +31,20 @@ OUTPUT_INDEX_PATH = f"{DATA_DIR}/jobs.index"
 # ------------------------------------------------
 
 
-def build_job_text(row):
-    return f"""
-Job Title: {row.get('Job Title', '')}
-Category: {row.get('Category', '')}
-Experience Level: {row.get('Experience Level', '')}
-Skills: {row.get('Skills', '')}
-Requirements: {row.get('Requirements', '')}
-Responsibilities: {row.get('Responsibilities', '')}
-Job Description: {row.get('Job Description', '')}
-"""
-
-
 def build_faiss_index():
     print("🔌 Connecting to MongoDB...")
     client = MongoClient(MONGO_URI)
     db = client[DB_NAME]
     collection = db[COLLECTION_NAME]
 
-    jobs = list(collection.find({}, {"_id": 0}))
+    jobs = list(collection.find({"is_active": {"$ne": False}}))
     if not jobs:
         raise ValueError("No jobs found in database")
 
-    df = pd.DataFrame(jobs)
-
-    print(f"📄 Jobs loaded: {len(df)}")
+    print(f"📄 Jobs loaded: {len(jobs)}")
 
     print("📝 Building job texts...")
-    job_texts = df.apply(build_job_text, axis=1).tolist()
+    job_texts = [build_job_text(job) for job in jobs]
 
     print("🤖 Loading embedding model...")
     model = get_model()
@@ -88,14 +74,33 @@ def build_faiss_index():
 
     print("✅ FAISS index created successfully")
 
-    return OUTPUT_INDEX_PATH
+    return OUTPUT_INDEX_PATH, jobs
+
+
+def record_index_positions(jobs):
+    # Only point jobs at the new positions once the new index is on Drive.
+    print("🏷️ Recording index positions...")
+    client = MongoClient(MONGO_URI)
+    collection = client[DB_NAME][COLLECTION_NAME]
+    collection.bulk_write(
+        [
+            UpdateOne(
+                {"_id": job["_id"]},
+                {"$set": {"indexed": True, "index_position": position, "content_hash": job_content_hash(job)}},
+            )
+            for position, job in enumerate(jobs)
+        ],
+        ordered=False,
+    )
+    collection.update_many({"is_active": False}, {"$unset": {"index_position": ""}, "$set": {"indexed": False}})
 
 
 
 def main():
     try:
-        index_path = build_faiss_index()
+        index_path, jobs = build_faiss_index()
         upload_index_to_drive(index_path)
+        record_index_positions(jobs)
         print("🎉 Build + Upload pipeline completed successfully")
 
     except Exception as e:
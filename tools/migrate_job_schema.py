@@ -0,0 +1,145 @@
+# =============================
+# tools/migrate_job_schema.py
+# Rewrite stored jobs into the canonical schema (one key per field, typed values,
+# normalized links). Also the backfill after a schema version bump: it rewrites
+# every job below the current SCHEMA_VERSION.
+# Batched and resumable: progress is checkpointed in the `migrations` collection
+# =============================
+
+import sys
+import os
+import time
+import argparse
+import dotenv
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+ENV_PATH = os.path.join(PROJECT_ROOT, "app", ".env")
+dotenv.load_dotenv(ENV_PATH)
+
+from datetime import datetime
+from pymongo import UpdateOne
+
+from app.core.database import db, jobs_collection, migrations_collection
+from app.services.job_schema import SCHEMA_VERSION, canonical_job_update
+
+MIGRATION_ID = f"job_schema_v{SCHEMA_VERSION}"
+# Older versions and jobs without a version at all.
+LEGACY_QUERY = {"schema_version": {"$not": {"$gte": SCHEMA_VERSION}}}
+
+
+def collection_size():
+    stats = db.command("collStats", jobs_collection.name)
+    return stats.get("count", 0), stats.get("size", 0), stats.get("avgObjSize", 0)
+
+
+def print_status():
+    checkpoint = migrations_collection.find_one({"_id": MIGRATION_ID}) or {}
+    count, size, avg = collection_size()
+    remaining = jobs_collection.count_documents(LEGACY_QUERY)
+    print(f"jobs: {count}  size: {size / 1024 / 1024:.1f} MB  avg doc: {avg:.0f} bytes")
+    print(f"not yet migrated: {remaining}")
+    print(f"checkpoint: last_id={checkpoint.get('last_id')} migrated={checkpoint.get('migrated', 0)} "
+          f"completed_at={checkpoint.get('completed_at')}")
+    if remaining == 0:
+        print("✅ All jobs are canonical. JOB_SCHEMA_COMPAT=0 can be rolled out.")
+
+
+def migrate(batch_size: int, dry_run: bool, restart: bool, pause: float):
+    checkpoint = None if restart else migrations_collection.find_one({"_id": MIGRATION_ID})
+    last_id = checkpoint.get("last_id") if checkpoint else None
+    migrated = checkpoint.get("migrated", 0) if checkpoint and not dry_run else 0
+    if last_id is not None:
+        print(f"↪️ Resuming after _id {last_id} ({migrated} migrated so far)")
+
+    _, size_before, avg_before = collection_size()
+    started = time.perf_counter()
+    skipped = 0
+
+    while True:
+        query = dict(LEGACY_QUERY)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = list(jobs_collection.find(query).sort("_id", 1).limit(batch_size))
+        if not batch:
+            break
+
+        ops = []
+        for doc in batch:
+            updates, legacy_fields = canonical_job_update(doc)
+            update = {"$set": updates}
+            if legacy_fields:
+                update["$unset"] = legacy_fields
+            # A job edited since it was read keeps the edit; the edit path migrates it.
+            ops.append(UpdateOne(
+                {"_id": doc["_id"], **LEGACY_QUERY, "updated_at": doc.get("updated_at")},
+                update,
+            ))
+
+        last_id = batch[-1]["_id"]
+        if dry_run:
+            if migrated == 0:
+                updates, legacy_fields = canonical_job_update(batch[0])
+                print(f"sample {batch[0]['_id']}: set {sorted(updates)} unset {sorted(legacy_fields)}")
+            migrated += len(ops)
+            continue
+
+        result = jobs_collection.bulk_write(ops, ordered=False)
+        migrated += result.modified_count
+        skipped += len(ops) - result.matched_count
+        migrations_collection.update_one(
+            {"_id": MIGRATION_ID},
+            {
+                "$set": {"last_id": last_id, "migrated": migrated, "updated_at": datetime.utcnow()},
+                "$setOnInsert": {"started_at": datetime.utcnow()},
+            },
+            upsert=True,
+        )
+        print(f"   {migrated} migrated (last _id {last_id}, {time.perf_counter() - started:.1f}s)")
+        if pause:
+            time.sleep(pause)
+
+    if dry_run:
+        print(f"🧪 Dry run: {migrated} jobs would be rewritten")
+        return
+
+    remaining = jobs_collection.count_documents(LEGACY_QUERY)
+    if remaining == 0:
+        migrations_collection.update_one(
+            {"_id": MIGRATION_ID}, {"$set": {"completed_at": datetime.utcnow()}}, upsert=True
+        )
+    _, size_after, avg_after = collection_size()
+    print(f"✅ Migrated {migrated} jobs; {skipped} skipped because they were edited mid-run")
+    print(f"   size {size_before / 1024 / 1024:.1f} MB -> {size_after / 1024 / 1024:.1f} MB, "
+          f"avg doc {avg_before:.0f} -> {avg_after:.0f} bytes")
+    if remaining:
+        print(f"⚠️ {remaining} jobs still use the legacy schema; run again with --restart to pick them up")
+    else:
+        print("   Roll out JOB_SCHEMA_COMPAT=0 to stop querying legacy field names.")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rewrite jobs into the canonical schema: drop the duplicated legacy fields "
+                    "(`Job Title`, `Skills`, ...), store salaries and experience ranges as numbers, "
+                    "dates as datetimes, skills as a list and links normalized. "
+                    "Safe to stop and re-run; it resumes from its checkpoint."
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and scan from the start")
+    parser.add_argument("--status", action="store_true", help="Print migration progress and exit")
+    args = parser.parse_args()
+
+    if args.status:
+        print_status()
+        return
+
+    print(f"🔄 Migrating jobs to schema v{SCHEMA_VERSION}...")
+    migrate(args.batch_size, args.dry_run, args.restart, args.pause)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# =============================
+# tools/profile_imports.py
+# Import-time profile of the app (python -X importtime)
+# =============================
+
+import sys
+import os
+import argparse
+import subprocess
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Modules that must never be imported just by importing the app.
+HEAVY_MODULES = ("torch", "sentence_transformers", "transformers", "spacy")
+
+
+def run_importtime(module: str) -> list[tuple[int, int, str]]:
+    env = dict(os.environ)
+    env.setdefault("MONGO_URI", "mongodb://localhost:27017/job_recommendation")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        raise SystemExit(f"❌ import {module} failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        head, cumulative_us, name = line.split("|", 2)
+        self_us = head.replace("import time:", "").strip()
+        rows.append((int(self_us), int(cumulative_us.strip()), name.rstrip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import-time cost of a module.")
+    parser.add_argument("module", nargs="?", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if total import time exceeds this")
+    args = parser.parse_args()
+
+    rows = run_importtime(args.module)
+    # Top-level imports carry one leading space; each nesting level adds two more.
+    top_level = [row for row in rows if not row[2].startswith("  ")]
+    total_ms = sum(row[1] for row in top_level) / 1000
+
+    print(f"⏱️ import {args.module}: {total_ms:.1f} ms total")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[: args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name.strip()}")
+
+    loaded = {name.strip() for _, _, name in rows}
+    heavy = [mod for mod in HEAVY_MODULES if mod in loaded]
+    failed = False
+    if heavy:
+        print(f"⚠️ Heavy modules imported eagerly: {', '.join(heavy)}")
+        failed = True
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"⚠️ Import time {total_ms:.1f} ms exceeds budget {args.max_ms:.1f} ms")
+        failed = True
+
+    if failed:
+        raise SystemExit(1)
+    print("✅ Import profile within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# =============================
+# tools/reconcile_report_rollups.py
+# Rebuild the daily report rollups (report_rollups collection) from the raw
+# recommendation_items, applications and jobs collections. The API does this
+# nightly for the last few days; run it by hand after a bulk import or delete,
+# or with --all to backfill the whole history.
+# =============================
+
+import sys
+import os
+import time
+import argparse
+import dotenv
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+ENV_PATH = os.path.join(PROJECT_ROOT, "app", ".env")
+dotenv.load_dotenv(ENV_PATH)
+
+from datetime import datetime, timedelta
+
+from app.core.database import migrations_collection
+from app.repositories.report_rollups import day_of
+from app.services.report_rollups import RECONCILE_DAYS, STATE_ID, reconcile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild daily report rollups from raw events.")
+    parser.add_argument("--days", type=int, default=RECONCILE_DAYS,
+                        help="Closed days to rebuild, counting back from yesterday")
+    parser.add_argument("--include-today", action="store_true",
+                        help="Also rebuild today's buckets (races with live increments)")
+    parser.add_argument("--all", action="store_true", help="Rebuild the whole history, today included")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.all:
+        print("🔄 Rebuilding all report rollups...")
+        written = reconcile()
+        migrations_collection.update_one(
+            {"_id": STATE_ID},
+            {"$set": {"backfilled_at": datetime.utcnow()}, "$unset": {"backfill_claimed_at": ""}},
+            upsert=True,
+        )
+    else:
+        today = day_of(datetime.utcnow())
+        since = today - timedelta(days=args.days)
+        until = None if args.include_today else today
+        print(f"🔄 Rebuilding report rollups from {since:%Y-%m-%d}"
+              f"{' through today' if until is None else f' to {today:%Y-%m-%d} (exclusive)'}...")
+        written = reconcile(since=since, until=until)
+
+    print(f"✅ Wrote {written} buckets in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,8 @@ import pandas as pd
 from pymongo import MongoClient
 from datetime import datetime
 from app.core.config import DATA_DIR
+from app.services.job_schema import canonicalize_job
+from app.services.skill_matcher import job_skill_fields
 
 # ===== MongoDB Config =====
 MONGO_URI = os.getenv("MONGO_URI")   # change if using Atlas
@@ -29,8 +31,12 @@ def main():
     df["indexed"] = False
     df["is_active"] = True
 
-    # Convert to dict
-    records = df.to_dict(orient="records")
+    # Convert to dict, mapping the CSV's legacy column names onto the canonical job schema
+    records = [canonicalize_job(record) for record in df.to_dict(orient="records")]
+
+    # Extract skill ids once at ingest so scoring never re-parses skills
+    for record in records:
+        record.update(job_skill_fields(record))
 
     # MongoDB connection
     client = MongoClient(MONGO_URI)